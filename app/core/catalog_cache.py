@@ -0,0 +1,116 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, FrozenSet, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.responses import trusted_response
+from app.database.pagination import CountStrategy, PageResult
+
+# Shared cache for the public catalog listings (products, categories, merchants, offers).
+# Keys are (endpoint, page, size, category); values are pydantic snapshots, never ORM objects.
+catalog_cache = TTLCache(maxsize=settings.CATALOG_CACHE_SIZE, ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    items: List[BaseModel]
+    total: Optional[int]
+    has_more: bool
+    total_strategy: CountStrategy
+    etag: str
+    # Ids of the listed rows, so a write can drop just the pages that show the row it changed.
+    item_ids: FrozenSet = frozenset()
+
+
+def compute_etag(key: Tuple, loaded: PageResult) -> str:
+    payload = json.dumps(
+        {
+            "key": [str(part) for part in key],
+            "total": loaded.total,
+            "has_more": loaded.has_more,
+            "total_strategy": loaded.total_strategy.value,
+            "items": [item.model_dump(mode="json") for item in loaded.items],
+        },
+        sort_keys=True,
+    )
+    return f'"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+
+
+def _to_page(key: Tuple, loaded: PageResult) -> CatalogPage:
+    return CatalogPage(
+        items=loaded.items,
+        total=loaded.total,
+        has_more=loaded.has_more,
+        total_strategy=loaded.total_strategy,
+        etag=compute_etag(key, loaded),
+        item_ids=frozenset(item.id for item in loaded.items),
+    )
+
+
+def get_page(
+    endpoint: str, page: int, size: int, category: Optional[str],
+    loader: Callable[[], PageResult],
+) -> CatalogPage:
+    """
+    Returns the cached page for this key, calling loader() to fill the cache on a miss.
+    """
+    key = (endpoint, page, size, category)
+    cached = catalog_cache.get(key)
+    if cached is None:
+        cached = _to_page(key, loader())
+        catalog_cache.set(key, cached)
+    return cached
+
+
+async def get_page_async(
+    endpoint: str, page: int, size: int, category: Optional[str],
+    loader: Callable[[], Awaitable[PageResult]],
+) -> CatalogPage:
+    key = (endpoint, page, size, category)
+    cached = catalog_cache.get(key)
+    if cached is None:
+        cached = _to_page(key, await loader())
+        catalog_cache.set(key, cached)
+    return cached
+
+
+def invalidate_catalog(*endpoints: str) -> None:
+    """
+    Drops the cached pages of the given endpoints, or of every endpoint when none are given.
+    Only this worker's cache is affected; other workers catch up within CATALOG_CACHE_TTL_SECONDS.
+    """
+    if not endpoints:
+        catalog_cache.clear()
+        return
+    catalog_cache.pop_where(lambda key, _: key[0] in endpoints)
+
+
+def invalidate_products(product_ids: Iterable) -> None:
+    """
+    Drops the cached product pages that list any of these products, e.g. after their stock changed.
+    Pages that do not show them stay cached. Like invalidate_catalog, only this worker's cache is affected.
+    """
+    product_ids = frozenset(product_ids)
+    catalog_cache.pop_where(lambda key, page: key[0] == "products" and not page.item_ids.isdisjoint(product_ids))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_response(request: Request, response: Response, body: Any, etag: str) -> Any:
+    """
+    Returns an empty 304 when the client already holds this representation,
+    otherwise tags the response with the ETag and returns the body as a trusted response.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return trusted_response(body, headers={"ETag": etag})
@@ -3,10 +3,13 @@ from dotenv import load_dotenv
 # Remove the PostgresDsn import
 from pydantic import model_validator
 from pydantic_settings import BaseSettings
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 load_dotenv()
 
+# The values of app.database.pagination.CountStrategy; spelled out here so a typo fails at startup.
+CountStrategyName = Literal["exact", "cached", "estimate", "none"]
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Mock Livin MDA"
     API_V1_STR: str = "/api/v1"
@@ -18,21 +21,103 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     DATABASE_URL: Optional[str] = None
 
+    # Serve /products, /offers and /analytics/* from async routes on an asyncpg engine.
+    # Write flows (payments, deposits) always stay on the sync engine.
+    ASYNC_READ_ENDPOINTS: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Optional read-only replica for catalog, history and analytics reads; unset means the primary.
+    # After a user's own payment or deposit, their reads stay on the primary for READ_YOUR_WRITES_SECONDS.
+    # That stickiness is remembered per worker process: a read served by another uvicorn worker (or
+    # another instance behind the load balancer) can still hit a replica that has not caught up yet.
+    READ_REPLICA_URL: Optional[str] = None
+    ASYNC_READ_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5
+
     @model_validator(mode='before')
     def get_database_url(cls, values: Dict[str, Any]) -> Dict[str, Any]:
-        if isinstance(values.get("DATABASE_URL"), str):
-            return values
-        dsn = (
-            f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@"
-            f"{values.get('DB_SERVER')}:{values.get('DB_PORT')}/{values.get('POSTGRES_DB')}"
-        )
-        values["DATABASE_URL"] = dsn
+        if not isinstance(values.get("DATABASE_URL"), str):
+            dsn = (
+                f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@"
+                f"{values.get('DB_SERVER')}:{values.get('DB_PORT')}/{values.get('POSTGRES_DB')}"
+            )
+            values["DATABASE_URL"] = dsn
+        if not isinstance(values.get("ASYNC_DATABASE_URL"), str):
+            scheme, rest = values["DATABASE_URL"].split("://", 1)
+            values["ASYNC_DATABASE_URL"] = f"{scheme.split('+')[0]}+asyncpg://{rest}"
+        if isinstance(values.get("READ_REPLICA_URL"), str) and not isinstance(values.get("ASYNC_READ_REPLICA_URL"), str):
+            scheme, rest = values["READ_REPLICA_URL"].split("://", 1)
+            values["ASYNC_READ_REPLICA_URL"] = f"{scheme.split('+')[0]}+asyncpg://{rest}"
         return values
 
+    # Connection pool of each engine (per worker process). DB_POOL_RECYCLE=-1 never recycles.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Timezone the daily_spending_rollups days are cut in; every connection sets it as its TimeZone.
+    # Time series in another timezone, or hourly ones, are computed from the raw transactions instead.
+    # After changing it, run `python -m app.domains.transactions.rebuild_rollups` to re-cut the days.
+    ANALYTICS_ROLLUP_TIMEZONE: str = "UTC"
+    ANALYTICS_MAX_BUCKETS: int = 10000
+
+    # Render JSON with FastJSONResponse (orjson / pydantic-core) and let the large list and
+    # time-series endpoints skip FastAPI's second validation pass over their response models.
+    FAST_JSON_RESPONSES: bool = False
+
+    # Per-route latency and SQL metrics, served in Prometheus text format on /metrics.
+    METRICS_ENABLED: bool = True
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # In-process cache of authenticated users, keyed by token subject. Set either value to 0 to disable.
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 30
+    # How long a worker trusts its cached token_version; a revoked token stops working everywhere within this.
+    TOKEN_VERSION_CACHE_TTL_SECONDS: float = 30
+
+    # bcrypt runs in a process pool of this many workers (0 hashes inline in the request thread).
+    # Requests beyond PASSWORD_HASH_MAX_PENDING queued or running jobs are rejected with a 503.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    # Cache of public catalog pages (products, categories, merchants, offers). 0 disables it.
+    CATALOG_CACHE_SIZE: int = 1024
+    CATALOG_CACHE_TTL_SECONDS: float = 30
+
+    # How list endpoints compute `total`: exact, cached, estimate or none (see app/database/pagination.py).
+    # COUNT_STRATEGIES overrides it per endpoint, e.g. '{"products": "estimate", "transactions": "none"}'.
+    COUNT_STRATEGY: CountStrategyName = "exact"
+    COUNT_STRATEGIES: Dict[str, CountStrategyName] = {}
+    COUNT_CACHE_TTL_SECONDS: float = 60
+
+    # "orm" locks and updates rows through the ORM; "atomic" pays with a single guarded UPDATE ... RETURNING statement.
+    PAYMENT_ENGINE: str = "orm"
+
+    # Group commit: deposits and payments are queued and applied in batches of up to WRITE_BATCH_MAX_SIZE,
+    # collected for WRITE_BATCH_WINDOW_MS, with one commit per batch (see app/database/group_commit.py).
+    WRITE_BATCHING: bool = False
+    WRITE_BATCH_WINDOW_MS: float = 2
+    WRITE_BATCH_MAX_SIZE: int = 64
+
+    # Two-phase payments: how long a hold keeps its balance and stock before the sweeper releases it,
+    # and how often (0 disables the in-process sweeper) and how many expired holds it releases per run.
+    PAYMENT_HOLD_TTL_SECONDS: int = 900
+    HOLD_SWEEP_INTERVAL_SECONDS: float = 30
+    HOLD_SWEEP_BATCH_SIZE: int = 1000
+
+    # Bulk deposit / payroll import. Only these user emails may call it; empty disables the endpoint.
+    BULK_DEPOSIT_OPERATORS: List[str] = []
+    BULK_DEPOSIT_MAX_ROWS: int = 100000
+    BULK_DEPOSIT_BATCH_SIZE: int = 10000
+
+    # Rows fetched per round trip by the server-side cursor behind /transactions/export.
+    EXPORT_BATCH_SIZE: int = 1000
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,190 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds. The request buckets reach into seconds; the DB ones stay finer.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Iterable[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_labels(labels, le='+Inf')} {count}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(labels)} {_number(value)}")
+        return lines
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Labels, **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Time until the response headers are sent, per route.", LATENCY_BUCKETS
+)
+requests_total = Counter("http_requests_total", "Requests per route and status code.")
+request_db_statements = Histogram(
+    "http_request_db_statements", "SQL statements executed while serving one request.", STATEMENT_BUCKETS
+)
+request_db_time = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL while serving one request.", DB_TIME_BUCKETS
+)
+db_statements_total = Counter(
+    "db_statements_total", "SQL statements executed, by route (\"none\" outside of requests)."
+)
+db_time_total = Counter("db_seconds_total", "Time spent executing SQL, by route (\"none\" outside of requests).")
+
+REGISTRY = (request_latency, requests_total, request_db_statements, request_db_time, db_statements_total, db_time_total)
+
+
+@dataclass
+class _RequestDbUsage:
+    statements: int = 0
+    seconds: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# Set by the middleware for the duration of a request. The value is mutated in place, so
+# statements run in threadpool workers (which see a copy of the context) still add to it.
+_request_db_usage: ContextVar[Optional[_RequestDbUsage]] = ContextVar("request_db_usage", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    usage = _request_db_usage.get()
+    if usage is None:
+        db_statements_total.inc((("route", "none"),))
+        db_time_total.inc((("route", "none"),), elapsed)
+        return
+    with usage.lock:
+        usage.statements += 1
+        usage.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Counts and times every statement run on `engine` (pass async_engine.sync_engine for the async one).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_label(request: Request) -> str:
+    # The path template keeps the label set small; unmatched paths share one label.
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next):
+    usage = _RequestDbUsage()
+    token = _request_db_usage.set(usage)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        _request_db_usage.reset(token)
+        route = (("method", request.method), ("route", _route_label(request)))
+        request_latency.observe(route, elapsed)
+        requests_total.inc(route + (("status", str(status_code)),))
+        request_db_statements.observe(route, usage.statements)
+        request_db_time.observe(route, usage.seconds)
+        db_statements_total.inc(route[1:], usage.statements)
+        db_time_total.inc(route[1:], usage.seconds)
+
+
+def _sample_lines(name: str, help: str, kind: str, values: Dict[Labels, float]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in sorted(values.items()))
+    return lines
+
+
+def gauge_lines(name: str, help: str, values: Dict[Labels, float]) -> List[str]:
+    return _sample_lines(name, help, "gauge", values)
+
+
+def counter_lines(name: str, help: str, values: Dict[Labels, float]) -> List[str]:
+    """
+    For totals kept elsewhere (e.g. the pool stats) that only ever grow; `name` should end in _total.
+    """
+    return _sample_lines(name, help, "counter", values)
+
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
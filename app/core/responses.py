@@ -0,0 +1,63 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Mapping, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+# orjson is optional; without it the stdlib encoder is used with the same type handling.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # Same representations pydantic uses in JSON mode, so both paths produce identical bodies.
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse with a faster encoder. A pydantic model is dumped by pydantic-core directly;
+    anything else (what FastAPI produces after response_model validation) goes through orjson
+    when it is installed. Decimals are written as strings, like pydantic does.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def trusted_response(
+    model: BaseModel, status_code: int = 200, headers: Optional[Mapping[str, str]] = None
+) -> Any:
+    """
+    Returns an already-validated response schema without FastAPI validating and encoding it a
+    second time against the route's response_model. Only pass an instance of that response_model
+    built from trusted data. When FAST_JSON_RESPONSES is off the model is returned unchanged
+    and takes the regular path.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return model
+    return FastJSONResponse(model, status_code=status_code, headers=headers)
+
+
+def default_response_class() -> Type[Response]:
+    return FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
@@ -1,16 +1,79 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
+from typing import Callable, Optional
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+class PasswordHashingBusy(Exception):
+    """
+    Raised when the password hashing pool already has PASSWORD_HASH_MAX_PENDING jobs in flight.
+    """
+
+# bcrypt is deliberately slow and CPU-bound, so it runs in a dedicated process pool instead of
+# the request threads. The pool is created lazily, on first use, in each worker process.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(max(settings.PASSWORD_HASH_MAX_PENDING, 1))
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+def _submit(fn: Callable, *args) -> Future:
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy("Too many concurrent password operations. Please try again shortly.")
+    try:
+        future = _get_hash_pool().submit(fn, *args)
+    except Exception:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+def shutdown_password_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return _verify(plain_password, hashed_password)
+    return _submit(_verify, plain_password, hashed_password).result()
+
+def get_password_hash(password: str) -> str:
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return _hash(password)
+    return _submit(_hash, password).result()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Like verify_password, but awaits the pool instead of blocking a threadpool slot while bcrypt runs.
+    """
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(_verify, plain_password, hashed_password)
+    return await asyncio.wrap_future(_submit(_verify, plain_password, hashed_password))
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
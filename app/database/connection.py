@@ -1,13 +1,119 @@
+import uuid
+from typing import Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.database.pool_stats import (
+    async_pool_stats, async_replica_pool_stats, instrument_pool, instrumented_pool_class,
+    replica_pool_stats, sync_pool_stats,
+)
+
+pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+# Every session runs in the rollup timezone, so each `transaction_date::date` (the rollup upserts,
+# rebuild_daily_rollups, the migration backfill) cuts days where the analytics handlers expect them.
+_rollup_timezone = settings.ANALYTICS_ROLLUP_TIMEZONE
+
+def _create_engine(url: str, stats):
+    new_engine = create_engine(
+        url, poolclass=instrumented_pool_class(QueuePool, stats),
+        connect_args={"options": f"-c timezone={_rollup_timezone}"}, **pool_options,
+    )
+    instrument_pool(new_engine.pool, stats)
+    if settings.METRICS_ENABLED:
+        instrument_engine(new_engine)
+    return new_engine
+
+def _create_async_engine(url: str, stats):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    new_engine = create_async_engine(
+        url, poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, stats),
+        connect_args={"server_settings": {"timezone": _rollup_timezone}}, **pool_options,
+    )
+    instrument_pool(new_engine.sync_engine.pool, stats)
+    if settings.METRICS_ENABLED:
+        instrument_engine(new_engine.sync_engine)
+    return new_engine
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = _create_engine(settings.DATABASE_URL, sync_pool_stats)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for GET endpoints. Without one, reads simply go to the primary.
+read_engine = engine
+ReadSessionLocal = SessionLocal
+if settings.READ_REPLICA_URL:
+    read_engine = _create_engine(settings.READ_REPLICA_URL, replica_pool_stats)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# The async engine needs asyncpg, so it is only built when the async read path is enabled.
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+if settings.ASYNC_READ_ENDPOINTS:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = _create_async_engine(settings.ASYNC_DATABASE_URL, async_pool_stats)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if settings.ASYNC_READ_REPLICA_URL:
+        AsyncReadSessionLocal = async_sessionmaker(
+            _create_async_engine(settings.ASYNC_READ_REPLICA_URL, async_replica_pool_stats),
+            autoflush=False, expire_on_commit=False,
+        )
+
+# Users who wrote recently read from the primary until the replica has surely caught up.
+# Per worker, like the other in-process caches.
+recent_writers = TTLCache(maxsize=100_000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+def mark_recent_write(*user_ids: uuid.UUID) -> None:
+    for user_id in user_ids:
+        recent_writers.set(user_id, True)
+
+def _reads_from_primary(user_id: Optional[uuid.UUID]) -> bool:
+    return user_id is not None and recent_writers.get(user_id) is not None
+
+def read_session(user_id: Optional[uuid.UUID] = None) -> Session:
+    """
+    A session for read-only work: on the replica, unless `user_id` has just written something.
+    """
+    return SessionLocal() if _reads_from_primary(user_id) else ReadSessionLocal()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("The async database engine is disabled; set ASYNC_READ_ENDPOINTS=true.")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def async_read_session(user_id: Optional[uuid.UUID] = None):
+    if AsyncSessionLocal is None:
+        raise RuntimeError("The async database engine is disabled; set ASYNC_READ_ENDPOINTS=true.")
+    return AsyncSessionLocal() if _reads_from_primary(user_id) else AsyncReadSessionLocal()
+
+async def get_async_read_db():
+    async with async_read_session() as db:
+        yield db
@@ -0,0 +1,298 @@
+"""
+EXPLAIN-based regression check for the resource queries.
+
+Seeds a large synthetic dataset inside a transaction, runs the read functions from
+app/domains/*/resources.py while capturing the SQL they emit, and EXPLAINs every
+statement. The check fails if any of them plans a sequential scan over one of the
+large tables. Everything is rolled back at the end, so it is safe to point at a
+development database that has had its migrations applied.
+
+Every check belongs to the migration whose indexes it relies on, so adding a
+migration means adding its checks to CHECKS below.
+
+Usage:
+    python -m app.database.explain_check [--users N] [--products N] [--transactions N]
+"""
+import argparse
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.catalog_cache import invalidate_catalog
+from app.domains.categories import resources as category_resources
+from app.domains.merchants import resources as merchant_resources
+from app.domains.offers import resources as offer_resources
+from app.domains.products import resources as product_resources, schemas as product_schemas
+from app.domains.transactions import resources as transaction_resources
+from app.domains.users import resources as user_resources
+
+LARGE_TABLES = {"transactions", "products", "offers", "daily_spending_rollups"}
+
+SEED_CATEGORY = "Explain Check"
+SEED_EMAIL = "explain-check-1@example.invalid"
+SEED_MERCHANT = "Explain Merchant 1"
+# Stands in for the seeded merchant's id, which is only known once the data exists.
+MERCHANT = object()
+
+
+@dataclass(frozen=True)
+class Check:
+    migration: str
+    name: str
+    run: Callable[[Session, Dict[str, Any]], Any]
+
+
+def _transaction_checks(migration: str) -> List[Check]:
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    return [
+        Check(migration, "transactions.get_user_transactions",
+              lambda db, ctx: transaction_resources.get_user_transactions(db, ctx["user_id"], 1, 10)),
+        Check(migration, "transactions.get_user_transactions (dates)",
+              lambda db, ctx: transaction_resources.get_user_transactions(
+                  db, ctx["user_id"], 3, 10, start_date=month_ago, end_date=today)),
+        Check(migration, "transactions.get_user_transactions (category)",
+              lambda db, ctx: transaction_resources.get_user_transactions(
+                  db, ctx["user_id"], 1, 10, category_label=SEED_CATEGORY)),
+        Check(migration, "transactions.get_user_transactions_after",
+              lambda db, ctx: transaction_resources.get_user_transactions_after(
+                  db, ctx["user_id"], 10, after=ctx["cursor"])),
+        Check(migration, "transactions.get_transaction_by_id",
+              lambda db, ctx: transaction_resources.get_transaction_by_id(db, ctx["transaction_id"], ctx["user_id"])),
+    ]
+
+
+def _analytics_checks(migration: str) -> List[Check]:
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    return [
+        Check(migration, "transactions.get_amount_per_category",
+              lambda db, ctx: transaction_resources.get_amount_per_category(db, ctx["user_id"], month_ago, today)),
+        Check(migration, "transactions.get_count_per_category",
+              lambda db, ctx: transaction_resources.get_count_per_category(db, ctx["user_id"], None, None)),
+        Check(migration, "transactions.get_time_series_data",
+              lambda db, ctx: transaction_resources.get_time_series_data(db, ctx["user_id"], month_ago, today)),
+        Check(migration, "transactions.get_time_series_data (hourly, raw)",
+              lambda db, ctx: transaction_resources.get_time_series_data(
+                  db, ctx["user_id"], month_ago, today, "hour", "Asia/Jakarta")),
+        Check(migration, "transactions.get_dashboard_data",
+              lambda db, ctx: transaction_resources.get_dashboard_data(db, ctx["user_id"], month_ago, today)),
+    ]
+
+
+def _catalog_checks(migration: str) -> List[Check]:
+    return [
+        Check(migration, "products.get_all_products",
+              lambda db, ctx: product_resources.get_all_products(db, 1, 10)),
+        Check(migration, "products.get_all_products (category)",
+              lambda db, ctx: product_resources.get_all_products(db, 5, 10, category_label=SEED_CATEGORY)),
+        Check(migration, "offers.get_all_offers",
+              lambda db, ctx: offer_resources.get_all_offers(db, 1, 10)),
+        Check(migration, "offers.get_all_offers (category)",
+              lambda db, ctx: offer_resources.get_all_offers(db, 2, 10, category_label=SEED_CATEGORY)),
+        Check(migration, "merchants.get_all_merchants",
+              lambda db, ctx: merchant_resources.get_all_merchants(db, 1, 10)),
+        Check(migration, "categories.get_all_categories",
+              lambda db, ctx: category_resources.get_all_categories(db, 1, 10)),
+        Check(migration, "users.get_user_by_email",
+              lambda db, ctx: user_resources.get_user_by_email(db, SEED_EMAIL)),
+    ]
+
+
+def _search_checks(migration: str) -> List[Check]:
+    def search(**filters) -> Callable[[Session, Dict[str, Any]], Any]:
+        return lambda db, ctx: product_resources.search_products(
+            db, product_schemas.ProductSearch(**{
+                key: ctx["merchant_id"] if value is MERCHANT else value for key, value in filters.items()
+            }), 1, 10,
+        )
+
+    return [
+        Check(migration, "products.search_products (contains)", search(q="01234")),
+        Check(migration, "products.search_products (prefix)",
+              search(q="explain product 0000123", match=product_schemas.NameMatch.prefix)),
+        Check(migration, "products.search_products (price range)",
+              search(min_price=1000, max_price=2000, sort=product_schemas.SearchSort.price_asc)),
+        Check(migration, "products.search_products (price desc)",
+              search(sort=product_schemas.SearchSort.price_desc)),
+        Check(migration, "products.search_products (newest)", search(sort=product_schemas.SearchSort.newest)),
+        Check(migration, "products.search_products (merchant)", search(merchant_id=MERCHANT)),
+        Check(migration, "products.search_products (in stock)", search(in_stock=True)),
+    ]
+
+
+CHECKS: List[Check] = [
+    *_transaction_checks("0001"),
+    *_catalog_checks("0001"),
+    *_analytics_checks("0002"),
+    *_search_checks("0003"),
+]
+
+
+def seed(conn: Connection, users: int, products: int, transactions: int) -> None:
+    """
+    Inserts a synthetic dataset large enough for the planner to prefer indexes where they exist.
+    """
+    conn.execute(text("SELECT setseed(0.42)"))
+    conn.execute(text("INSERT INTO categories (label) VALUES (:label)"), {"label": SEED_CATEGORY})
+    conn.execute(text("INSERT INTO merchants (name) SELECT 'Explain Merchant ' || g FROM generate_series(1, 100) g"))
+    conn.execute(text(
+        """
+        INSERT INTO users (full_name, email, hashed_password)
+        SELECT 'Explain User ' || g, 'explain-check-' || g || '@example.invalid', 'x'
+        FROM generate_series(1, :n) g
+        """
+    ), {"n": users})
+    conn.execute(text(
+        """
+        WITH c AS (SELECT array_agg(id ORDER BY label) AS ids FROM categories),
+             m AS (SELECT array_agg(id ORDER BY name) AS ids FROM merchants)
+        INSERT INTO products (name, category_id, merchant_id, amount, stock)
+        SELECT 'Explain Product ' || lpad(g::text, 8, '0'),
+               c.ids[1 + (g % array_length(c.ids, 1))],
+               m.ids[1 + (g % array_length(m.ids, 1))],
+               (random() * 1000000)::numeric(15, 2),
+               (random() * 1000)::int
+        FROM generate_series(1, :n) g, c, m
+        """
+    ), {"n": products})
+    conn.execute(text(
+        """
+        WITH c AS (SELECT array_agg(id ORDER BY label) AS ids FROM categories)
+        INSERT INTO offers (name, description, category_id)
+        SELECT 'Explain Offer ' || lpad(g::text, 8, '0'), NULL, c.ids[1 + (g % array_length(c.ids, 1))]
+        FROM generate_series(1, :n) g, c
+        """
+    ), {"n": products})
+    conn.execute(text(
+        """
+        WITH u AS (SELECT array_agg(id ORDER BY id) AS ids FROM users),
+             p AS (SELECT array_agg(id ORDER BY id) AS ids FROM products)
+        INSERT INTO transactions (user_id, product_id, quantity, total_amount, transaction_type, transaction_date)
+        SELECT u.ids[1 + (g % array_length(u.ids, 1))],
+               p.ids[1 + ((g::bigint * 7919) % array_length(p.ids, 1))::int],
+               1,
+               (random() * 1000000)::numeric(15, 2),
+               'payment',
+               now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) g, u, p
+        """
+    ), {"n": transactions})
+    conn.execute(text(
+        """
+        INSERT INTO daily_spending_rollups (user_id, day, transaction_type, category_id, transaction_count, total_amount)
+        SELECT t.user_id, t.transaction_date::date, t.transaction_type, p.category_id, count(t.id), sum(t.total_amount)
+        FROM transactions t
+        LEFT JOIN products p ON p.id = t.product_id
+        WHERE t.user_id IN (SELECT id FROM users WHERE email LIKE 'explain-check-%')
+        GROUP BY t.user_id, t.transaction_date::date, t.transaction_type, p.category_id
+        """
+    ))
+    for table in ("users", "accounts", "merchants", "categories", "products", "offers", "transactions",
+                  "daily_spending_rollups"):
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+@contextmanager
+def capture_statements(conn: Connection) -> Iterator[List[Tuple[str, Any]]]:
+    """
+    Records every statement executed on the connection while the block runs.
+    """
+    captured: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+
+
+def _seq_scans(plan: Dict[str, Any]) -> List[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _is_total_count(statement: str) -> bool:
+    # A full COUNT(*) has to visit every matching row; it is reported but not failed.
+    return statement.lstrip().lower().startswith("select count(*)")
+
+
+def run_checks(conn: Connection, checks: List[Check]) -> List[str]:
+    """
+    Runs the checks and returns a list of failure descriptions.
+    """
+    db = Session(bind=conn)
+    user_id, transaction_id = conn.execute(text(
+        "SELECT u.id, t.id FROM users u JOIN transactions t ON t.user_id = u.id WHERE u.email = :email LIMIT 1"
+    ), {"email": SEED_EMAIL}).one()
+    items, _ = transaction_resources.get_user_transactions_after(db, user_id, 10)
+    ctx = {
+        "user_id": user_id,
+        "transaction_id": transaction_id,
+        "cursor": transaction_resources.encode_cursor(items[-1]),
+        "merchant_id": conn.execute(
+            text("SELECT id FROM merchants WHERE name = :name"), {"name": SEED_MERCHANT}
+        ).scalar_one(),
+    }
+
+    failures = []
+    for check in checks:
+        # Cached catalog pages would hide the queries being checked.
+        invalidate_catalog()
+        with capture_statements(conn) as statements:
+            check.run(db, ctx)
+        db.expunge_all()
+
+        for statement, parameters in statements:
+            if not statement.lstrip().lower().startswith(("select", "with")):
+                continue
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            scans = _seq_scans(plan[0]["Plan"])
+            if not scans:
+                continue
+            if _is_total_count(statement):
+                print(f"[{check.migration}] {check.name}: total count scans {', '.join(scans)} (allowed)")
+                continue
+            failures.append(f"[{check.migration}] {check.name}: Seq Scan on {', '.join(scans)}")
+        print(f"[{check.migration}] {check.name}: checked {len(statements)} statement(s)")
+    return failures
+
+
+def main() -> int:
+    from app.database.connection import engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--transactions", type=int, default=500000)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            seed(conn, args.users, args.products, args.transactions)
+            failures = run_checks(conn, CHECKS)
+        finally:
+            trans.rollback()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(CHECKS)} checks, {len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
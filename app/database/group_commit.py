@@ -0,0 +1,122 @@
+"""
+Group commit for the write endpoints.
+
+Request threads hand their write to a GroupCommitPipeline and wait for its result. A single
+background thread collects whatever arrives within the batching window (or until the batch is
+full), runs every write in one database transaction and commits once, so a batch costs one
+commit and one WAL flush instead of one per request.
+
+Each write is expected to isolate itself in a savepoint (see stage_deposit and stage_payment in
+app/domains/transactions/resources.py): a write that fails or raises is rolled back on its own and
+only its caller sees the failure. If the final commit fails, every caller in the batch gets the error.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+Write = Callable[[Session], Any]
+
+
+class GroupCommitPipeline:
+    def __init__(self, session_factory: Callable[[], Session], window_ms: float, max_batch: int):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[Write, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+
+    def submit(self, write: Write) -> Any:
+        """
+        Runs `write(db)` in the next batch and returns its result (or raises its exception)
+        once the batch has been committed.
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((write, future))
+        return future.result()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "writes": self.writes,
+            "mean_batch_size": round(self.writes / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def stop(self) -> None:
+        """
+        Commits what is already queued and stops the worker thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    def _collect(self, first: Tuple[Write, Future]) -> Tuple[List[Tuple[Write, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            self._apply(batch)
+            if stopping:
+                return
+
+    def _apply(self, batch: List[Tuple[Write, Future]]) -> None:
+        outcomes = []
+        db = None
+        try:
+            db = self.session_factory()
+            for write, future in batch:
+                try:
+                    outcomes.append((future, write(db), None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+            db.commit()
+        except Exception as e:
+            if db is not None:
+                db.rollback()
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            if db is not None:
+                db.close()
+
+        self.batches += 1
+        self.writes += len(batch)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,140 @@
+"""
+Versioned schema migrations.
+
+Migrations are plain SQL files in app/database/migrations named NNNN_description.sql.
+They are applied in version order, each in its own transaction, and recorded in the
+schema_migrations table together with a checksum of the file. Editing a migration that
+has already been applied is an error; add a new one instead.
+
+Usage:
+    python -m app.database.migrate
+"""
+import hashlib
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+# Arbitrary key so that several workers starting at once apply migrations one at a time.
+MIGRATION_LOCK_KEY = 7324001
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+
+def discover_migrations() -> List[Migration]:
+    """
+    Loads every migration file, sorted by version.
+    """
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if not match:
+            raise RuntimeError(f"Invalid migration file name: {path.name}")
+        migrations.append(Migration(version=match.group(1), name=match.group(2), sql=path.read_text()))
+
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration versions found.")
+    return migrations
+
+
+def _ensure_migrations_table(conn: Connection) -> None:
+    conn.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(4) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    ))
+
+
+def _applied_checksums(conn: Connection) -> Dict[str, str]:
+    rows = conn.execute(text("SELECT version, checksum FROM schema_migrations"))
+    return {version: checksum for version, checksum in rows}
+
+
+def _execute_script(conn: Connection, sql: str) -> None:
+    # Straight to the DBAPI cursor without parameters, so a % in the file is not taken for a placeholder.
+    # The SQLAlchemy transaction is begun first so conn.commit() and conn.rollback() cover the script.
+    if not conn.in_transaction():
+        conn.begin()
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """
+    Applies all pending migrations and returns the versions that were applied.
+    """
+    migrations = discover_migrations()
+    applied = []
+
+    # Session-level advisory lock, so everything below must share this one connection.
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+        try:
+            _ensure_migrations_table(conn)
+            done = _applied_checksums(conn)
+            conn.commit()
+
+            for migration in migrations:
+                if migration.version in done:
+                    if done[migration.version] != migration.checksum:
+                        raise RuntimeError(
+                            f"Migration {migration.version}_{migration.name} was modified after it was applied."
+                        )
+                    continue
+
+                _execute_script(conn, migration.sql)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name, checksum) VALUES (:version, :name, :checksum)"),
+                    {"version": migration.version, "name": migration.name, "checksum": migration.checksum},
+                )
+                conn.commit()
+                applied.append(migration.version)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+
+    return applied
+
+
+def main() -> int:
+    from app.database.connection import engine
+
+    applied = run_migrations(engine)
+    if applied:
+        print(f"Applied migrations: {', '.join(applied)}")
+    else:
+        print("Database schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
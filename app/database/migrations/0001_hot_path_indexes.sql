@@ -0,0 +1,28 @@
+-- Composite indexes matching the query shapes in app/domains/*/resources.py.
+
+-- Transaction history (offset and keyset pagination) and the time-series analytics:
+-- WHERE user_id = ? [AND transaction_date range] ORDER BY transaction_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS ix_transactions_user_id_transaction_date
+    ON transactions (user_id, transaction_date DESC, id DESC);
+
+-- Per-category analytics: WHERE user_id = ? AND transaction_type = 'payment' [AND transaction_date range]
+CREATE INDEX IF NOT EXISTS ix_transactions_user_id_type_date
+    ON transactions (user_id, transaction_type, transaction_date);
+
+-- Joins from transactions to products
+CREATE INDEX IF NOT EXISTS ix_transactions_product_id
+    ON transactions (product_id);
+
+-- Catalog listings: ORDER BY name, optionally filtered by category
+CREATE INDEX IF NOT EXISTS ix_products_name
+    ON products (name);
+CREATE INDEX IF NOT EXISTS ix_products_category_id_name
+    ON products (category_id, name);
+
+CREATE INDEX IF NOT EXISTS ix_offers_name
+    ON offers (name);
+CREATE INDEX IF NOT EXISTS ix_offers_category_id_name
+    ON offers (category_id, name);
+
+CREATE INDEX IF NOT EXISTS ix_merchants_name
+    ON merchants (name);
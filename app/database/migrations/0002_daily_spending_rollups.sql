@@ -0,0 +1,27 @@
+-- Per-user, per-day, per-category aggregates of transactions, read by the /analytics endpoints.
+-- category_id deliberately has no foreign key: like the raw join it replaces, rows whose category
+-- has been deleted still count towards the time series but drop out of the per-category views.
+CREATE TABLE IF NOT EXISTS daily_spending_rollups (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    transaction_type VARCHAR(20) NOT NULL,
+    category_id UUID,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    total_amount NUMERIC(18, 2) NOT NULL DEFAULT 0.00
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_daily_spending_rollups_key
+    ON daily_spending_rollups (
+        user_id, day, transaction_type,
+        (COALESCE(category_id, '00000000-0000-0000-0000-000000000000'::uuid))
+    );
+
+-- Initial backfill; later rebuilds go through python -m app.domains.transactions.rebuild_rollups
+INSERT INTO daily_spending_rollups (user_id, day, transaction_type, category_id, transaction_count, total_amount)
+SELECT t.user_id, t.transaction_date::date, t.transaction_type, p.category_id, count(t.id), sum(t.total_amount)
+FROM transactions t
+LEFT JOIN products p ON p.id = t.product_id
+WHERE t.transaction_date IS NOT NULL
+GROUP BY t.user_id, t.transaction_date::date, t.transaction_type, p.category_id
+ON CONFLICT DO NOTHING;
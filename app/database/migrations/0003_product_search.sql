@@ -0,0 +1,23 @@
+-- Indexes behind GET /products/search (see _search_stmts in app/domains/products/resources.py).
+-- pg_trgm ships with PostgreSQL's contrib package; creating it needs CREATE privilege on the database.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Name search: prefix and substring ILIKE patterns both use the trigram index.
+CREATE INDEX IF NOT EXISTS ix_products_name_trgm
+    ON products USING gin (name gin_trgm_ops);
+
+-- Price range filter and the price sorts: ORDER BY amount [DESC], id [DESC]
+CREATE INDEX IF NOT EXISTS ix_products_amount_id
+    ON products (amount, id);
+
+-- Newest first: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS ix_products_created_at_id
+    ON products (created_at DESC, id DESC);
+
+-- Merchant filter: WHERE merchant_id = ? ORDER BY name
+CREATE INDEX IF NOT EXISTS ix_products_merchant_id_name
+    ON products (merchant_id, name);
+
+-- In-stock browsing: WHERE stock > 0 ORDER BY name
+CREATE INDEX IF NOT EXISTS ix_products_in_stock_name
+    ON products (name) WHERE stock > 0;
@@ -0,0 +1,22 @@
+-- Two-phase payments: a hold moves the amount from accounts.balance to accounts.holded_balance and
+-- takes the quantity out of products.stock; capture turns it into a completed payment transaction,
+-- release (or expiry) gives both back. See the hold statements in app/domains/transactions/resources.py.
+CREATE TABLE IF NOT EXISTS payment_holds (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    product_id UUID NOT NULL REFERENCES products(id),
+    quantity INTEGER NOT NULL,
+    amount NUMERIC(15, 2) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'held',
+    transaction_id UUID REFERENCES transactions(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    settled_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Expiry sweep: WHERE status = 'held' AND expires_at <= now() ORDER BY expires_at
+CREATE INDEX IF NOT EXISTS ix_payment_holds_held_expires_at
+    ON payment_holds (expires_at) WHERE status = 'held';
+
+CREATE INDEX IF NOT EXISTS ix_payment_holds_user_id
+    ON payment_holds (user_id);
@@ -0,0 +1,3 @@
+-- Access tokens carry the user's token_version; bumping it (on a password or email change)
+-- revokes every token issued before. See get_current_principal in app/middleware/auth.py.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
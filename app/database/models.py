@@ -7,6 +7,8 @@ from sqlalchemy import (
     Numeric,
     ForeignKey,
     TIMESTAMP,
+    Date,
+    Index,
     func
 )
 from sqlalchemy.orm import relationship, declarative_base
@@ -22,6 +24,8 @@ class User(Base):
     address = Column(Text)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
+    # Bumped on password and email changes; tokens carrying an older version are rejected.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     account = relationship("Account", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -95,3 +99,45 @@ class Transaction(Base):
 
     user = relationship("User", back_populates="transactions")
     product = relationship("Product", back_populates="transactions")
+
+# Balance and stock reserved by POST /transactions/holds until they are captured, released or expire.
+class PaymentHold(Base):
+    __tablename__ = "payment_holds"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    amount = Column(Numeric(15, 2), nullable=False)
+    status = Column(String(20), nullable=False, default='held')
+    transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id"), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    settled_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+# Per-user, per-day, per-category totals maintained by create_payment and create_deposit.
+# category_id has no foreign key on purpose, see migration 0002.
+class DailySpendingRollup(Base):
+    __tablename__ = "daily_spending_rollups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    transaction_type = Column(String(20), nullable=False)
+    category_id = Column(UUID(as_uuid=True), nullable=True)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(18, 2), nullable=False, default=0.00)
+
+
+# Secondary indexes for the hot query paths. These are created by
+# app/database/migrations/0001_hot_path_indexes.sql and mirrored here so the ORM metadata matches the schema.
+Index("ix_transactions_user_id_transaction_date", Transaction.user_id, Transaction.transaction_date.desc(), Transaction.id.desc())
+Index("ix_transactions_user_id_type_date", Transaction.user_id, Transaction.transaction_type, Transaction.transaction_date)
+Index("ix_transactions_product_id", Transaction.product_id)
+Index("ix_products_name", Product.name)
+Index("ix_products_category_id_name", Product.category_id, Product.name)
+Index("ix_offers_name", Offer.name)
+Index("ix_offers_category_id_name", Offer.category_id, Offer.name)
+Index("ix_merchants_name", Merchant.name)
+Index("ix_payment_holds_held_expires_at", PaymentHold.expires_at, postgresql_where=PaymentHold.status == 'held')
+Index("ix_payment_holds_user_id", PaymentHold.user_id)
@@ -0,0 +1,140 @@
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Hashable, List, Optional
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class CountStrategy(str, Enum):
+    """
+    How a paginated list endpoint computes its `total`:
+    exact    - COUNT(*) over the filtered rows on every request
+    cached   - exact, but reused for COUNT_CACHE_TTL_SECONDS
+    estimate - the planner's row estimate (pg_class.reltuples when unfiltered, EXPLAIN otherwise)
+    none     - no total at all; clients rely on `has_more`
+    """
+    exact = "exact"
+    cached = "cached"
+    estimate = "estimate"
+    none = "none"
+
+
+@dataclass(frozen=True)
+class PageResult:
+    items: List[Any]
+    total: Optional[int]
+    has_more: bool
+    total_strategy: CountStrategy
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) wrapper so any select() can be explained with its bind parameters intact.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+_count_cache = TTLCache(maxsize=4096, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+
+def count_strategy_for(endpoint: str) -> CountStrategy:
+    return CountStrategy(settings.COUNT_STRATEGIES.get(endpoint, settings.COUNT_STRATEGY))
+
+
+def _count_stmt(base: Select) -> Select:
+    return select(func.count()).select_from(base.order_by(None).subquery())
+
+
+def _reltuples_stmt(table: str):
+    return text("SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)").bindparams(
+        table=table
+    )
+
+
+def _plan_rows(plan: Any) -> int:
+    # psycopg2 decodes the JSON plan, asyncpg hands it back as a string.
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _build_page(rows: List[Any], page: int, size: int, total: Optional[int], strategy: CountStrategy) -> PageResult:
+    items = rows[:size]
+    return PageResult(items=items, total=total, has_more=len(rows) > size, total_strategy=strategy)
+
+
+def _page_stmt(stmt: Select, page: int, size: int) -> Select:
+    # One extra row tells us whether another page exists without counting anything.
+    return stmt.offset((page - 1) * size).limit(size + 1)
+
+
+def paginate(
+    db: Session, endpoint: str, stmt: Select, base: Select, page: int, size: int,
+    count_key: Hashable = None, table: Optional[str] = None,
+) -> PageResult:
+    """
+    Runs one page of `stmt` and computes its total with the endpoint's configured strategy.
+    The page items are the result rows of `stmt`, which should select just the columns the response needs.
+
+    `base` is the filtered select without ordering; it is what gets counted or explained.
+    `count_key` identifies the filters for the cached strategy, and `table` may be given when `base`
+    is unfiltered so the estimate can come straight from pg_class.
+    """
+    strategy = count_strategy_for(endpoint)
+    rows = db.execute(_page_stmt(stmt, page, size)).all()
+
+    total = None
+    if strategy == CountStrategy.exact:
+        total = db.execute(_count_stmt(base)).scalar()
+    elif strategy == CountStrategy.cached:
+        key = (endpoint, count_key)
+        total = _count_cache.get(key)
+        if total is None:
+            total = db.execute(_count_stmt(base)).scalar()
+            _count_cache.set(key, total)
+    elif strategy == CountStrategy.estimate:
+        if table:
+            total = db.execute(_reltuples_stmt(table)).scalar()
+        else:
+            total = _plan_rows(db.execute(Explain(base)).scalar())
+    return _build_page(rows, page, size, total, strategy)
+
+
+async def paginate_async(
+    db: AsyncSession, endpoint: str, stmt: Select, base: Select, page: int, size: int,
+    count_key: Hashable = None, table: Optional[str] = None,
+) -> PageResult:
+    strategy = count_strategy_for(endpoint)
+    rows = (await db.execute(_page_stmt(stmt, page, size))).all()
+
+    total = None
+    if strategy == CountStrategy.exact:
+        total = await db.scalar(_count_stmt(base))
+    elif strategy == CountStrategy.cached:
+        key = (endpoint, count_key)
+        total = _count_cache.get(key)
+        if total is None:
+            total = await db.scalar(_count_stmt(base))
+            _count_cache.set(key, total)
+    elif strategy == CountStrategy.estimate:
+        if table:
+            total = await db.scalar(_reltuples_stmt(table))
+        else:
+            total = _plan_rows(await db.scalar(Explain(base)))
+    return _build_page(rows, page, size, total, strategy)
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolStats:
+    """
+    Per-worker counters for one connection pool. The checkout wait covers the time spent in the
+    pool's queue plus, when the pool grows, opening the new connection; it excludes pre-ping.
+    """
+
+    def __init__(self, recent: int = 2048):
+        self._lock = threading.Lock()
+        self._waits: "deque[float]" = deque(maxlen=recent)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.checked_out_peak = 0
+        self.pool: Optional[Pool] = None
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if self.pool is not None:
+                self.checked_out_peak = max(self.checked_out_peak, self.pool.checkedout())
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def _percentile_ms(self, ordered, pct: float) -> Optional[float]:
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._waits)
+            waits = self.checkouts + self.timeouts
+            report = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checked_out_peak": self.checked_out_peak,
+                "wait_ms_avg": round(self.wait_total / waits * 1000, 3) if waits else None,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+                "wait_ms_recent": {
+                    "samples": len(recent),
+                    "p50": self._percentile_ms(recent, 50),
+                    "p95": self._percentile_ms(recent, 95),
+                    "p99": self._percentile_ms(recent, 99),
+                },
+            }
+        if isinstance(self.pool, QueuePool):
+            report.update(
+                size=self.pool.size(),
+                max_overflow=self.pool._max_overflow,
+                checked_out=self.pool.checkedout(),
+                checked_in=self.pool.checkedin(),
+                overflow=max(self.pool.overflow(), 0),
+                timeout_seconds=self.pool.timeout(),
+            )
+        return report
+
+
+class _TimedCheckout:
+    # SQLAlchemy has no event that fires before a checkout starts waiting, so the wait is
+    # timed around the pool's own _do_get instead.
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - start)
+
+
+def instrumented_pool_class(base: type, stats: PoolStats) -> type:
+    """
+    Returns a subclass of `base` (QueuePool or AsyncAdaptedQueuePool) that reports into `stats`.
+    Pass it to create_engine(poolclass=...) and then call instrument_pool on the engine's pool.
+    """
+    return type(f"Instrumented{base.__name__}", (_TimedCheckout, base), {"stats": stats})
+
+
+def instrument_pool(pool: Pool, stats: PoolStats) -> None:
+    stats.pool = pool
+    event.listen(pool, "checkout", lambda *args: stats.record_checkout())
+    event.listen(pool, "checkin", lambda *args: stats.record_checkin())
+    event.listen(pool, "connect", lambda *args: stats.record_connect())
+    event.listen(pool, "invalidate", lambda *args: stats.record_invalidation())
+
+
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+replica_pool_stats = PoolStats()
+async_replica_pool_stats = PoolStats()
+
+
+def pool_snapshots() -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshots of every pool this worker has actually created, keyed by engine name.
+    """
+    pools = {
+        "sync": sync_pool_stats, "async": async_pool_stats,
+        "replica": replica_pool_stats, "async_replica": async_replica_pool_stats,
+    }
+    return {name: stats.snapshot() for name, stats in pools.items() if stats.pool is not None}
+
@@ -1,9 +1,9 @@
 from sqlalchemy.orm import Session
 from fastapi import Depends
-from app.database.connection import get_db
+from app.database.connection import get_read_db
 from . import usecases, schemas
 
-def get_category_usecase(db: Session = Depends(get_db)) -> usecases.CategoryUseCase:
+def get_category_usecase(db: Session = Depends(get_read_db)) -> usecases.CategoryUseCase:
     return usecases.CategoryUseCase(db)
 
 class CategoryHandler:
@@ -11,5 +11,8 @@ class CategoryHandler:
         self.usecase = usecase
 
     def get_all_categories(self, page: int, size: int):
-        items, total = self.usecase.list_all_categories(page, size)
-        return schemas.CategoryList(items=items, total=total, page=page, size=size)
+        cached = self.usecase.list_all_categories(page, size)
+        return schemas.CategoryList(
+            items=cached.items, total=cached.total, page=page, size=size,
+            has_more=cached.has_more, total_strategy=cached.total_strategy.value,
+        ), cached.etag
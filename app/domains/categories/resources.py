@@ -1,10 +1,15 @@
+from dataclasses import replace
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Tuple, List
+from app.core.catalog_cache import CatalogPage, get_page
 from app.database.models import Category
+from app.database.pagination import PageResult, paginate
+from . import schemas
 
-def get_all_categories(db: Session, page: int, size: int) -> Tuple[List[Category], int]:
-    offset = (page - 1) * size
-    query = db.query(Category)
-    total = query.count()
-    items = query.order_by(Category.label).offset(offset).limit(size).all()
-    return items, total
\ No newline at end of file
+def _load_categories(db: Session, page: int, size: int) -> PageResult:
+    base = select(Category.id, Category.label)
+    result = paginate(db, "categories", base.order_by(Category.label), base, page, size, table="categories")
+    return replace(result, items=[schemas.Category.model_construct(id=row.id, label=row.label) for row in result.items])
+
+def get_all_categories(db: Session, page: int, size: int) -> CatalogPage:
+    return get_page("categories", page, size, None, lambda: _load_categories(db, page, size))
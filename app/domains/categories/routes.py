@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from app.core.catalog_cache import conditional_response
 from . import handlers, schemas
 
 router = APIRouter()
 
 @router.get("/", response_model=schemas.CategoryList)
 def read_all_categories(
+    request: Request,
+    response: Response,
     handler: handlers.CategoryHandler = Depends(),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size")
 ):
     """
     Retrieve all product categories with pagination. Publicly accessible.
+    Responses carry an ETag; send it back in If-None-Match to get an empty 304 when nothing changed.
     """
-    return handler.get_all_categories(page=page, size=size)
\ No newline at end of file
+    body, etag = handler.get_all_categories(page=page, size=size)
+    return conditional_response(request, response, body, etag)
\ No newline at end of file
@@ -1,6 +1,6 @@
 import uuid
-from pydantic import BaseModel, ConfigDict
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 
 class Category(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -9,6 +9,8 @@ class Category(BaseModel):
 
 class CategoryList(BaseModel):
     items: List[Category]
-    total: int
+    total: Optional[int] = None
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    has_more: bool
+    total_strategy: str = Field(..., description="How total was computed: exact, cached, estimate or none")
\ No newline at end of file
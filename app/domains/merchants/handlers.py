@@ -1,9 +1,9 @@
 from sqlalchemy.orm import Session
 from fastapi import Depends
-from app.database.connection import get_db
+from app.database.connection import get_read_db
 from . import usecases, schemas
 
-def get_merchant_usecase(db: Session = Depends(get_db)) -> usecases.MerchantUseCase:
+def get_merchant_usecase(db: Session = Depends(get_read_db)) -> usecases.MerchantUseCase:
     return usecases.MerchantUseCase(db)
 
 class MerchantHandler:
@@ -11,5 +11,8 @@ class MerchantHandler:
         self.usecase = usecase
 
     def get_all_merchants(self, page: int, size: int):
-        items, total = self.usecase.list_all_merchants(page, size)
-        return schemas.MerchantList(items=items, total=total, page=page, size=size)
+        cached = self.usecase.list_all_merchants(page, size)
+        return schemas.MerchantList(
+            items=cached.items, total=cached.total, page=page, size=size,
+            has_more=cached.has_more, total_strategy=cached.total_strategy.value,
+        ), cached.etag
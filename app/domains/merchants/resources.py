@@ -1,10 +1,18 @@
+from dataclasses import replace
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Tuple, List
+from app.core.catalog_cache import CatalogPage, get_page
 from app.database.models import Merchant
+from app.database.pagination import PageResult, paginate
+from . import schemas
 
-def get_all_merchants(db: Session, page: int, size: int) -> Tuple[List[Merchant], int]:
-    offset = (page - 1) * size
-    query = db.query(Merchant)
-    total = query.count()
-    items = query.order_by(Merchant.name).offset(offset).limit(size).all()
-    return items, total
\ No newline at end of file
+def _load_merchants(db: Session, page: int, size: int) -> PageResult:
+    base = select(Merchant.id, Merchant.name, Merchant.created_at)
+    result = paginate(db, "merchants", base.order_by(Merchant.name), base, page, size, table="merchants")
+    return replace(result, items=[
+        schemas.Merchant.model_construct(id=row.id, name=row.name, created_at=row.created_at)
+        for row in result.items
+    ])
+
+def get_all_merchants(db: Session, page: int, size: int) -> CatalogPage:
+    return get_page("merchants", page, size, None, lambda: _load_merchants(db, page, size))
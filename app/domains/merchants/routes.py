@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from app.core.catalog_cache import conditional_response
 from . import handlers, schemas
 
 router = APIRouter()
 
 @router.get("/", response_model=schemas.MerchantList)
 def read_all_merchants(
+    request: Request,
+    response: Response,
     handler: handlers.MerchantHandler = Depends(),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size")
 ):
     """
     Retrieve all merchants with pagination. Publicly accessible.
+    Responses carry an ETag; send it back in If-None-Match to get an empty 304 when nothing changed.
     """
-    return handler.get_all_merchants(page=page, size=size)
+    body, etag = handler.get_all_merchants(page=page, size=size)
+    return conditional_response(request, response, body, etag)
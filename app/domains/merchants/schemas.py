@@ -1,6 +1,6 @@
 import uuid
-from pydantic import BaseModel, ConfigDict
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 
 class Merchant(BaseModel):
@@ -11,6 +11,8 @@ class Merchant(BaseModel):
 
 class MerchantList(BaseModel):
     items: List[Merchant]
-    total: int
+    total: Optional[int] = None
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    has_more: bool
+    total_strategy: str = Field(..., description="How total was computed: exact, cached, estimate or none")
\ No newline at end of file
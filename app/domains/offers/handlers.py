@@ -1,16 +1,34 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends
 from typing import Optional
-from app.database.connection import get_db
+from app.database.connection import get_read_db, get_async_read_db
 from . import usecases, schemas
 
-def get_offer_usecase(db: Session = Depends(get_db)) -> usecases.OfferUseCase:
+def get_offer_usecase(db: Session = Depends(get_read_db)) -> usecases.OfferUseCase:
     return usecases.OfferUseCase(db)
 
+def get_async_offer_usecase(db: AsyncSession = Depends(get_async_read_db)) -> usecases.AsyncOfferUseCase:
+    return usecases.AsyncOfferUseCase(db)
+
 class OfferHandler:
     def __init__(self, usecase: usecases.OfferUseCase = Depends(get_offer_usecase)):
         self.usecase = usecase
 
     def get_all_offers(self, page: int, size: int, category: Optional[str]):
-        items, total = self.usecase.list_all_offers(page, size, category)
-        return schemas.OfferList(items=items, total=total, page=page, size=size)
+        cached = self.usecase.list_all_offers(page, size, category)
+        return schemas.OfferList(
+            items=cached.items, total=cached.total, page=page, size=size,
+            has_more=cached.has_more, total_strategy=cached.total_strategy.value,
+        ), cached.etag
+
+class AsyncOfferHandler:
+    def __init__(self, usecase: usecases.AsyncOfferUseCase = Depends(get_async_offer_usecase)):
+        self.usecase = usecase
+
+    async def get_all_offers(self, page: int, size: int, category: Optional[str]):
+        cached = await self.usecase.list_all_offers(page, size, category)
+        return schemas.OfferList(
+            items=cached.items, total=cached.total, page=page, size=size,
+            has_more=cached.has_more, total_strategy=cached.total_strategy.value,
+        ), cached.etag
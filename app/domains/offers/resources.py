@@ -1,14 +1,60 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import Tuple, List, Optional
+from dataclasses import replace
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+from app.core.catalog_cache import CatalogPage, get_page, get_page_async
 from app.database.models import Offer, Category
+from app.database.pagination import PageResult, paginate, paginate_async
+from . import schemas
 
-def get_all_offers(db: Session, page: int, size: int, category_label: Optional[str] = None) -> Tuple[List[Offer], int]:
-    offset = (page - 1) * size
-    query = db.query(Offer).options(joinedload(Offer.category))
+def _offers_stmts(category_label: Optional[str]) -> Tuple:
+    base = select(Offer.id)
+    if category_label:
+        base = base.join(Category).where(Category.label == category_label)
 
+    stmt = (
+        select(
+            Offer.id, Offer.name, Offer.description,
+            Category.id.label("category_id"), Category.label.label("category_label"),
+        )
+        .outerjoin(Category, Offer.category_id == Category.id)
+        .order_by(Offer.name)
+    )
     if category_label:
-        query = query.join(Category).filter(Category.label == category_label)
+        stmt = stmt.where(Category.label == category_label)
+    return stmt, base
+
+def _to_schemas(result: PageResult) -> PageResult:
+    return replace(result, items=[
+        schemas.Offer.model_construct(
+            id=row.id, name=row.name, description=row.description,
+            category=schemas.CategoryInfo.model_construct(id=row.category_id, label=row.category_label)
+            if row.category_id else None,
+        )
+        for row in result.items
+    ])
+
+def _load_offers(db: Session, page: int, size: int, category_label: Optional[str]) -> PageResult:
+    stmt, base = _offers_stmts(category_label)
+    result = paginate(
+        db, "offers", stmt, base, page, size,
+        count_key=category_label, table=None if category_label else "offers",
+    )
+    return _to_schemas(result)
+
+async def _load_offers_async(db: AsyncSession, page: int, size: int, category_label: Optional[str]) -> PageResult:
+    stmt, base = _offers_stmts(category_label)
+    result = await paginate_async(
+        db, "offers", stmt, base, page, size,
+        count_key=category_label, table=None if category_label else "offers",
+    )
+    return _to_schemas(result)
+
+def get_all_offers(db: Session, page: int, size: int, category_label: Optional[str] = None) -> CatalogPage:
+    return get_page("offers", page, size, category_label, lambda: _load_offers(db, page, size, category_label))
 
-    total = query.count()
-    items = query.order_by(Offer.name).offset(offset).limit(size).all()
-    return items, total
\ No newline at end of file
+async def get_all_offers_async(db: AsyncSession, page: int, size: int, category_label: Optional[str] = None) -> CatalogPage:
+    return await get_page_async(
+        "offers", page, size, category_label, lambda: _load_offers_async(db, page, size, category_label)
+    )
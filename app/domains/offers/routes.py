@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import Optional
+from app.core.catalog_cache import conditional_response
 from . import handlers, schemas
 
 router = APIRouter()
+# Same endpoints served by async routes; app.main includes one router or the other.
+async_router = APIRouter()
 
 @router.get("/", response_model=schemas.OfferList)
 def read_all_offers(
+    request: Request,
+    response: Response,
     handler: handlers.OfferHandler = Depends(),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -13,5 +18,23 @@ def read_all_offers(
 ):
     """
     Retrieve all offers with pagination and optional category filter. Publicly accessible.
+    Responses carry an ETag; send it back in If-None-Match to get an empty 304 when nothing changed.
     """
-    return handler.get_all_offers(page=page, size=size, category=category)
+    body, etag = handler.get_all_offers(page=page, size=size, category=category)
+    return conditional_response(request, response, body, etag)
+
+@async_router.get("/", response_model=schemas.OfferList)
+async def read_all_offers_async(
+    request: Request,
+    response: Response,
+    handler: handlers.AsyncOfferHandler = Depends(),
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(10, ge=1, le=100, description="Page size"),
+    category: Optional[str] = Query(None, description="Filter by category label (e.g., 'Elektronik')")
+):
+    """
+    Retrieve all offers with pagination and optional category filter. Publicly accessible.
+    Responses carry an ETag; send it back in If-None-Match to get an empty 304 when nothing changed.
+    """
+    body, etag = await handler.get_all_offers(page=page, size=size, category=category)
+    return conditional_response(request, response, body, etag)
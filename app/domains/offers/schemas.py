@@ -1,5 +1,5 @@
 import uuid
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 
 class CategoryInfo(BaseModel):
@@ -16,6 +16,8 @@ class Offer(BaseModel):
 
 class OfferList(BaseModel):
     items: List[Offer]
-    total: int
+    total: Optional[int] = None
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    has_more: bool
+    total_strategy: str = Field(..., description="How total was computed: exact, cached, estimate or none")
\ No newline at end of file
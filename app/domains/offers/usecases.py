@@ -1,3 +1,4 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 from . import resources
@@ -7,4 +8,11 @@ class OfferUseCase:
         self.db = db
     
     def list_all_offers(self, page: int, size: int, category: Optional[str]):
-        return resources.get_all_offers(self.db, page, size, category_label=category)
\ No newline at end of file
+        return resources.get_all_offers(self.db, page, size, category_label=category)
+
+class AsyncOfferUseCase:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_all_offers(self, page: int, size: int, category: Optional[str]):
+        return await resources.get_all_offers_async(self.db, page, size, category_label=category)
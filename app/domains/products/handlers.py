@@ -1,16 +1,61 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 from typing import Optional
-from app.database.connection import get_db
+from app.database.connection import get_read_db, get_async_read_db
+from app.database.pagination import PageResult
 from . import usecases, schemas
 
-def get_product_usecase(db: Session = Depends(get_db)) -> usecases.ProductUseCase:
+# Shorter substrings have too few trigrams for the index to narrow anything down.
+MIN_CONTAINS_LENGTH = 3
+
+def _check_search(search: schemas.ProductSearch) -> None:
+    if search.min_price is not None and search.max_price is not None and search.min_price > search.max_price:
+        raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price.")
+    if search.q and search.match == schemas.NameMatch.contains and len(search.q) < MIN_CONTAINS_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Substring search needs at least {MIN_CONTAINS_LENGTH} characters; use match=prefix for shorter terms.",
+        )
+
+def _search_response(result: PageResult, page: int, size: int) -> schemas.ProductList:
+    return schemas.ProductList(
+        items=result.items, total=result.total, page=page, size=size,
+        has_more=result.has_more, total_strategy=result.total_strategy.value,
+    )
+
+def get_product_usecase(db: Session = Depends(get_read_db)) -> usecases.ProductUseCase:
     return usecases.ProductUseCase(db)
 
+def get_async_product_usecase(db: AsyncSession = Depends(get_async_read_db)) -> usecases.AsyncProductUseCase:
+    return usecases.AsyncProductUseCase(db)
+
 class ProductHandler:
     def __init__(self, usecase: usecases.ProductUseCase = Depends(get_product_usecase)):
         self.usecase = usecase
 
     def get_all_products(self, page: int, size: int, category: Optional[str]):
-        items, total = self.usecase.list_all_products(page, size, category)
-        return schemas.ProductList(items=items, total=total, page=page, size=size)
\ No newline at end of file
+        cached = self.usecase.list_all_products(page, size, category)
+        return schemas.ProductList(
+            items=cached.items, total=cached.total, page=page, size=size,
+            has_more=cached.has_more, total_strategy=cached.total_strategy.value,
+        ), cached.etag
+
+    def search_products(self, search: schemas.ProductSearch, page: int, size: int) -> schemas.ProductList:
+        _check_search(search)
+        return _search_response(self.usecase.search_products(search, page, size), page, size)
+
+class AsyncProductHandler:
+    def __init__(self, usecase: usecases.AsyncProductUseCase = Depends(get_async_product_usecase)):
+        self.usecase = usecase
+
+    async def get_all_products(self, page: int, size: int, category: Optional[str]):
+        cached = await self.usecase.list_all_products(page, size, category)
+        return schemas.ProductList(
+            items=cached.items, total=cached.total, page=page, size=size,
+            has_more=cached.has_more, total_strategy=cached.total_strategy.value,
+        ), cached.etag
+
+    async def search_products(self, search: schemas.ProductSearch, page: int, size: int) -> schemas.ProductList:
+        _check_search(search)
+        return _search_response(await self.usecase.search_products(search, page, size), page, size)
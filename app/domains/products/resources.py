@@ -1,17 +1,107 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import Tuple, List, Optional
-from app.database.models import Product, Category
-
-def get_all_products(db: Session, page: int, size: int, category_label: Optional[str] = None) -> Tuple[List[Product], int]:
-    offset = (page - 1) * size
-    query = db.query(Product).options(
-        joinedload(Product.category),
-        joinedload(Product.merchant)
+from dataclasses import replace
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+from app.core.catalog_cache import CatalogPage, get_page, get_page_async
+from app.database.models import Product, Category, Merchant
+from app.database.pagination import PageResult, paginate, paginate_async
+from . import schemas
+
+def _products_stmts(category_label: Optional[str]) -> Tuple:
+    base = select(Product.id)
+    if category_label:
+        base = base.join(Category).where(Category.label == category_label)
+
+    stmt = (
+        select(
+            Product.id, Product.name, Product.amount, Product.stock, Product.created_at,
+            Category.id.label("category_id"), Category.label.label("category_label"),
+            Merchant.id.label("merchant_id"), Merchant.name.label("merchant_name"),
+        )
+        .outerjoin(Category, Product.category_id == Category.id)
+        .outerjoin(Merchant, Product.merchant_id == Merchant.id)
+        .order_by(Product.name)
     )
-    
     if category_label:
-        query = query.join(Category).filter(Category.label == category_label)
+        stmt = stmt.where(Category.label == category_label)
+    return stmt, base
+
+_SEARCH_ORDER = {
+    schemas.SearchSort.name: (Product.name, Product.id),
+    schemas.SearchSort.price_asc: (Product.amount, Product.id),
+    schemas.SearchSort.price_desc: (Product.amount.desc(), Product.id.desc()),
+    schemas.SearchSort.newest: (Product.created_at.desc(), Product.id.desc()),
+}
+
+def _like_pattern(search: schemas.ProductSearch) -> str:
+    escaped = search.q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if search.match == schemas.NameMatch.prefix else f"%{escaped}%"
+
+def _search_stmts(search: schemas.ProductSearch) -> Tuple:
+    """
+    ILIKE on the name is served by the trigram index from migration 0003, for prefixes and substrings alike;
+    the price, merchant and stock filters and every sort order have btree indexes of their own.
+    """
+    conditions = []
+    if search.q:
+        conditions.append(Product.name.ilike(_like_pattern(search), escape="\\"))
+    if search.min_price is not None:
+        conditions.append(Product.amount >= search.min_price)
+    if search.max_price is not None:
+        conditions.append(Product.amount <= search.max_price)
+    if search.merchant_id:
+        conditions.append(Product.merchant_id == search.merchant_id)
+    if search.in_stock:
+        conditions.append(Product.stock > 0)
+
+    base = select(Product.id).where(*conditions)
+    stmt, _ = _products_stmts(None)
+    stmt = stmt.where(*conditions).order_by(None).order_by(*_SEARCH_ORDER[search.sort])
+    return stmt, base
+
+def _to_schemas(result: PageResult) -> PageResult:
+    # Rows come straight from typed columns, so the schemas are built without re-validation.
+    return replace(result, items=[
+        schemas.Product.model_construct(
+            id=row.id, name=row.name, amount=row.amount, stock=row.stock, created_at=row.created_at,
+            category=schemas.CategoryInfo.model_construct(id=row.category_id, label=row.category_label)
+            if row.category_id else None,
+            merchant=schemas.MerchantInfo.model_construct(id=row.merchant_id, name=row.merchant_name)
+            if row.merchant_id else None,
+        )
+        for row in result.items
+    ])
+
+def _load_products(db: Session, page: int, size: int, category_label: Optional[str]) -> PageResult:
+    stmt, base = _products_stmts(category_label)
+    result = paginate(
+        db, "products", stmt, base, page, size,
+        count_key=category_label, table=None if category_label else "products",
+    )
+    return _to_schemas(result)
+
+async def _load_products_async(db: AsyncSession, page: int, size: int, category_label: Optional[str]) -> PageResult:
+    stmt, base = _products_stmts(category_label)
+    result = await paginate_async(
+        db, "products", stmt, base, page, size,
+        count_key=category_label, table=None if category_label else "products",
+    )
+    return _to_schemas(result)
+
+def get_all_products(db: Session, page: int, size: int, category_label: Optional[str] = None) -> CatalogPage:
+    return get_page("products", page, size, category_label, lambda: _load_products(db, page, size, category_label))
+
+async def get_all_products_async(db: AsyncSession, page: int, size: int, category_label: Optional[str] = None) -> CatalogPage:
+    return await get_page_async(
+        "products", page, size, category_label, lambda: _load_products_async(db, page, size, category_label)
+    )
+
+def search_products(db: Session, search: schemas.ProductSearch, page: int, size: int) -> PageResult:
+    # Not cached: the space of searches is too large for the catalog cache to get hits.
+    stmt, base = _search_stmts(search)
+    return _to_schemas(paginate(db, "products_search", stmt, base, page, size, count_key=search))
 
-    total = query.count()
-    items = query.order_by(Product.name).offset(offset).limit(size).all()
-    return items, total
\ No newline at end of file
+async def search_products_async(db: AsyncSession, search: schemas.ProductSearch, page: int, size: int) -> PageResult:
+    stmt, base = _search_stmts(search)
+    return _to_schemas(await paginate_async(db, "products_search", stmt, base, page, size, count_key=search))
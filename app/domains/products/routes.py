@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+import uuid
+from decimal import Decimal
 from typing import Optional
+from app.core.catalog_cache import conditional_response
+from app.core.responses import trusted_response
 from . import handlers, schemas
 
 router = APIRouter()
+# Same endpoints served by async routes; app.main includes one router or the other.
+async_router = APIRouter()
 
 @router.get("/", response_model=schemas.ProductList)
 def read_all_products(
+    request: Request,
+    response: Response,
     handler: handlers.ProductHandler = Depends(),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -13,5 +21,67 @@ def read_all_products(
 ):
     """
     Retrieve all products with pagination and optional category filter. Publicly accessible.
+    Responses carry an ETag; send it back in If-None-Match to get an empty 304 when nothing changed.
     """
-    return handler.get_all_products(page=page, size=size, category=category)
\ No newline at end of file
+    body, etag = handler.get_all_products(page=page, size=size, category=category)
+    return conditional_response(request, response, body, etag)
+
+@router.get("/search", response_model=schemas.ProductList)
+def search_products(
+    handler: handlers.ProductHandler = Depends(),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Text to look for in the product name"),
+    match: schemas.NameMatch = Query(schemas.NameMatch.contains, description="Match q as a name prefix or anywhere in the name"),
+    min_price: Optional[Decimal] = Query(None, ge=0, description="Lowest price, inclusive"),
+    max_price: Optional[Decimal] = Query(None, ge=0, description="Highest price, inclusive"),
+    merchant_id: Optional[uuid.UUID] = Query(None, description="Only products of this merchant"),
+    in_stock: bool = Query(False, description="Only products with stock left"),
+    sort: schemas.SearchSort = Query(schemas.SearchSort.name, description="name, price_asc, price_desc or newest"),
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(10, ge=1, le=100, description="Page size")
+):
+    """
+    Search products by name (case-insensitive) with optional price, merchant and stock filters. Publicly accessible.
+    """
+    search = schemas.ProductSearch(
+        q=q, match=match, min_price=min_price, max_price=max_price,
+        merchant_id=merchant_id, in_stock=in_stock, sort=sort,
+    )
+    return trusted_response(handler.search_products(search, page=page, size=size))
+
+@async_router.get("/", response_model=schemas.ProductList)
+async def read_all_products_async(
+    request: Request,
+    response: Response,
+    handler: handlers.AsyncProductHandler = Depends(),
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(10, ge=1, le=100, description="Page size"),
+    category: Optional[str] = Query(None, description="Filter by category label (e.g., 'Elektronik')")
+):
+    """
+    Retrieve all products with pagination and optional category filter. Publicly accessible.
+    Responses carry an ETag; send it back in If-None-Match to get an empty 304 when nothing changed.
+    """
+    body, etag = await handler.get_all_products(page=page, size=size, category=category)
+    return conditional_response(request, response, body, etag)
+
+@async_router.get("/search", response_model=schemas.ProductList)
+async def search_products_async(
+    handler: handlers.AsyncProductHandler = Depends(),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Text to look for in the product name"),
+    match: schemas.NameMatch = Query(schemas.NameMatch.contains, description="Match q as a name prefix or anywhere in the name"),
+    min_price: Optional[Decimal] = Query(None, ge=0, description="Lowest price, inclusive"),
+    max_price: Optional[Decimal] = Query(None, ge=0, description="Highest price, inclusive"),
+    merchant_id: Optional[uuid.UUID] = Query(None, description="Only products of this merchant"),
+    in_stock: bool = Query(False, description="Only products with stock left"),
+    sort: schemas.SearchSort = Query(schemas.SearchSort.name, description="name, price_asc, price_desc or newest"),
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(10, ge=1, le=100, description="Page size")
+):
+    """
+    Search products by name (case-insensitive) with optional price, merchant and stock filters. Publicly accessible.
+    """
+    search = schemas.ProductSearch(
+        q=q, match=match, min_price=min_price, max_price=max_price,
+        merchant_id=merchant_id, in_stock=in_stock, sort=sort,
+    )
+    return trusted_response(await handler.search_products(search, page=page, size=size))
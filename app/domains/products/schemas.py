@@ -1,8 +1,9 @@
 import uuid
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
+from enum import Enum
 
 class CategoryInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -26,6 +27,29 @@ class Product(BaseModel):
 
 class ProductList(BaseModel):
     items: List[Product]
-    total: int
+    total: Optional[int] = None
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    has_more: bool
+    total_strategy: str = Field(..., description="How total was computed: exact, cached, estimate or none")
+
+class NameMatch(str, Enum):
+    prefix = "prefix"
+    contains = "contains"
+
+class SearchSort(str, Enum):
+    name = "name"
+    price_asc = "price_asc"
+    price_desc = "price_desc"
+    newest = "newest"
+
+class ProductSearch(BaseModel):
+    # Frozen so a search can be used as the count cache key.
+    model_config = ConfigDict(frozen=True)
+    q: Optional[str] = None
+    match: NameMatch = NameMatch.contains
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    merchant_id: Optional[uuid.UUID] = None
+    in_stock: bool = False
+    sort: SearchSort = SearchSort.name
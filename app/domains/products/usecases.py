@@ -1,10 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from . import resources
+from . import resources, schemas
 
 class ProductUseCase:
     def __init__(self, db: Session):
         self.db = db
     
     def list_all_products(self, page: int, size: int, category: Optional[str]):
-        return resources.get_all_products(self.db, page, size, category_label=category)
\ No newline at end of file
+        return resources.get_all_products(self.db, page, size, category_label=category)
+
+    def search_products(self, search: schemas.ProductSearch, page: int, size: int):
+        return resources.search_products(self.db, search, page, size)
+
+class AsyncProductUseCase:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_all_products(self, page: int, size: int, category: Optional[str]):
+        return await resources.get_all_products_async(self.db, page, size, category_label=category)
+
+    async def search_products(self, search: schemas.ProductSearch, page: int, size: int):
+        return await resources.search_products_async(self.db, search, page, size)
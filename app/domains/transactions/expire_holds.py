@@ -0,0 +1,82 @@
+"""
+Releases payment holds that were neither captured nor released before their expires_at.
+
+The API runs this every HOLD_SWEEP_INTERVAL_SECONDS in each worker (an advisory lock lets only one
+of them sweep at a time). It can also be run by hand or from cron:
+
+Usage:
+    python -m app.domains.transactions.expire_holds [--batch-size N]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.catalog_cache import invalidate_products
+from app.core.config import settings
+from app.database.connection import SessionLocal, mark_recent_write
+from app.middleware.auth import invalidate_principals
+from . import resources
+
+logger = logging.getLogger(__name__)
+
+_sweeper: Optional[asyncio.Task] = None
+
+
+def sweep_expired_holds(batch_size: int) -> int:
+    """
+    Expires holds in batches until none are left. Returns how many were expired.
+    """
+    expired = 0
+    with SessionLocal() as db:
+        while True:
+            rows = resources.expire_holds(db, limit=batch_size)
+            if not rows:
+                return expired
+            expired += len(rows)
+            user_ids = {row.user_id for row in rows}
+            invalidate_principals(user_ids)
+            mark_recent_write(*user_ids)
+            invalidate_products({row.product_id for row in rows})
+            if len(rows) < batch_size:
+                return expired
+
+
+async def _sweep_forever(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(sweep_expired_holds, settings.HOLD_SWEEP_BATCH_SIZE)
+        except Exception:
+            # The next run retries; a hold is only ever expired once.
+            logger.exception("Expiring payment holds failed")
+
+
+def start_hold_sweeper() -> None:
+    global _sweeper
+    if settings.HOLD_SWEEP_INTERVAL_SECONDS > 0 and _sweeper is None:
+        _sweeper = asyncio.get_running_loop().create_task(_sweep_forever(settings.HOLD_SWEEP_INTERVAL_SECONDS))
+
+
+def stop_hold_sweeper() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        _sweeper = None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.HOLD_SWEEP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    expired = sweep_expired_holds(args.batch_size)
+    print(f"Expired {expired} hold(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
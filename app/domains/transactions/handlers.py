@@ -1,13 +1,145 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 import uuid
-from typing import Optional, List
-from datetime import date
+import csv
+import io
+import json
+import math
+import time
+from decimal import Decimal
+from typing import Any, Dict, Iterator, Optional, List
+from pydantic import ValidationError
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from datetime import date, datetime, timedelta
+from app.core.config import settings
 from app.database.connection import get_db
-from . import usecases, schemas
+from app.middleware.auth import get_current_user_async_read_db, get_current_user_read_db
+from app.database.pagination import CountStrategy
+from . import usecases, schemas, resources
 
-def get_transaction_usecase(db: Session = Depends(get_db)) -> usecases.TransactionUseCase:
-    return usecases.TransactionUseCase(db)
+def get_transaction_usecase(
+    db: Session = Depends(get_db), read_db: Session = Depends(get_current_user_read_db)
+) -> usecases.TransactionUseCase:
+    return usecases.TransactionUseCase(db, read_db=read_db)
+
+def get_async_analytics_usecase(
+    db: AsyncSession = Depends(get_current_user_async_read_db)
+) -> usecases.AsyncAnalyticsUseCase:
+    return usecases.AsyncAnalyticsUseCase(db)
+
+_EXPORT_CHUNK_ROWS = 500
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+def _csv_chunks(rows: Iterator[Any]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(resources.EXPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_export_value(value) for value in row])
+        if count % _EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _ndjson_chunks(rows: Iterator[Any]) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: _export_value(value) for column, value in zip(resources.EXPORT_COLUMNS, row)}))
+        if len(lines) == _EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+_EXPORT_FORMATS = {
+    "csv": ("text/csv", _csv_chunks),
+    "ndjson": ("application/x-ndjson", _ndjson_chunks),
+}
+
+# Upper bound of the number of buckets per granularity and day in the range.
+_BUCKETS_PER_DAY = {"hour": 24, "day": 1, "week": 1 / 7, "month": 1 / 28}
+
+def _check_time_series_args(start_date: date, end_date: date, granularity: schemas.TimeGranularity, tz: str) -> ZoneInfo:
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone '{tz}'.")
+    buckets = ((end_date - start_date).days + 1) * _BUCKETS_PER_DAY[granularity.value]
+    if buckets > settings.ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The range holds more than {settings.ANALYTICS_MAX_BUCKETS} {granularity.value} buckets; use a coarser granularity.",
+        )
+    return zone
+
+def _data_point(bucket: datetime, count: int, amount: Decimal, zone: ZoneInfo) -> schemas.TimeSeriesDataPoint:
+    return schemas.TimeSeriesDataPoint(
+        date=bucket.date(), bucket_start=bucket.replace(tzinfo=zone), transaction_count=count, total_amount=amount
+    )
+
+def _time_series_response(
+    granularity: schemas.TimeGranularity, tz: str, zone: ZoneInfo, results, category_results
+) -> schemas.TimeSeriesResponse:
+    categories = None
+    if category_results is not None:
+        series: Dict[str, List[schemas.TimeSeriesDataPoint]] = {}
+        for category, bucket, count, amount in category_results:
+            series.setdefault(category, []).append(_data_point(bucket, count, amount, zone))
+        categories = [schemas.CategoryTimeSeries(category=category, data=data) for category, data in series.items()]
+    return schemas.TimeSeriesResponse(
+        granularity=granularity,
+        timezone=tz,
+        data=[_data_point(bucket, count, amount, zone) for bucket, count, amount in results],
+        categories=categories,
+    )
+
+def _dashboard_response(start_date: date, end_date: date, zone: ZoneInfo, rows) -> schemas.DashboardResponse:
+    # Splits the GROUPING SETS rows back into the three dashboard sections; see resources._dashboard_stmt.
+    per_category, per_day = [], {}
+    transaction_count, total_amount = 0, Decimal(0)
+    for row in rows:
+        if row.grouping == 1:
+            if row.category is not None and row.payment_count:
+                per_category.append(row)
+        elif row.grouping == 2:
+            per_day[row.day] = row
+        else:
+            transaction_count, total_amount = row.transaction_count, row.total_amount
+    data = []
+    for offset in range((end_date - start_date).days + 1):
+        day = start_date + timedelta(days=offset)
+        row = per_day.get(day)
+        bucket = datetime.combine(day, datetime.min.time())
+        data.append(_data_point(bucket, row.transaction_count, row.total_amount, zone) if row
+                    else _data_point(bucket, 0, Decimal(0), zone))
+    return schemas.DashboardResponse(
+        start_date=start_date,
+        end_date=end_date,
+        transaction_count=transaction_count,
+        total_amount=total_amount,
+        amount_per_category=[
+            schemas.AmountPerCategory(category=row.category, total_amount=row.payment_amount)
+            for row in sorted(per_category, key=lambda row: row.payment_amount, reverse=True)
+        ],
+        count_per_category=[
+            schemas.CountPerCategory(category=row.category, transaction_count=row.payment_count)
+            for row in sorted(per_category, key=lambda row: row.payment_count, reverse=True)
+        ],
+        time_series=schemas.TimeSeriesResponse(
+            granularity=schemas.TimeGranularity.day, timezone=settings.ANALYTICS_ROLLUP_TIMEZONE, data=data
+        ),
+    )
 
 class TransactionHandler:
     def __init__(self, usecase: usecases.TransactionUseCase = Depends(get_transaction_usecase)):
@@ -25,6 +157,106 @@ class TransactionHandler:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
         return transaction
 
+    def process_hold(self, user_id: uuid.UUID, payment: schemas.PaymentCreate):
+        hold, error_msg = self.usecase.execute_hold(user_id, payment)
+        if error_msg:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
+        return hold
+
+    def _raise_hold_error(self, error_msg: str):
+        if error_msg == resources.HOLD_NOT_FOUND:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error_msg)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error_msg)
+
+    def process_capture(self, user_id: uuid.UUID, hold_id: uuid.UUID):
+        transaction, error_msg = self.usecase.execute_capture(user_id, hold_id)
+        if error_msg:
+            self._raise_hold_error(error_msg)
+        return transaction
+
+    def process_release(self, user_id: uuid.UUID, hold_id: uuid.UUID):
+        hold, error_msg = self.usecase.execute_release(user_id, hold_id)
+        if error_msg:
+            self._raise_hold_error(error_msg)
+        return hold
+
+    def process_checkout(self, user_id: uuid.UUID, checkout: schemas.CheckoutCreate):
+        transactions, error_msg = self.usecase.execute_checkout(user_id, checkout)
+        if error_msg:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
+        total_amount = sum((t.total_amount for t in transactions), Decimal('0'))
+        return schemas.CheckoutResult(
+            items=transactions,
+            total_amount=total_amount,
+            living_points_earned=math.floor(total_amount * Decimal('0.01')),
+        )
+
+    def _parse_bulk_upload(self, content_type: str, body: bytes) -> List[Dict[str, Any]]:
+        try:
+            if content_type.startswith("text/csv"):
+                reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+                if not reader.fieldnames or not {"user_id", "amount"} <= set(reader.fieldnames):
+                    raise ValueError("CSV uploads need a header row with 'user_id' and 'amount' columns.")
+                return list(reader)
+            rows = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError, csv.Error):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The upload could not be parsed.")
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON uploads must be a list of objects.")
+        return rows
+
+    def process_bulk_deposits(self, operator_email: str, content_type: str, body: bytes) -> schemas.BulkDepositReport:
+        if operator_email not in settings.BULK_DEPOSIT_OPERATORS:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to run bulk deposits.")
+
+        started = time.perf_counter()
+        raw_rows = self._parse_bulk_upload(content_type, body)
+        if len(raw_rows) > settings.BULK_DEPOSIT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.BULK_DEPOSIT_MAX_ROWS} rows per upload.",
+            )
+
+        results = {}
+        valid_rows = []
+        for row_no, raw in enumerate(raw_rows, start=1):
+            result = schemas.BulkDepositRowResult(
+                row=row_no, user_id=str(raw.get("user_id")), amount=str(raw.get("amount")), status="rejected"
+            )
+            try:
+                row = schemas.BulkDepositRow.model_validate({"user_id": raw.get("user_id"), "amount": raw.get("amount")})
+            except ValidationError as e:
+                error = e.errors()[0]
+                result.error = f"{error['loc'][0]}: {error['msg']}"
+            else:
+                valid_rows.append((row_no, row.user_id, row.amount))
+            results[row_no] = result
+
+        total_amount = Decimal('0')
+        amounts = {row_no: amount for row_no, _, amount in valid_rows}
+        if valid_rows:
+            for row_no, (transaction_id, error) in self.usecase.execute_bulk_deposits(valid_rows).items():
+                result = results[row_no]
+                result.transaction_id = transaction_id
+                result.error = error
+                if transaction_id:
+                    result.status = "applied"
+                    total_amount += amounts[row_no]
+
+        elapsed = time.perf_counter() - started
+        applied = sum(1 for result in results.values() if result.status == "applied")
+        return schemas.BulkDepositReport(
+            total_rows=len(results),
+            applied=applied,
+            rejected=len(results) - applied,
+            total_amount=total_amount,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(len(results) / elapsed, 1) if elapsed else 0.0,
+            results=list(results.values()),
+        )
+
     def get_transaction(self, transaction_id: uuid.UUID, user_id: uuid.UUID):
         transaction = self.usecase.get_transaction_details(transaction_id, user_id)
         if not transaction:
@@ -38,8 +270,42 @@ class TransactionHandler:
         if start_date and end_date and start_date > end_date:
             raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
         
-        items, total = self.usecase.list_user_transactions(user_id, page, size, category, start_date, end_date)
-        return schemas.TransactionHistory(items=items, total=total, page=page, size=size)
+        result = self.usecase.list_user_transactions(user_id, page, size, category, start_date, end_date)
+        return schemas.TransactionHistory(
+            items=result.items, total=result.total, page=page, size=size,
+            has_more=result.has_more, total_strategy=result.total_strategy.value,
+        )
+
+    def export_my_transactions(
+        self, user_id: uuid.UUID, format: str,
+        category: Optional[str], start_date: Optional[date], end_date: Optional[date]
+    ) -> StreamingResponse:
+        if start_date and end_date and start_date > end_date:
+            raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
+
+        rows = self.usecase.stream_user_transactions(user_id, category, start_date, end_date)
+        media_type, body = _EXPORT_FORMATS[format]
+        return StreamingResponse(
+            body(rows),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+        )
+
+    def get_my_transactions_after(
+        self, user_id: uuid.UUID, size: int, after: Optional[str],
+        category: Optional[str], start_date: Optional[date], end_date: Optional[date]
+    ):
+        if start_date and end_date and start_date > end_date:
+            raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
+
+        try:
+            items, next_cursor = self.usecase.list_user_transactions_after(user_id, size, after, category, start_date, end_date)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return schemas.TransactionHistory(
+            items=items, size=size, has_more=next_cursor is not None,
+            total_strategy=CountStrategy.none.value, next_cursor=next_cursor,
+        )
 
     def get_amount_per_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[schemas.AmountPerCategory]:
         if start_date and end_date and start_date > end_date:
@@ -55,10 +321,58 @@ class TransactionHandler:
         results = self.usecase.get_count_by_category(user_id, start_date, end_date)
         return [schemas.CountPerCategory(category=cat, transaction_count=count) for cat, count in results]
 
-    def get_time_series(self, user_id: uuid.UUID, start_date: date, end_date: date) -> schemas.TimeSeriesResponse:
+    def get_time_series(
+        self, user_id: uuid.UUID, start_date: date, end_date: date,
+        granularity: schemas.TimeGranularity, tz: str, by_category: bool
+    ) -> schemas.TimeSeriesResponse:
+        zone = _check_time_series_args(start_date, end_date, granularity, tz)
+        results = self.usecase.get_spending_time_series(user_id, start_date, end_date, granularity.value, tz)
+        category_results = None
+        if by_category:
+            category_results = self.usecase.get_category_time_series(user_id, start_date, end_date, granularity.value, tz)
+        return _time_series_response(granularity, tz, zone, results, category_results)
+
+    def get_dashboard(self, user_id: uuid.UUID, start_date: date, end_date: date) -> schemas.DashboardResponse:
+        zone = _check_time_series_args(
+            start_date, end_date, schemas.TimeGranularity.day, settings.ANALYTICS_ROLLUP_TIMEZONE
+        )
+        rows = self.usecase.get_dashboard(user_id, start_date, end_date)
+        return _dashboard_response(start_date, end_date, zone, rows)
+
+class AsyncAnalyticsHandler:
+    def __init__(self, usecase: usecases.AsyncAnalyticsUseCase = Depends(get_async_analytics_usecase)):
+        self.usecase = usecase
+
+    async def get_amount_per_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[schemas.AmountPerCategory]:
         if start_date and end_date and start_date > end_date:
             raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
-        
-        results = self.usecase.get_spending_time_series(user_id, start_date, end_date)
-        data_points = [schemas.TimeSeriesDataPoint(date=d, transaction_count=c, total_amount=a) for d, c, a in results]
-        return schemas.TimeSeriesResponse(data=data_points)
+
+        results = await self.usecase.get_spending_by_category(user_id, start_date, end_date)
+        return [schemas.AmountPerCategory(category=cat, total_amount=amount) for cat, amount in results]
+
+    async def get_count_per_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[schemas.CountPerCategory]:
+        if start_date and end_date and start_date > end_date:
+            raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
+
+        results = await self.usecase.get_count_by_category(user_id, start_date, end_date)
+        return [schemas.CountPerCategory(category=cat, transaction_count=count) for cat, count in results]
+
+    async def get_time_series(
+        self, user_id: uuid.UUID, start_date: date, end_date: date,
+        granularity: schemas.TimeGranularity, tz: str, by_category: bool
+    ) -> schemas.TimeSeriesResponse:
+        zone = _check_time_series_args(start_date, end_date, granularity, tz)
+        results = await self.usecase.get_spending_time_series(user_id, start_date, end_date, granularity.value, tz)
+        category_results = None
+        if by_category:
+            category_results = await self.usecase.get_category_time_series(
+                user_id, start_date, end_date, granularity.value, tz
+            )
+        return _time_series_response(granularity, tz, zone, results, category_results)
+
+    async def get_dashboard(self, user_id: uuid.UUID, start_date: date, end_date: date) -> schemas.DashboardResponse:
+        zone = _check_time_series_args(
+            start_date, end_date, schemas.TimeGranularity.day, settings.ANALYTICS_ROLLUP_TIMEZONE
+        )
+        rows = await self.usecase.get_dashboard(user_id, start_date, end_date)
+        return _dashboard_response(start_date, end_date, zone, rows)
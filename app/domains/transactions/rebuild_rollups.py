@@ -0,0 +1,38 @@
+"""
+Rebuilds or verifies the daily_spending_rollups table from the raw transactions.
+
+Usage:
+    python -m app.domains.transactions.rebuild_rollups [--user USER_ID] [--verify]
+
+--verify only compares the stored rollups with a fresh aggregate and exits non-zero on any difference.
+"""
+import argparse
+import sys
+import uuid
+
+from app.database.connection import SessionLocal
+from . import resources
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", type=uuid.UUID, default=None, help="Only rebuild/verify this user's rollups")
+    parser.add_argument("--verify", action="store_true", help="Compare instead of rebuilding")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = resources.count_rollup_mismatches(db, user_id=args.user)
+            print(f"{mismatches} mismatching rollup row(s)")
+            return 1 if mismatches else 0
+
+        written = resources.rebuild_daily_rollups(db, user_id=args.user)
+        print(f"Rebuilt {written} rollup row(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
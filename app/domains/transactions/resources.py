@@ -1,28 +1,63 @@
+from dataclasses import replace
 from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc, cast, Date
-from typing import Tuple, Optional, List
+from sqlalchemy import (
+    DateTime, and_, bindparam, cast, desc, func, literal_column, select, text, true, tuple_, Row, Select,
+)
+from typing import Dict, Iterator, Tuple, Optional, List
 import uuid
-from datetime import date, timedelta
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
 import math
 
 from . import schemas
-from app.database.models import Account, Product, Transaction, User, Category
+from app.core.config import settings
+from app.database.models import Account, Product, Transaction, User, Category, DailySpendingRollup, PaymentHold
+from app.database.pagination import PageResult, paginate
+
+# The grouping key of daily_spending_rollups; the same expression backs its unique index.
+_ROLLUP_CONFLICT_KEY = (
+    "(user_id, day, transaction_type, "
+    "(COALESCE(category_id, '00000000-0000-0000-0000-000000000000'::uuid)))"
+)
+
+_ROLLUP_SOURCE = """
+    SELECT t.user_id, t.transaction_date::date AS day, t.transaction_type, p.category_id,
+           count(t.id) AS transaction_count, sum(t.total_amount) AS total_amount
+    FROM transactions t
+    LEFT JOIN products p ON p.id = t.product_id
+    WHERE t.transaction_date IS NOT NULL {where}
+    GROUP BY t.user_id, t.transaction_date::date, t.transaction_type, p.category_id
+"""
+
+_ROLLUP_COLUMNS = "user_id, day, transaction_type, category_id, transaction_count, total_amount"
+
+def _insert_deposit(db: Session, user_id: uuid.UUID, deposit: schemas.DepositCreate) -> Transaction:
+    account = db.query(Account).filter(Account.user_id == user_id).with_for_update().one()
+    account.balance += deposit.amount
+    db_transaction = Transaction(
+        user_id=user_id,
+        total_amount=deposit.amount,
+        status='completed',
+        transaction_type='deposit'
+    )
+    db.add(db_transaction)
+    db.flush()
+    apply_transaction_to_rollup(db, db_transaction.id)
+    return db_transaction
+
 
 def create_deposit(db: Session, user_id: uuid.UUID, deposit: schemas.DepositCreate) -> Transaction:
     """
     Handles depositing money into a user's account within a single transaction.
     """
     try:
-        account = db.query(Account).filter(Account.user_id == user_id).with_for_update().one()
-        account.balance += deposit.amount
-        db_transaction = Transaction(
-            user_id=user_id,
-            total_amount=deposit.amount,
-            status='completed',
-            transaction_type='deposit'
-        )
-        db.add(db_transaction)
+        db_transaction = _insert_deposit(db, user_id, deposit)
         db.commit()
         db.refresh(db_transaction)
         return db_transaction
@@ -31,52 +66,574 @@ def create_deposit(db: Session, user_id: uuid.UUID, deposit: schemas.DepositCrea
         raise e
 
 
+def _insert_payment(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate) -> Tuple[Optional[Transaction], Optional[str]]:
+    # Leaves committing, or rolling back after a failure, to the caller.
+    account = db.query(Account).filter(Account.user_id == user_id).with_for_update().one()
+    product = db.query(Product).filter(Product.id == payment.product_id).with_for_update().first()
+
+    if not product:
+        return None, "Product not found."
+
+    if product.stock < payment.quantity:
+        return None, f"Insufficient stock for {product.name}. Available: {product.stock}, Requested: {payment.quantity}."
+
+    total_cost = product.amount * payment.quantity
+    if account.balance < total_cost:
+        return None, f"Insufficient balance. Required: {total_cost}, Available: {account.balance}."
+
+    account.balance -= total_cost
+
+    product.stock -= payment.quantity
+
+    points_to_add = math.floor(total_cost * Decimal('0.01'))
+    account.living_points += points_to_add
+
+    db_transaction = Transaction(
+        user_id=user_id,
+        product_id=payment.product_id,
+        quantity=payment.quantity,
+        total_amount=total_cost,
+        status='completed',
+        transaction_type='payment'
+    )
+    db.add(db_transaction)
+    db.flush()
+    apply_transaction_to_rollup(db, db_transaction.id)
+    return db_transaction, None
+
+
 def create_payment(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate) -> Tuple[Optional[Transaction], Optional[str]]:
     """
     Handles a product payment within a single, atomic database transaction.
     This now includes logic to add living points.
     """
+    try:
+        db_transaction, error_msg = _insert_payment(db, user_id, payment)
+        if error_msg:
+            db.rollback()
+            return None, error_msg
+        db.commit()
+        db.refresh(db_transaction)
+        return db_transaction, None
+    except Exception as e:
+        db.rollback()
+        return None, "An unexpected error occurred during the transaction."
+
+
+# Payment in a single statement. The account is updated first (its CTE feeds the product update),
+# so it takes its row locks in the same account-then-product order as create_payment and
+# create_checkout. Each UPDATE guards its own invariant and PostgreSQL re-checks the guard
+# against the latest row version after waiting on a lock.
+_ATOMIC_PAYMENT_SQL = f"""
+WITH price AS (
+    SELECT p.id, p.amount, p.category_id, c.label AS category_label, p.name
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    WHERE p.id = :product_id
+), account AS (
+    UPDATE accounts a
+    SET balance = a.balance - price.amount * :quantity,
+        living_points = a.living_points + floor(price.amount * :quantity * 0.01)::int
+    FROM price
+    WHERE a.user_id = :user_id AND a.balance >= price.amount * :quantity
+    RETURNING price.amount * :quantity AS total_cost
+), product AS (
+    UPDATE products p
+    SET stock = p.stock - :quantity
+    FROM account, price
+    WHERE p.id = price.id AND p.stock >= :quantity AND p.amount = price.amount
+    RETURNING p.id, account.total_cost
+), tx AS (
+    INSERT INTO transactions (user_id, product_id, quantity, total_amount, status, transaction_type)
+    SELECT CAST(:user_id AS uuid), product.id, :quantity, product.total_cost, 'completed', 'payment'
+    FROM product
+    RETURNING id, user_id, product_id, quantity, total_amount, status, transaction_type, transaction_date
+), rollup AS (
+    INSERT INTO daily_spending_rollups ({_ROLLUP_COLUMNS})
+    SELECT tx.user_id, tx.transaction_date::date, tx.transaction_type, price.category_id, 1, tx.total_amount
+    FROM tx, price
+    ON CONFLICT {_ROLLUP_CONFLICT_KEY} DO UPDATE SET
+        transaction_count = daily_spending_rollups.transaction_count + EXCLUDED.transaction_count,
+        total_amount = daily_spending_rollups.total_amount + EXCLUDED.total_amount
+)
+SELECT tx.*, price.name AS product_name, price.category_id, price.category_label
+FROM tx, price
+"""
+
+
+def _payment_failure_reason(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate) -> str:
+    """
+    Works out why an atomic payment matched no rows, using the same checks and messages as create_payment.
+    Only runs on the failure path, after the rollback.
+    """
+    product = db.query(Product.name, Product.stock, Product.amount).filter(Product.id == payment.product_id).first()
+    if not product:
+        return "Product not found."
+    if product.stock < payment.quantity:
+        return f"Insufficient stock for {product.name}. Available: {product.stock}, Requested: {payment.quantity}."
+    balance = db.query(Account.balance).filter(Account.user_id == user_id).scalar()
+    total_cost = product.amount * payment.quantity
+    if balance < total_cost:
+        return f"Insufficient balance. Required: {total_cost}, Available: {balance}."
+    return "An unexpected error occurred during the transaction."
+
+
+def _payment_row_to_schema(row) -> schemas.Transaction:
+    # Row of _ATOMIC_PAYMENT_SQL or _CAPTURE_SQL: the transaction plus its product and category.
+    category = (
+        schemas.CategoryInfo(id=row["category_id"], label=row["category_label"])
+        if row["category_id"] and row["category_label"] is not None else None
+    )
+    return schemas.Transaction(
+        id=row["id"],
+        user_id=row["user_id"],
+        quantity=row["quantity"],
+        total_amount=row["total_amount"],
+        status=row["status"],
+        transaction_date=row["transaction_date"],
+        transaction_type=row["transaction_type"],
+        product=schemas.ProductInfo(id=row["product_id"], name=row["product_name"], category=category),
+    )
+
+
+def _run_atomic_payment(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate):
+    return db.execute(
+        text(_ATOMIC_PAYMENT_SQL),
+        {"user_id": user_id, "product_id": payment.product_id, "quantity": payment.quantity},
+    ).mappings().first()
+
+
+def create_payment_atomic(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate) -> Tuple[Optional[schemas.Transaction], Optional[str]]:
+    """
+    Same contract as create_payment, but the balance debit, stock decrement, living points,
+    transaction insert and rollup update all happen in one guarded statement, so row locks are
+    held for one round trip plus the commit.
+    """
+    try:
+        row = _run_atomic_payment(db, user_id, payment)
+
+        if row is None:
+            db.rollback()
+            return None, _payment_failure_reason(db, user_id, payment)
+
+        db.commit()
+        return _payment_row_to_schema(row), None
+    except Exception as e:
+        db.rollback()
+        return None, "An unexpected error occurred during the transaction."
+
+
+# Two-phase payments. Each step is one guarded statement, like _ATOMIC_PAYMENT_SQL, so the account
+# and product rows stay locked for a single round trip. Rows are always locked hold, then account,
+# then product, and payments lock account then product, so the steps cannot deadlock each other.
+_HOLD_SQL = """
+WITH price AS (
+    SELECT p.id, p.amount FROM products p WHERE p.id = :product_id
+), account AS (
+    UPDATE accounts a
+    SET balance = a.balance - price.amount * :quantity,
+        holded_balance = a.holded_balance + price.amount * :quantity
+    FROM price
+    WHERE a.user_id = :user_id AND a.balance >= price.amount * :quantity
+    RETURNING price.amount * :quantity AS total_cost
+), product AS (
+    UPDATE products p
+    SET stock = p.stock - :quantity
+    FROM account, price
+    WHERE p.id = price.id AND p.stock >= :quantity AND p.amount = price.amount
+    RETURNING p.id, account.total_cost
+)
+INSERT INTO payment_holds (user_id, product_id, quantity, amount, status, expires_at)
+SELECT CAST(:user_id AS uuid), product.id, :quantity, product.total_cost, 'held',
+       now() + make_interval(secs => :ttl_seconds)
+FROM product
+RETURNING id, user_id, product_id, quantity, amount, status, created_at, expires_at, transaction_id
+"""
+
+_CAPTURE_SQL = f"""
+WITH hold AS (
+    UPDATE payment_holds h
+    SET status = 'captured', transaction_id = :transaction_id, settled_at = now()
+    WHERE h.id = :hold_id AND h.user_id = :user_id AND h.status = 'held' AND h.expires_at > now()
+    RETURNING h.user_id, h.product_id, h.quantity, h.amount
+), account AS (
+    UPDATE accounts a
+    SET holded_balance = a.holded_balance - hold.amount,
+        living_points = a.living_points + floor(hold.amount * 0.01)::int
+    FROM hold
+    WHERE a.user_id = hold.user_id
+    RETURNING a.user_id
+), price AS (
+    SELECT p.id, p.name, p.category_id, c.label AS category_label
+    FROM hold
+    JOIN products p ON p.id = hold.product_id
+    LEFT JOIN categories c ON c.id = p.category_id
+), tx AS (
+    INSERT INTO transactions (id, user_id, product_id, quantity, total_amount, status, transaction_type)
+    SELECT CAST(:transaction_id AS uuid), hold.user_id, hold.product_id, hold.quantity, hold.amount, 'completed', 'payment'
+    FROM hold, account
+    RETURNING id, user_id, product_id, quantity, total_amount, status, transaction_type, transaction_date
+), rollup AS (
+    INSERT INTO daily_spending_rollups ({_ROLLUP_COLUMNS})
+    SELECT tx.user_id, tx.transaction_date::date, tx.transaction_type, price.category_id, 1, tx.total_amount
+    FROM tx, price
+    ON CONFLICT {_ROLLUP_CONFLICT_KEY} DO UPDATE SET
+        transaction_count = daily_spending_rollups.transaction_count + EXCLUDED.transaction_count,
+        total_amount = daily_spending_rollups.total_amount + EXCLUDED.total_amount
+)
+SELECT tx.*, price.name AS product_name, price.category_id, price.category_label
+FROM tx, price
+"""
+
+# Gives balance and stock back for every hold matched by {where}. Several holds of one user or product
+# are summed first, because UPDATE ... FROM applies only one source row per target row. The product
+# update waits for the account CTE to finish so the lock order stays account, then product.
+_RELEASE_SQL = """
+WITH hold AS (
+    UPDATE payment_holds h
+    SET status = :status, settled_at = now()
+    WHERE h.status = 'held' AND {where}
+    RETURNING h.id, h.user_id, h.product_id, h.quantity, h.amount, h.status,
+              h.created_at, h.expires_at, h.transaction_id
+), account AS (
+    UPDATE accounts a
+    SET balance = a.balance + r.amount,
+        holded_balance = a.holded_balance - r.amount
+    FROM (SELECT user_id, sum(amount) AS amount FROM hold GROUP BY user_id) r
+    WHERE a.user_id = r.user_id
+    RETURNING a.user_id
+), product AS (
+    UPDATE products p
+    SET stock = p.stock + r.quantity
+    FROM (SELECT product_id, sum(quantity) AS quantity FROM hold GROUP BY product_id) r,
+         (SELECT count(*) FROM account) AS accounts_done
+    WHERE p.id = r.product_id
+)
+SELECT * FROM hold
+"""
+
+# Keeps the expiry sweeps of several workers from running at the same time.
+HOLD_SWEEP_LOCK_KEY = 7324002
+
+HOLD_NOT_FOUND = "Hold not found."
+
+
+def _hold_failure_reason(db: Session, hold_id: uuid.UUID, user_id: uuid.UUID) -> str:
+    """
+    Works out why a capture or release matched no hold. Only runs on the failure path, after the rollback.
+    """
+    hold = db.query(PaymentHold.status, PaymentHold.expires_at).filter(
+        PaymentHold.id == hold_id, PaymentHold.user_id == user_id
+    ).first()
+    if not hold:
+        return HOLD_NOT_FOUND
+    if hold.status != 'held':
+        return f"Hold is already {hold.status}."
+    return "Hold has expired."
+
+
+def create_hold(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate) -> Tuple[Optional[schemas.PaymentHold], Optional[str]]:
+    """
+    Reserves the payment's amount in holded_balance and its quantity of stock, with the same checks
+    and messages as create_payment. The hold expires after PAYMENT_HOLD_TTL_SECONDS unless captured.
+    """
+    try:
+        row = db.execute(
+            text(_HOLD_SQL),
+            {
+                "user_id": user_id, "product_id": payment.product_id, "quantity": payment.quantity,
+                "ttl_seconds": settings.PAYMENT_HOLD_TTL_SECONDS,
+            },
+        ).mappings().first()
+
+        if row is None:
+            db.rollback()
+            return None, _payment_failure_reason(db, user_id, payment)
+
+        db.commit()
+        return schemas.PaymentHold(**row), None
+    except Exception as e:
+        db.rollback()
+        return None, "An unexpected error occurred during the transaction."
+
+
+def capture_hold(db: Session, hold_id: uuid.UUID, user_id: uuid.UUID) -> Tuple[Optional[schemas.Transaction], Optional[str]]:
+    """
+    Turns an unexpired hold into a completed payment: the held amount leaves holded_balance, living
+    points are added and the transaction and rollup rows are written. Stock was taken by the hold.
+    """
+    try:
+        row = db.execute(
+            text(_CAPTURE_SQL), {"hold_id": hold_id, "user_id": user_id, "transaction_id": uuid.uuid4()}
+        ).mappings().first()
+
+        if row is None:
+            db.rollback()
+            return None, _hold_failure_reason(db, hold_id, user_id)
+
+        db.commit()
+        return _payment_row_to_schema(row), None
+    except Exception as e:
+        db.rollback()
+        return None, "An unexpected error occurred during the transaction."
+
+
+def release_hold(db: Session, hold_id: uuid.UUID, user_id: uuid.UUID) -> Tuple[Optional[schemas.PaymentHold], Optional[str]]:
+    """
+    Cancels a hold that has not been captured, expired or not, returning its balance and stock.
+    """
+    try:
+        row = db.execute(
+            text(_RELEASE_SQL.format(where="h.id = :hold_id AND h.user_id = :user_id")),
+            {"hold_id": hold_id, "user_id": user_id, "status": "released"},
+        ).mappings().first()
+
+        if row is None:
+            db.rollback()
+            return None, _hold_failure_reason(db, hold_id, user_id)
+
+        db.commit()
+        return schemas.PaymentHold(**row), None
+    except Exception as e:
+        db.rollback()
+        return None, "An unexpected error occurred during the transaction."
+
+
+def expire_holds(db: Session, limit: int) -> List[Row]:
+    """
+    Releases up to `limit` holds whose expires_at has passed, oldest first, and marks them expired.
+    Returns the expired holds; nothing when another worker is sweeping at the same moment.
+    """
+    try:
+        if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": HOLD_SWEEP_LOCK_KEY}).scalar():
+            db.rollback()
+            return []
+        where = (
+            "h.id IN (SELECT id FROM payment_holds WHERE status = 'held' AND expires_at <= now() "
+            "ORDER BY expires_at LIMIT :limit FOR UPDATE SKIP LOCKED)"
+        )
+        rows = db.execute(text(_RELEASE_SQL.format(where=where)), {"limit": limit, "status": "expired"}).all()
+        db.commit()
+        return rows
+    except Exception as e:
+        db.rollback()
+        raise e
+
+
+def stage_deposit(db: Session, user_id: uuid.UUID, deposit: schemas.DepositCreate) -> schemas.Transaction:
+    """
+    create_deposit inside a savepoint of a transaction the caller commits, for the group-commit pipeline.
+    On an error only this deposit is rolled back and the exception propagates.
+    """
+    with db.begin_nested():
+        db_transaction = _insert_deposit(db, user_id, deposit)
+        db.refresh(db_transaction)
+        return schemas.Transaction.model_validate(db_transaction)
+
+
+def stage_payment(db: Session, user_id: uuid.UUID, payment: schemas.PaymentCreate) -> Tuple[Optional[schemas.Transaction], Optional[str]]:
+    """
+    create_payment (or create_payment_atomic, per PAYMENT_ENGINE) inside a savepoint of a transaction
+    the caller commits, for the group-commit pipeline. A failed payment rolls back to the savepoint,
+    so the other writes of the batch are kept.
+    """
+    savepoint = db.begin_nested()
+    try:
+        if settings.PAYMENT_ENGINE == "atomic":
+            row = _run_atomic_payment(db, user_id, payment)
+            if row is None:
+                savepoint.rollback()
+                return None, _payment_failure_reason(db, user_id, payment)
+            savepoint.commit()
+            return _payment_row_to_schema(row), None
+
+        db_transaction, error_msg = _insert_payment(db, user_id, payment)
+        if error_msg:
+            savepoint.rollback()
+            return None, error_msg
+        db.refresh(db_transaction)
+        result = schemas.Transaction.model_validate(db_transaction)
+        savepoint.commit()
+        return result, None
+    except Exception as e:
+        savepoint.rollback()
+        return None, "An unexpected error occurred during the transaction."
+
+
+def create_checkout(db: Session, user_id: uuid.UUID, lines: List[schemas.PaymentCreate]) -> Tuple[Optional[List[Transaction]], Optional[str]]:
+    """
+    Pays for several products in one atomic database transaction.
+    The account is locked first and the products after it, always in ascending id order, so
+    concurrent checkouts (and single payments, which lock one product) can never deadlock.
+    Creates one transaction row per line and accrues living points once on the cart total.
+    """
     try:
         account = db.query(Account).filter(Account.user_id == user_id).with_for_update().one()
-        product = db.query(Product).filter(Product.id == payment.product_id).with_for_update().first()
 
-        if not product:
+        product_ids = sorted({line.product_id for line in lines})
+        products = {
+            product.id: product
+            for product in (
+                db.query(Product)
+                .filter(Product.id.in_(product_ids))
+                .order_by(Product.id)
+                .with_for_update()
+                .all()
+            )
+        }
+
+        if len(products) != len(product_ids):
             db.rollback()
             return None, "Product not found."
 
-        if product.stock < payment.quantity:
-            db.rollback()
-            return None, f"Insufficient stock for {product.name}. Available: {product.stock}, Requested: {payment.quantity}."
+        requested = {}
+        for line in lines:
+            requested[line.product_id] = requested.get(line.product_id, 0) + line.quantity
+
+        for product_id in product_ids:
+            product = products[product_id]
+            if product.stock < requested[product_id]:
+                db.rollback()
+                return None, f"Insufficient stock for {product.name}. Available: {product.stock}, Requested: {requested[product_id]}."
 
-        total_cost = product.amount * payment.quantity
+        total_cost = sum((products[line.product_id].amount * line.quantity for line in lines), Decimal('0'))
         if account.balance < total_cost:
             db.rollback()
             return None, f"Insufficient balance. Required: {total_cost}, Available: {account.balance}."
 
         account.balance -= total_cost
+        for product_id in product_ids:
+            products[product_id].stock -= requested[product_id]
 
-        product.stock -= payment.quantity
-        
-        points_to_add = math.floor(total_cost * Decimal('0.01'))
-        account.living_points += points_to_add
-
-        db_transaction = Transaction(
-            user_id=user_id,
-            product_id=payment.product_id,
-            quantity=payment.quantity,
-            total_amount=total_cost,
-            status='completed',
-            transaction_type='payment'
-        )
-        db.add(db_transaction)
+        account.living_points += math.floor(total_cost * Decimal('0.01'))
+
+        db_transactions = [
+            Transaction(
+                user_id=user_id,
+                product_id=line.product_id,
+                quantity=line.quantity,
+                total_amount=products[line.product_id].amount * line.quantity,
+                status='completed',
+                transaction_type='payment'
+            )
+            for line in lines
+        ]
+        db.add_all(db_transactions)
+        db.flush()
+        transaction_ids = [t.id for t in db_transactions]
+        apply_transactions_to_rollup(db, transaction_ids)
         db.commit()
-        db.refresh(db_transaction)
-        return db_transaction, None
+        # The commit expired every row; load them back in one query rather than one lazy load each.
+        loaded = {
+            t.id: t
+            for t in db.query(Transaction)
+            .options(joinedload(Transaction.product).joinedload(Product.category))
+            .filter(Transaction.id.in_(transaction_ids))
+        }
+        return [loaded[transaction_id] for transaction_id in transaction_ids], None
     except Exception as e:
         db.rollback()
         return None, "An unexpected error occurred during the transaction."
 
 
+def _copy_rows(db: Session, table: str, columns: str, rows: List[Tuple]) -> None:
+    """
+    Streams rows into a table with COPY ... FROM STDIN on the session's own connection.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _apply_bulk_deposit_batch(db: Session, rows: List[Tuple[int, uuid.UUID, Decimal]]) -> Dict[int, Optional[uuid.UUID]]:
+    """
+    Applies one batch of deposits with set-based SQL and commits it.
+    Returns the created transaction id per row number, or None when the user has no account.
+    """
+    db.execute(text(
+        """
+        CREATE TEMP TABLE bulk_deposit_staging (
+            row_no INTEGER PRIMARY KEY,
+            user_id UUID NOT NULL,
+            amount NUMERIC(15, 2) NOT NULL,
+            transaction_id UUID NOT NULL DEFAULT uuid_generate_v4()
+        ) ON COMMIT DROP
+        """
+    ))
+    _copy_rows(db, "bulk_deposit_staging", "row_no, user_id, amount", rows)
+
+    # Lock every affected account up front, in id order, so concurrent imports cannot deadlock.
+    db.execute(text(
+        """
+        SELECT a.id FROM accounts a
+        WHERE a.user_id IN (SELECT user_id FROM bulk_deposit_staging)
+        ORDER BY a.id
+        FOR UPDATE
+        """
+    ))
+    db.execute(text(
+        """
+        UPDATE accounts a
+        SET balance = a.balance + s.total
+        FROM (SELECT user_id, sum(amount) AS total FROM bulk_deposit_staging GROUP BY user_id) s
+        WHERE a.user_id = s.user_id
+        """
+    ))
+    db.execute(text(
+        """
+        INSERT INTO transactions (id, user_id, total_amount, status, transaction_type)
+        SELECT s.transaction_id, s.user_id, s.amount, 'completed', 'deposit'
+        FROM bulk_deposit_staging s
+        JOIN accounts a ON a.user_id = s.user_id
+        ORDER BY s.row_no
+        """
+    ))
+    db.execute(text(
+        f"INSERT INTO daily_spending_rollups ({_ROLLUP_COLUMNS}) "
+        + _ROLLUP_SOURCE.format(where="AND t.id IN (SELECT transaction_id FROM bulk_deposit_staging)")
+        + f" ON CONFLICT {_ROLLUP_CONFLICT_KEY} DO UPDATE SET "
+        "transaction_count = daily_spending_rollups.transaction_count + EXCLUDED.transaction_count, "
+        "total_amount = daily_spending_rollups.total_amount + EXCLUDED.total_amount"
+    ))
+    results = db.execute(text(
+        """
+        SELECT s.row_no, CASE WHEN a.id IS NULL THEN NULL ELSE s.transaction_id END
+        FROM bulk_deposit_staging s
+        LEFT JOIN accounts a ON a.user_id = s.user_id
+        """
+    )).all()
+    db.commit()
+    return {row_no: transaction_id for row_no, transaction_id in results}
+
+
+def create_bulk_deposits(
+    db: Session, rows: List[Tuple[int, uuid.UUID, Decimal]], batch_size: int
+) -> Dict[int, Tuple[Optional[uuid.UUID], Optional[str]]]:
+    """
+    Credits many accounts at once. Rows are COPYed into a temporary staging table and applied with
+    UPDATE ... FROM and INSERT ... SELECT, one transaction per batch of `batch_size` rows.
+    Returns (transaction_id, error) per row number; a failed batch reports the error on each of its rows
+    and leaves the other batches applied.
+    """
+    results = {}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            applied = _apply_bulk_deposit_batch(db, batch)
+        except Exception as e:
+            db.rollback()
+            results.update({row_no: (None, "The batch containing this row could not be applied.") for row_no, _, _ in batch})
+            continue
+        for row_no, transaction_id in applied.items():
+            results[row_no] = (transaction_id, None) if transaction_id else (None, "User not found.")
+    return results
+
+
 def get_transaction_by_id(db: Session, transaction_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Transaction]:
     """
     Fetches a single transaction by its ID, ensuring it belongs to the requesting user.
@@ -90,6 +647,64 @@ def get_transaction_by_id(db: Session, transaction_id: uuid.UUID, user_id: uuid.
     )
 
 
+def _filter_user_transactions(
+    stmt: Select,
+    user_id: uuid.UUID,
+    category_label: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+) -> Select:
+    """
+    Applies the history filters to a select that already joins products and categories.
+    """
+    stmt = stmt.where(Transaction.user_id == user_id)
+
+    if category_label:
+        stmt = stmt.where(Category.label == category_label)
+
+    if start_date:
+        stmt = stmt.where(Transaction.transaction_date >= start_date)
+
+    if end_date:
+        stmt = stmt.where(Transaction.transaction_date < (end_date + timedelta(days=1)))
+    return stmt
+
+
+def _history_stmt(
+    user_id: uuid.UUID,
+    category_label: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+) -> Select:
+    stmt = (
+        select(
+            Transaction.id, Transaction.user_id, Transaction.quantity, Transaction.total_amount,
+            Transaction.status, Transaction.transaction_date, Transaction.transaction_type,
+            Product.id.label("product_id"), Product.name.label("product_name"),
+            Category.id.label("category_id"), Category.label.label("category_label"),
+        )
+        .outerjoin(Product, Transaction.product_id == Product.id)
+        .outerjoin(Category, Product.category_id == Category.id)
+    )
+    return _filter_user_transactions(stmt, user_id, category_label, start_date, end_date)
+
+
+def _history_item(row: Row) -> schemas.Transaction:
+    # Rows come straight from typed columns, so the schemas are built without re-validation.
+    product = None
+    if row.product_id:
+        product = schemas.ProductInfo.model_construct(
+            id=row.product_id, name=row.product_name,
+            category=schemas.CategoryInfo.model_construct(id=row.category_id, label=row.category_label)
+            if row.category_id else None,
+        )
+    return schemas.Transaction.model_construct(
+        id=row.id, user_id=row.user_id, quantity=row.quantity, total_amount=row.total_amount,
+        status=row.status, transaction_date=row.transaction_date, transaction_type=row.transaction_type,
+        product=product,
+    )
+
+
 def get_user_transactions(
     db: Session,
     user_id: uuid.UUID,
@@ -98,83 +713,397 @@ def get_user_transactions(
     category_label: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-) -> Tuple[List[Transaction], int]:
+) -> PageResult:
     """
     Fetches a paginated and filtered list of transactions for a specific user.
+    The total is computed with the "transactions" count strategy.
     """
-    offset = (page - 1) * size
-    
-    query = (
-        db.query(Transaction)
-        .options(joinedload(Transaction.product).joinedload(Product.category))
-        .filter(Transaction.user_id == user_id)
+    base = select(Transaction.id)
+    if category_label:
+        base = base.join(Product).join(Category)
+    base = _filter_user_transactions(base, user_id, category_label, start_date, end_date)
+
+    stmt = _history_stmt(user_id, category_label, start_date, end_date).order_by(desc(Transaction.transaction_date))
+    result = paginate(
+        db, "transactions", stmt, base, page, size,
+        count_key=(user_id, category_label, start_date, end_date),
     )
+    return replace(result, items=[_history_item(row) for row in result.items])
 
-    if category_label:
-        query = query.join(Product).join(Category).filter(Category.label == category_label)
-    
-    if start_date:
-        query = query.filter(Transaction.transaction_date >= start_date)
-        
-    if end_date:
-        from datetime import timedelta
-        query = query.filter(Transaction.transaction_date < (end_date + timedelta(days=1)))
 
-    total = query.count()
-    items = query.order_by(desc(Transaction.transaction_date)).offset(offset).limit(size).all()
-    
-    return items, total
+# Column order of the /transactions/export files.
+EXPORT_COLUMNS = (
+    "id", "transaction_date", "transaction_type", "status", "quantity",
+    "total_amount", "product_id", "product_name", "category",
+)
 
-def get_amount_per_category(db: Session, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[Tuple[str, Decimal]]:
-    query = (
-        db.query(
+
+def iter_user_transactions(
+    db: Session,
+    user_id: uuid.UUID,
+    category_label: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    batch_size: int = 1000,
+) -> Iterator[Row]:
+    """
+    Yields every matching transaction of a user, newest first, as flat rows in EXPORT_COLUMNS order.
+    Rows come from a server-side cursor `batch_size` at a time, so memory stays flat however long
+    the history is. Filters behave exactly like get_user_transactions.
+    """
+    stmt = (
+        select(
+            Transaction.id, Transaction.transaction_date, Transaction.transaction_type, Transaction.status,
+            Transaction.quantity, Transaction.total_amount, Transaction.product_id,
+            Product.name.label("product_name"), Category.label.label("category"),
+        )
+        .outerjoin(Product, Transaction.product_id == Product.id)
+        .outerjoin(Category, Product.category_id == Category.id)
+    )
+    stmt = _filter_user_transactions(stmt, user_id, category_label, start_date, end_date)
+    stmt = stmt.order_by(desc(Transaction.transaction_date), desc(Transaction.id))
+    yield from db.execute(stmt.execution_options(yield_per=batch_size))
+
+
+def encode_cursor(transaction: schemas.Transaction) -> str:
+    """
+    Builds an opaque keyset cursor from the (transaction_date, id) of the last row on a page.
+    """
+    raw = json.dumps([transaction.transaction_date.isoformat(), str(transaction.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Reverses encode_cursor. Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        transaction_date, transaction_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(transaction_date), uuid.UUID(transaction_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+def get_user_transactions_after(
+    db: Session,
+    user_id: uuid.UUID,
+    size: int,
+    after: Optional[str] = None,
+    category_label: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Tuple[List[schemas.Transaction], Optional[str]]:
+    """
+    Fetches a page of a user's transactions using keyset pagination on (transaction_date, id).
+    Never counts the full result set, so cost does not grow with how deep the client has scrolled.
+    Returns the items and the cursor for the next page (None when there are no more rows).
+    """
+    stmt = _history_stmt(user_id, category_label, start_date, end_date)
+
+    if after:
+        after_date, after_id = decode_cursor(after)
+        stmt = stmt.where(tuple_(Transaction.transaction_date, Transaction.id) < (after_date, after_id))
+
+    rows = db.execute(
+        stmt.order_by(desc(Transaction.transaction_date), desc(Transaction.id)).limit(size + 1)
+    ).all()
+
+    items = [_history_item(row) for row in rows[:size]]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > size else None
+    return items, next_cursor
+
+
+def apply_transaction_to_rollup(db: Session, transaction_id: uuid.UUID) -> None:
+    """
+    Adds a freshly flushed transaction to daily_spending_rollups.
+    Must run inside the same DB transaction as the insert so both commit or roll back together.
+    """
+    apply_transactions_to_rollup(db, [transaction_id])
+
+
+def apply_transactions_to_rollup(db: Session, transaction_ids: List[uuid.UUID]) -> None:
+    """
+    Same as apply_transaction_to_rollup for several transactions, in a single statement.
+    """
+    db.execute(
+        text(
+            f"INSERT INTO daily_spending_rollups ({_ROLLUP_COLUMNS}) "
+            + _ROLLUP_SOURCE.format(where="AND t.id IN :transaction_ids")
+            + f" ON CONFLICT {_ROLLUP_CONFLICT_KEY} DO UPDATE SET "
+            "transaction_count = daily_spending_rollups.transaction_count + EXCLUDED.transaction_count, "
+            "total_amount = daily_spending_rollups.total_amount + EXCLUDED.total_amount"
+        ).bindparams(bindparam("transaction_ids", expanding=True)),
+        {"transaction_ids": list(transaction_ids)},
+    )
+
+
+def rebuild_daily_rollups(db: Session, user_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Recomputes daily_spending_rollups from the raw transactions, for one user or for everyone.
+    The table lock keeps concurrent payments and deposits from updating rows while they are rebuilt;
+    they simply wait and apply their increment afterwards. Returns the number of rollup rows written.
+    """
+    try:
+        db.execute(text("LOCK TABLE daily_spending_rollups IN EXCLUSIVE MODE"))
+        params = {}
+        if user_id:
+            db.execute(text("DELETE FROM daily_spending_rollups WHERE user_id = :user_id"), {"user_id": user_id})
+            where = "AND t.user_id = :user_id"
+            params["user_id"] = user_id
+        else:
+            db.execute(text("DELETE FROM daily_spending_rollups"))
+            where = ""
+        result = db.execute(
+            text(f"INSERT INTO daily_spending_rollups ({_ROLLUP_COLUMNS}) " + _ROLLUP_SOURCE.format(where=where)),
+            params,
+        )
+        db.commit()
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        raise e
+
+
+def count_rollup_mismatches(db: Session, user_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Returns how many rollup rows differ from a fresh aggregate of the raw transactions.
+    """
+    where = "AND t.user_id = :user_id" if user_id else ""
+    rollup_filter = "WHERE user_id = :user_id" if user_id else ""
+    source = _ROLLUP_SOURCE.format(where=where)
+    stored = f"SELECT {_ROLLUP_COLUMNS} FROM daily_spending_rollups {rollup_filter}"
+    query = f"""
+        SELECT count(*) FROM (
+            (({source}) EXCEPT ALL ({stored}))
+            UNION ALL
+            (({stored}) EXCEPT ALL ({source}))
+        ) AS diff
+    """
+    return db.execute(text(query), {"user_id": user_id} if user_id else {}).scalar()
+
+
+# The analytics statements are shared by the sync and async read paths.
+def _amount_per_category_stmt(user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> Select:
+    stmt = (
+        select(
             Category.label,
-            func.sum(Transaction.total_amount).label("total_amount")
+            func.sum(DailySpendingRollup.total_amount).label("total_amount")
         )
-        .join(Product, Transaction.product_id == Product.id)
-        .join(Category, Product.category_id == Category.id)
-        .filter(Transaction.user_id == user_id)
-        .filter(Transaction.transaction_type == 'payment')
+        .join(Category, DailySpendingRollup.category_id == Category.id)
+        .where(DailySpendingRollup.user_id == user_id)
+        .where(DailySpendingRollup.transaction_type == 'payment')
         .group_by(Category.label)
         .order_by(desc("total_amount"))
     )
     if start_date:
-        query = query.filter(Transaction.transaction_date >= start_date)
+        stmt = stmt.where(DailySpendingRollup.day >= start_date)
     if end_date:
-        query = query.filter(Transaction.transaction_date < (end_date + timedelta(days=1)))
-    
-    return query.all()
+        stmt = stmt.where(DailySpendingRollup.day <= end_date)
+    return stmt
 
-def get_count_per_category(db: Session, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[Tuple[str, int]]:
-    query = (
-        db.query(
+def _count_per_category_stmt(user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> Select:
+    stmt = (
+        select(
             Category.label,
-            func.count(Transaction.id).label("transaction_count")
+            func.sum(DailySpendingRollup.transaction_count).label("transaction_count")
         )
-        .join(Product, Transaction.product_id == Product.id)
-        .join(Category, Product.category_id == Category.id)
-        .filter(Transaction.user_id == user_id)
-        .filter(Transaction.transaction_type == 'payment')
+        .join(Category, DailySpendingRollup.category_id == Category.id)
+        .where(DailySpendingRollup.user_id == user_id)
+        .where(DailySpendingRollup.transaction_type == 'payment')
         .group_by(Category.label)
         .order_by(desc("transaction_count"))
     )
     if start_date:
-        query = query.filter(Transaction.transaction_date >= start_date)
+        stmt = stmt.where(DailySpendingRollup.day >= start_date)
     if end_date:
-        query = query.filter(Transaction.transaction_date < (end_date + timedelta(days=1)))
-        
-    return query.all()
-
-def get_time_series_data(db: Session, user_id: uuid.UUID, start_date: date, end_date: date) -> List[Tuple[date, int, Decimal]]:
-    query = (
-        db.query(
-            cast(Transaction.transaction_date, Date).label("date"),
+        stmt = stmt.where(DailySpendingRollup.day <= end_date)
+    return stmt
+
+def uses_daily_rollups(granularity: str, tz: str) -> bool:
+    """
+    Day, week and month buckets in the rollup timezone can be summed from daily_spending_rollups;
+    hourly buckets and other timezones need the raw transactions.
+    """
+    return granularity != "hour" and tz == settings.ANALYTICS_ROLLUP_TIMEZONE
+
+
+def _local_bounds(start_date: date, end_date: date, tz: str) -> Tuple[datetime, datetime]:
+    # Half-open [start, end) instants covering the local start and end days, so the range stays
+    # sargable on transaction_date instead of casting every row to a date.
+    zone = ZoneInfo(tz)
+    return (
+        datetime.combine(start_date, datetime.min.time(), zone),
+        datetime.combine(end_date + timedelta(days=1), datetime.min.time(), zone),
+    )
+
+
+def _buckets_cte(granularity: str, start_date: date, end_date: date):
+    # Every bucket start, local time, from the one holding start_date to the one holding end_date's last hour.
+    unit = schemas.TimeGranularity(granularity).value
+    first = cast(datetime.combine(start_date, time.min), DateTime)
+    last = cast(datetime.combine(end_date, time(23)), DateTime)
+    series = func.generate_series(
+        func.date_trunc(unit, first), func.date_trunc(unit, last), literal_column(f"interval '1 {unit}'")
+    )
+    return select(series.label("bucket")).cte("buckets")
+
+
+def _bucket_source(
+    user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str, by_category: bool
+) -> Select:
+    """
+    Per-bucket (and per-category) counts and amounts, from the rollups when possible.
+    Grouping is by output label so the bound granularity/timezone are not repeated in GROUP BY.
+    """
+    if uses_daily_rollups(granularity, tz):
+        bucket = func.date_trunc(granularity, cast(DailySpendingRollup.day, DateTime))
+        columns = [
+            bucket.label("bucket"),
+            func.sum(DailySpendingRollup.transaction_count).label("transaction_count"),
+            func.sum(DailySpendingRollup.total_amount).label("total_amount"),
+        ]
+        stmt = (
+            select(*columns)
+            .where(DailySpendingRollup.user_id == user_id)
+            .where(DailySpendingRollup.day >= start_date, DailySpendingRollup.day <= end_date)
+        )
+        if by_category:
+            stmt = (
+                stmt.add_columns(Category.label.label("category"))
+                .join(Category, DailySpendingRollup.category_id == Category.id)
+                .where(DailySpendingRollup.transaction_type == 'payment')
+                .group_by("bucket", "category")
+            )
+        else:
+            stmt = stmt.group_by("bucket")
+        return stmt
+
+    starts_at, ends_at = _local_bounds(start_date, end_date, tz)
+    bucket = func.date_trunc(granularity, func.timezone(tz, Transaction.transaction_date))
+    stmt = (
+        select(
+            bucket.label("bucket"),
             func.count(Transaction.id).label("transaction_count"),
-            func.sum(Transaction.total_amount).label("total_amount")
+            func.sum(Transaction.total_amount).label("total_amount"),
+        )
+        .where(Transaction.user_id == user_id)
+        .where(Transaction.transaction_date >= starts_at, Transaction.transaction_date < ends_at)
+    )
+    if by_category:
+        stmt = (
+            stmt.add_columns(Category.label.label("category"))
+            .join(Product, Transaction.product_id == Product.id)
+            .join(Category, Product.category_id == Category.id)
+            .where(Transaction.transaction_type == 'payment')
+            .group_by("bucket", "category")
+        )
+    else:
+        stmt = stmt.group_by("bucket")
+    return stmt
+
+
+def _time_series_stmt(user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str) -> Select:
+    """
+    One row per bucket in the range, zero-filled, as (bucket, transaction_count, total_amount).
+    """
+    buckets = _buckets_cte(granularity, start_date, end_date)
+    totals = _bucket_source(user_id, start_date, end_date, granularity, tz, by_category=False).subquery()
+    return (
+        select(
+            buckets.c.bucket,
+            func.coalesce(totals.c.transaction_count, 0).label("transaction_count"),
+            func.coalesce(totals.c.total_amount, 0).label("total_amount"),
         )
-        .filter(Transaction.user_id == user_id)
-        .filter(cast(Transaction.transaction_date, Date).between(start_date, end_date))
-        .group_by("date")
-        .order_by("date")
+        .select_from(buckets.outerjoin(totals, totals.c.bucket == buckets.c.bucket))
+        .order_by(buckets.c.bucket)
     )
-    return query.all()
+
+
+def _category_time_series_stmt(
+    user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str
+) -> Select:
+    """
+    Payments per category and bucket as (category, bucket, transaction_count, total_amount), zero-filled
+    for every category that has at least one payment in the range.
+    """
+    buckets = _buckets_cte(granularity, start_date, end_date)
+    totals = _bucket_source(user_id, start_date, end_date, granularity, tz, by_category=True).cte("totals")
+    categories = select(totals.c.category).distinct().subquery()
+    return (
+        select(
+            categories.c.category,
+            buckets.c.bucket,
+            func.coalesce(totals.c.transaction_count, 0).label("transaction_count"),
+            func.coalesce(totals.c.total_amount, 0).label("total_amount"),
+        )
+        .select_from(
+            buckets.join(categories, true()).outerjoin(
+                totals, and_(totals.c.bucket == buckets.c.bucket, totals.c.category == categories.c.category)
+            )
+        )
+        .order_by(categories.c.category, buckets.c.bucket)
+    )
+
+def _dashboard_stmt(user_id: uuid.UUID, start_date: date, end_date: date) -> Select:
+    """
+    One pass over the rollups for the whole dashboard, grouped by category, by day and overall.
+    `grouping` tells the sets apart: 1 = per category, 2 = per day, 3 = grand total.
+    Category sets only count payments, like the per-category endpoints; days and the total count
+    everything, like the time series. The () set returns a row even without any rollups, hence the coalesce.
+    """
+    is_payment = DailySpendingRollup.transaction_type == 'payment'
+    return (
+        select(
+            func.grouping(Category.label, DailySpendingRollup.day).label("grouping"),
+            Category.label.label("category"),
+            DailySpendingRollup.day,
+            func.coalesce(func.sum(DailySpendingRollup.transaction_count).filter(is_payment), 0).label("payment_count"),
+            func.coalesce(func.sum(DailySpendingRollup.total_amount).filter(is_payment), 0).label("payment_amount"),
+            func.coalesce(func.sum(DailySpendingRollup.transaction_count), 0).label("transaction_count"),
+            func.coalesce(func.sum(DailySpendingRollup.total_amount), 0).label("total_amount"),
+        )
+        .select_from(DailySpendingRollup)
+        .outerjoin(Category, DailySpendingRollup.category_id == Category.id)
+        .where(DailySpendingRollup.user_id == user_id)
+        .where(DailySpendingRollup.day >= start_date, DailySpendingRollup.day <= end_date)
+        .group_by(func.grouping_sets(Category.label, DailySpendingRollup.day, literal_column("()")))
+    )
+
+def get_amount_per_category(db: Session, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[Tuple[str, Decimal]]:
+    return db.execute(_amount_per_category_stmt(user_id, start_date, end_date)).all()
+
+def get_count_per_category(db: Session, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[Tuple[str, int]]:
+    return db.execute(_count_per_category_stmt(user_id, start_date, end_date)).all()
+
+def get_time_series_data(
+    db: Session, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str = "day", tz: str = "UTC"
+) -> List[Tuple[datetime, int, Decimal]]:
+    return db.execute(_time_series_stmt(user_id, start_date, end_date, granularity, tz)).all()
+
+def get_category_time_series_data(
+    db: Session, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str = "day", tz: str = "UTC"
+) -> List[Tuple[str, datetime, int, Decimal]]:
+    return db.execute(_category_time_series_stmt(user_id, start_date, end_date, granularity, tz)).all()
+
+def get_dashboard_data(db: Session, user_id: uuid.UUID, start_date: date, end_date: date) -> List[Row]:
+    return db.execute(_dashboard_stmt(user_id, start_date, end_date)).all()
+
+async def get_amount_per_category_async(db: AsyncSession, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[Tuple[str, Decimal]]:
+    return (await db.execute(_amount_per_category_stmt(user_id, start_date, end_date))).all()
+
+async def get_count_per_category_async(db: AsyncSession, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]) -> List[Tuple[str, int]]:
+    return (await db.execute(_count_per_category_stmt(user_id, start_date, end_date))).all()
+
+async def get_time_series_data_async(
+    db: AsyncSession, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str = "day", tz: str = "UTC"
+) -> List[Tuple[datetime, int, Decimal]]:
+    return (await db.execute(_time_series_stmt(user_id, start_date, end_date, granularity, tz))).all()
+
+async def get_category_time_series_data_async(
+    db: AsyncSession, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str = "day", tz: str = "UTC"
+) -> List[Tuple[str, datetime, int, Decimal]]:
+    return (await db.execute(_category_time_series_stmt(user_id, start_date, end_date, granularity, tz))).all()
+
+async def get_dashboard_data_async(db: AsyncSession, user_id: uuid.UUID, start_date: date, end_date: date) -> List[Row]:
+    return (await db.execute(_dashboard_stmt(user_id, start_date, end_date))).all()
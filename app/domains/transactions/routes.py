@@ -1,15 +1,21 @@
 # app/domains/transactions/routes.py
 import uuid
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from typing import List, Optional
 from datetime import date
 from enum import Enum
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.core.responses import FastJSONResponse, trusted_response
 
 from . import handlers, schemas
-from app.middleware.auth import get_current_user
-from app.database.models import User as UserModel
+from app.middleware.auth import get_current_principal
+from app.domains.users.schemas import Principal
 
 router = APIRouter()
+# The /analytics endpoints live on their own routers so app.main can pick the sync or async variant.
+analytics_router = APIRouter()
+async_analytics_router = APIRouter()
 
 class PageSize(int, Enum):
     five = 5
@@ -20,7 +26,7 @@ class PageSize(int, Enum):
 def make_deposit(
     deposit_in: schemas.DepositCreate,
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Deposit funds into the current user's account. Protected endpoint.
@@ -31,7 +37,7 @@ def make_deposit(
 def make_payment(
     payment_in: schemas.PaymentCreate,
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Pay for a product. This will validate balance and stock in a single transaction.
@@ -39,34 +45,158 @@ def make_payment(
     """
     return handler.process_payment(user_id=current_user.id, payment=payment_in)
 
+@router.post("/transactions/holds", response_model=schemas.PaymentHold, status_code=201)
+def make_hold(
+    payment_in: schemas.PaymentCreate,
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Authorize a payment: reserve its amount in the account's holded_balance and its quantity of stock.
+    Capture or release the hold afterwards; holds left alone expire after PAYMENT_HOLD_TTL_SECONDS.
+    Protected endpoint.
+    """
+    return handler.process_hold(user_id=current_user.id, payment=payment_in)
+
+@router.post("/transactions/holds/{hold_id}/capture", response_model=schemas.Transaction, status_code=201)
+def capture_hold(
+    hold_id: uuid.UUID,
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Complete a held payment. Creates the payment transaction and earns its living points.
+    Protected endpoint.
+    """
+    return handler.process_capture(user_id=current_user.id, hold_id=hold_id)
+
+@router.post("/transactions/holds/{hold_id}/release", response_model=schemas.PaymentHold)
+def release_hold(
+    hold_id: uuid.UUID,
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Cancel a held payment and give its balance and stock back.
+    Protected endpoint.
+    """
+    return handler.process_release(user_id=current_user.id, hold_id=hold_id)
+
+@router.post(
+    "/transactions/deposits/bulk",
+    response_model=schemas.BulkDepositReport,
+    # The report has a result per row (up to BULK_DEPOSIT_MAX_ROWS), so it always takes the fast path.
+    response_class=FastJSONResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": schemas.BulkDepositRow.model_json_schema()}},
+                "text/csv": {"schema": {"type": "string", "example": "user_id,amount\n<uuid>,1500000.00"}},
+            },
+        }
+    },
+)
+async def make_bulk_deposits(
+    request: Request,
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Credit many accounts in one call, e.g. a payroll run. The body is either a JSON list of
+    {"user_id", "amount"} objects or a CSV file (Content-Type: text/csv) with those two columns.
+    Rows are applied in large set-based batches and every row gets its own result in the report.
+    Restricted to the operators listed in BULK_DEPOSIT_OPERATORS.
+    """
+    body = await request.body()
+    report = await run_in_threadpool(
+        handler.process_bulk_deposits,
+        operator_email=current_user.email,
+        content_type=request.headers.get("content-type", "application/json"),
+        body=body,
+    )
+    return FastJSONResponse(report)
+
+@router.post("/transactions/checkout", response_model=schemas.CheckoutResult, status_code=201)
+def make_checkout(
+    checkout_in: schemas.CheckoutCreate,
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Pay for a whole cart at once. Either every line succeeds or none does.
+    Creates one transaction per line; living points are earned once on the cart total.
+    Protected endpoint.
+    """
+    return handler.process_checkout(user_id=current_user.id, checkout=checkout_in)
+
 @router.get("/transactions", response_model=schemas.TransactionHistory)
 def read_my_transactions(
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     page: int = Query(1, ge=1, description="Page number"),
     pageSize: PageSize = Query(PageSize.ten, description="Number of items per page"),
     category: Optional[str] = Query(None, description="Filter by category label (e.g., 'Elektronik')"),
     start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
-    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)")
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    after: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor. Send it empty to start cursor pagination")
 ):
     """
     Retrieve transaction history for the current user with filtering and pagination.
+    When `after` is present the endpoint switches to cursor pagination: `page` is ignored,
+    no total is computed and `next_cursor` points at the following page.
     Protected endpoint.
     """
-    return handler.get_my_transactions(
+    if after is not None:
+        return trusted_response(handler.get_my_transactions_after(
+            user_id=current_user.id,
+            size=pageSize.value,
+            after=after,
+            category=category,
+            start_date=start_date,
+            end_date=end_date
+        ))
+    return trusted_response(handler.get_my_transactions(
         user_id=current_user.id,
         page=page,
         size=pageSize.value,
         category=category,
         start_date=start_date,
         end_date=end_date
+    ))
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+@router.get("/transactions/export", response_class=StreamingResponse)
+def export_my_transactions(
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    format: ExportFormat = Query(ExportFormat.csv, description="File format: csv or ndjson"),
+    category: Optional[str] = Query(None, description="Filter by category label (e.g., 'Elektronik')"),
+    start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)")
+):
+    """
+    Download the current user's complete transaction history, newest first, as CSV or NDJSON.
+    Accepts the same filters as GET /transactions. The file is streamed while it is read from
+    the database, so there is no page size limit.
+    Protected endpoint.
+    """
+    return handler.export_my_transactions(
+        user_id=current_user.id,
+        format=format.value,
+        category=category,
+        start_date=start_date,
+        end_date=end_date
     )
 
 @router.get("/transactions/{transaction_id}", response_model=schemas.Transaction)
 def read_transaction_by_id(
     transaction_id: uuid.UUID,
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Retrieve a specific transaction by its ID, including product and category details.
@@ -74,10 +204,10 @@ def read_transaction_by_id(
     """
     return handler.get_transaction(transaction_id=transaction_id, user_id=current_user.id)
 
-@router.get("/analytics/amount-per-category", response_model=List[schemas.AmountPerCategory])
+@analytics_router.get("/analytics/amount-per-category", response_model=List[schemas.AmountPerCategory])
 def get_spending_by_category(
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     start_date: Optional[date] = Query(None, description="Start date for filtering (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date for filtering (YYYY-MM-DD)")
 ):
@@ -86,10 +216,10 @@ def get_spending_by_category(
     """
     return handler.get_amount_per_category(current_user.id, start_date, end_date)
 
-@router.get("/analytics/count-per-category", response_model=List[schemas.CountPerCategory])
+@analytics_router.get("/analytics/count-per-category", response_model=List[schemas.CountPerCategory])
 def get_count_by_category(
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     start_date: Optional[date] = Query(None, description="Start date for filtering (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date for filtering (YYYY-MM-DD)")
 ):
@@ -98,15 +228,86 @@ def get_count_by_category(
     """
     return handler.get_count_per_category(current_user.id, start_date, end_date)
 
-@router.get("/analytics/time-series", response_model=schemas.TimeSeriesResponse)
+@analytics_router.get("/analytics/time-series", response_model=schemas.TimeSeriesResponse)
 def get_spending_time_series(
     handler: handlers.TransactionHandler = Depends(),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     start_date: date = Query(..., description="Start date for the time series (YYYY-MM-DD)"),
-    end_date: date = Query(..., description="End date for the time series (YYYY-MM-DD)")
+    end_date: date = Query(..., description="End date for the time series (YYYY-MM-DD), inclusive"),
+    granularity: schemas.TimeGranularity = Query(schemas.TimeGranularity.day, description="Bucket size: hour, day, week or month"),
+    timezone: str = Query("UTC", description="IANA timezone the buckets and dates are cut in, e.g. 'Asia/Jakarta'"),
+    by_category: bool = Query(False, description="Also return a payment series per category")
 ):
     """
     Get time series data of transactions (count and amount) for the current user.
+    Every bucket between start_date and end_date is returned, with zeros where nothing happened.
+    Week and month buckets start on their calendar boundary and only count activity inside the range.
     """
-    return handler.get_time_series(current_user.id, start_date, end_date)
+    return trusted_response(handler.get_time_series(current_user.id, start_date, end_date, granularity, timezone, by_category))
 
+@analytics_router.get("/analytics/dashboard", response_model=schemas.DashboardResponse)
+def get_dashboard(
+    handler: handlers.TransactionHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    start_date: date = Query(..., description="Start date for the dashboard (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="End date for the dashboard (YYYY-MM-DD), inclusive")
+):
+    """
+    Amount and count per category, the daily time series and the totals for the current user,
+    from a single query. Matches the three separate analytics endpoints for the same range.
+    """
+    return trusted_response(handler.get_dashboard(current_user.id, start_date, end_date))
+
+@async_analytics_router.get("/analytics/amount-per-category", response_model=List[schemas.AmountPerCategory])
+async def get_spending_by_category_async(
+    handler: handlers.AsyncAnalyticsHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    start_date: Optional[date] = Query(None, description="Start date for filtering (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date for filtering (YYYY-MM-DD)")
+):
+    """
+    Get total amount spent per category for the current user.
+    """
+    return await handler.get_amount_per_category(current_user.id, start_date, end_date)
+
+@async_analytics_router.get("/analytics/count-per-category", response_model=List[schemas.CountPerCategory])
+async def get_count_by_category_async(
+    handler: handlers.AsyncAnalyticsHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    start_date: Optional[date] = Query(None, description="Start date for filtering (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date for filtering (YYYY-MM-DD)")
+):
+    """
+    Get the count of transactions per category for the current user.
+    """
+    return await handler.get_count_per_category(current_user.id, start_date, end_date)
+
+@async_analytics_router.get("/analytics/time-series", response_model=schemas.TimeSeriesResponse)
+async def get_spending_time_series_async(
+    handler: handlers.AsyncAnalyticsHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    start_date: date = Query(..., description="Start date for the time series (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="End date for the time series (YYYY-MM-DD), inclusive"),
+    granularity: schemas.TimeGranularity = Query(schemas.TimeGranularity.day, description="Bucket size: hour, day, week or month"),
+    timezone: str = Query("UTC", description="IANA timezone the buckets and dates are cut in, e.g. 'Asia/Jakarta'"),
+    by_category: bool = Query(False, description="Also return a payment series per category")
+):
+    """
+    Get time series data of transactions (count and amount) for the current user.
+    Every bucket between start_date and end_date is returned, with zeros where nothing happened.
+    Week and month buckets start on their calendar boundary and only count activity inside the range.
+    """
+    return trusted_response(await handler.get_time_series(current_user.id, start_date, end_date, granularity, timezone, by_category))
+
+@async_analytics_router.get("/analytics/dashboard", response_model=schemas.DashboardResponse)
+async def get_dashboard_async(
+    handler: handlers.AsyncAnalyticsHandler = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    start_date: date = Query(..., description="Start date for the dashboard (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="End date for the dashboard (YYYY-MM-DD), inclusive")
+):
+    """
+    Amount and count per category, the daily time series and the totals for the current user,
+    from a single query. Matches the three separate analytics endpoints for the same range.
+    """
+    return trusted_response(await handler.get_dashboard(current_user.id, start_date, end_date))
@@ -3,6 +3,8 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime, date
+import datetime as dt
+from enum import Enum
 
 class DepositCreate(BaseModel):
     amount: Decimal = Field(..., gt=0, description="The amount to deposit, must be positive.")
@@ -11,6 +13,13 @@ class PaymentCreate(BaseModel):
     product_id: uuid.UUID
     quantity: int = Field(..., gt=0, description="The quantity to purchase, must be positive.")
 
+class BulkDepositRow(BaseModel):
+    user_id: uuid.UUID
+    amount: Decimal = Field(..., gt=0, max_digits=15, decimal_places=2, description="The amount to credit, must be positive.")
+
+class CheckoutCreate(BaseModel):
+    items: List[PaymentCreate] = Field(..., min_length=1, max_length=100, description="The cart lines to pay for.")
+
 
 class CategoryInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -40,11 +49,47 @@ class Transaction(BaseModel):
     
     product: Optional[ProductInfo] = None
 
+class PaymentHold(BaseModel):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    product_id: uuid.UUID
+    quantity: int
+    amount: Decimal
+    status: str = Field(..., description="'held', 'captured', 'released' or 'expired'")
+    created_at: datetime
+    expires_at: datetime
+    transaction_id: Optional[uuid.UUID] = Field(None, description="The payment transaction, once captured")
+
+class CheckoutResult(BaseModel):
+    items: List[Transaction]
+    total_amount: Decimal
+    living_points_earned: int
+
+class BulkDepositRowResult(BaseModel):
+    row: int = Field(..., description="1-based position of the row in the upload")
+    user_id: Optional[str] = None
+    amount: Optional[str] = None
+    status: str = Field(..., description="'applied' or 'rejected'")
+    transaction_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+
+class BulkDepositReport(BaseModel):
+    total_rows: int
+    applied: int
+    rejected: int
+    total_amount: Decimal
+    elapsed_seconds: float
+    rows_per_second: float
+    results: List[BulkDepositRowResult]
+
 class TransactionHistory(BaseModel):
     items: List[Transaction]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
+    has_more: bool
+    total_strategy: str = Field(..., description="How total was computed: exact, cached, estimate or none")
+    next_cursor: Optional[str] = None
 
 class AmountPerCategory(BaseModel):
     category: str
@@ -54,10 +99,36 @@ class CountPerCategory(BaseModel):
     category: str
     transaction_count: int
 
+class TimeGranularity(str, Enum):
+    hour = "hour"
+    day = "day"
+    week = "week"
+    month = "month"
+
 class TimeSeriesDataPoint(BaseModel):
-    date: date
+    # `dt.date`: inside the class body a bare `date` would refer to this field, not the type.
+    date: dt.date = Field(..., description="Local date the bucket starts on")
+    bucket_start: datetime = Field(..., description="Start of the bucket in the requested timezone")
     transaction_count: int
     total_amount: Decimal
 
-class TimeSeriesResponse(BaseModel):
+class CategoryTimeSeries(BaseModel):
+    category: str
     data: List[TimeSeriesDataPoint]
+
+class TimeSeriesResponse(BaseModel):
+    granularity: TimeGranularity = TimeGranularity.day
+    timezone: str = "UTC"
+    data: List[TimeSeriesDataPoint] = Field(..., description="Every bucket in the range, zero-filled")
+    categories: Optional[List[CategoryTimeSeries]] = Field(
+        None, description="Payments per category, zero-filled; only when by_category=true"
+    )
+
+class DashboardResponse(BaseModel):
+    start_date: date
+    end_date: date
+    transaction_count: int = Field(..., description="All transactions in the range")
+    total_amount: Decimal = Field(..., description="Sum of all transactions in the range")
+    amount_per_category: List[AmountPerCategory]
+    count_per_category: List[CountPerCategory]
+    time_series: TimeSeriesResponse
@@ -1,21 +1,90 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import Row
+from app.core.config import settings
 import uuid
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
+from decimal import Decimal
 from datetime import date
+from app.core.catalog_cache import invalidate_products
+from app.database.connection import SessionLocal, mark_recent_write, read_session
+from app.database.group_commit import GroupCommitPipeline
+from app.middleware.auth import invalidate_principal, invalidate_principals
 from . import schemas, resources
 
+# Shared by every request of this worker; the batching thread starts with the first write.
+write_pipeline = GroupCommitPipeline(
+    SessionLocal, window_ms=settings.WRITE_BATCH_WINDOW_MS, max_batch=settings.WRITE_BATCH_MAX_SIZE
+)
+
 class TransactionUseCase:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, read_db: Optional[Session] = None):
         self.db = db
+        # Reads may go to a replica; writes always use `db` on the primary.
+        self.read_db = read_db or db
 
     def execute_deposit(self, user_id: uuid.UUID, deposit: schemas.DepositCreate):
-        return resources.create_deposit(self.db, user_id=user_id, deposit=deposit)
+        if settings.WRITE_BATCHING:
+            transaction = write_pipeline.submit(lambda db: resources.stage_deposit(db, user_id, deposit))
+        else:
+            transaction = resources.create_deposit(self.db, user_id=user_id, deposit=deposit)
+        invalidate_principal(user_id)
+        mark_recent_write(user_id)
+        return transaction
 
     def execute_payment(self, user_id: uuid.UUID, payment: schemas.PaymentCreate):
-        return resources.create_payment(self.db, user_id=user_id, payment=payment)
+        if settings.WRITE_BATCHING:
+            transaction, error_msg = write_pipeline.submit(lambda db: resources.stage_payment(db, user_id, payment))
+        else:
+            create_payment = resources.create_payment_atomic if settings.PAYMENT_ENGINE == "atomic" else resources.create_payment
+            transaction, error_msg = create_payment(self.db, user_id=user_id, payment=payment)
+        if transaction:
+            invalidate_principal(user_id)
+            mark_recent_write(user_id)
+            # Its stock changed, so the product pages listing it are stale.
+            invalidate_products([payment.product_id])
+        return transaction, error_msg
+
+    def execute_checkout(self, user_id: uuid.UUID, checkout: schemas.CheckoutCreate):
+        transactions, error_msg = resources.create_checkout(self.db, user_id=user_id, lines=checkout.items)
+        if transactions:
+            invalidate_principal(user_id)
+            mark_recent_write(user_id)
+            invalidate_products({line.product_id for line in checkout.items})
+        return transactions, error_msg
+
+    def execute_hold(self, user_id: uuid.UUID, payment: schemas.PaymentCreate):
+        hold, error_msg = resources.create_hold(self.db, user_id=user_id, payment=payment)
+        if hold:
+            invalidate_principal(user_id)
+            mark_recent_write(user_id)
+            invalidate_products([payment.product_id])
+        return hold, error_msg
+
+    def execute_capture(self, user_id: uuid.UUID, hold_id: uuid.UUID):
+        transaction, error_msg = resources.capture_hold(self.db, hold_id=hold_id, user_id=user_id)
+        if transaction:
+            invalidate_principal(user_id)
+            mark_recent_write(user_id)
+        return transaction, error_msg
+
+    def execute_release(self, user_id: uuid.UUID, hold_id: uuid.UUID):
+        hold, error_msg = resources.release_hold(self.db, hold_id=hold_id, user_id=user_id)
+        if hold:
+            invalidate_principal(user_id)
+            mark_recent_write(user_id)
+            invalidate_products([hold.product_id])
+        return hold, error_msg
+
+    def execute_bulk_deposits(self, rows: List[Tuple[int, uuid.UUID, Decimal]]):
+        results = resources.create_bulk_deposits(self.db, rows, batch_size=settings.BULK_DEPOSIT_BATCH_SIZE)
+        user_ids = {user_id for _, user_id, _ in rows}
+        invalidate_principals(user_ids)
+        mark_recent_write(*user_ids)
+        return results
 
     def get_transaction_details(self, transaction_id: uuid.UUID, user_id: uuid.UUID):
-        return resources.get_transaction_by_id(self.db, transaction_id=transaction_id, user_id=user_id)
+        return resources.get_transaction_by_id(self.read_db, transaction_id=transaction_id, user_id=user_id)
 
     def list_user_transactions(
         self,
@@ -27,7 +96,7 @@ class TransactionUseCase:
         end_date: Optional[date]
     ):
         return resources.get_user_transactions(
-            self.db,
+            self.read_db,
             user_id=user_id,
             page=page,
             size=size,
@@ -35,12 +104,75 @@ class TransactionUseCase:
             start_date=start_date,
             end_date=end_date
         )
+
+    def stream_user_transactions(
+        self,
+        user_id: uuid.UUID,
+        category: Optional[str],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> Iterator[Row]:
+        # The response body is produced after the request's session has been handed back,
+        # so the export holds its own session for as long as the client keeps reading.
+        with read_session(user_id) as db:
+            yield from resources.iter_user_transactions(
+                db,
+                user_id=user_id,
+                category_label=category,
+                start_date=start_date,
+                end_date=end_date,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+            )
+
+    def list_user_transactions_after(
+        self,
+        user_id: uuid.UUID,
+        size: int,
+        after: Optional[str],
+        category: Optional[str],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ):
+        return resources.get_user_transactions_after(
+            self.read_db,
+            user_id=user_id,
+            size=size,
+            after=after,
+            category_label=category,
+            start_date=start_date,
+            end_date=end_date
+        )
     
     def get_spending_by_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]):
-        return resources.get_amount_per_category(self.db, user_id, start_date, end_date)
+        return resources.get_amount_per_category(self.read_db, user_id, start_date, end_date)
 
     def get_count_by_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]):
-        return resources.get_count_per_category(self.db, user_id, start_date, end_date)
+        return resources.get_count_per_category(self.read_db, user_id, start_date, end_date)
+
+    def get_spending_time_series(self, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str):
+        return resources.get_time_series_data(self.read_db, user_id, start_date, end_date, granularity, tz)
+
+    def get_category_time_series(self, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str):
+        return resources.get_category_time_series_data(self.read_db, user_id, start_date, end_date, granularity, tz)
+
+    def get_dashboard(self, user_id: uuid.UUID, start_date: date, end_date: date):
+        return resources.get_dashboard_data(self.read_db, user_id, start_date, end_date)
+
+class AsyncAnalyticsUseCase:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_spending_by_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]):
+        return await resources.get_amount_per_category_async(self.db, user_id, start_date, end_date)
+
+    async def get_count_by_category(self, user_id: uuid.UUID, start_date: Optional[date], end_date: Optional[date]):
+        return await resources.get_count_per_category_async(self.db, user_id, start_date, end_date)
+
+    async def get_spending_time_series(self, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str):
+        return await resources.get_time_series_data_async(self.db, user_id, start_date, end_date, granularity, tz)
+
+    async def get_category_time_series(self, user_id: uuid.UUID, start_date: date, end_date: date, granularity: str, tz: str):
+        return await resources.get_category_time_series_data_async(self.db, user_id, start_date, end_date, granularity, tz)
 
-    def get_spending_time_series(self, user_id: uuid.UUID, start_date: date, end_date: date):
-        return resources.get_time_series_data(self.db, user_id, start_date, end_date)
\ No newline at end of file
+    async def get_dashboard(self, user_id: uuid.UUID, start_date: date, end_date: date):
+        return await resources.get_dashboard_data_async(self.db, user_id, start_date, end_date)
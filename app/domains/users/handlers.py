@@ -3,7 +3,6 @@ import re
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from app.database.connection import get_db
-from app.database.models import User as UserModel
 from . import usecases, schemas
 
 def get_user_usecase(db: Session = Depends(get_db)) -> usecases.UserUseCase:
@@ -59,7 +58,7 @@ class UserHandler:
             )
         return user
 
-    def update_user(self, user_to_update: UserModel, update_data: schemas.UserUpdate):
+    def update_user(self, user_to_update: schemas.UserInDB, update_data: schemas.UserUpdate):
         if update_data.email and update_data.email != user_to_update.email:
             self._validate_email(update_data.email)
             existing_user = self.usecase.find_user_by_email(email=update_data.email)
@@ -1,4 +1,5 @@
 # app/domains/users/resources.py
+import uuid
 from sqlalchemy.orm import Session, joinedload
 from typing import Optional, Dict, Any
 
@@ -12,6 +13,9 @@ def get_user(db: Session, user_id: str):
     """
     return db.query(User).options(joinedload(User.account)).filter(User.id == user_id).first()
 
+def get_token_version(db: Session, user_id: uuid.UUID) -> Optional[int]:
+    return db.query(User.token_version).filter(User.id == user_id).scalar()
+
 def get_user_by_email(db: Session, email: str):
     """
     Fetches a single user by their email, joining with their account details.
@@ -42,6 +46,10 @@ def update_user(db: Session, db_user: User, user_in: schemas.UserUpdate) -> User
     """
     update_data = user_in.dict(exclude_unset=True)
 
+    # A new password or email revokes the tokens issued so far.
+    if update_data.get("password") or (update_data.get("email") and update_data["email"] != db_user.email):
+        db_user.token_version += 1
+
     # If a new password is provided, hash it before updating
     if "password" in update_data and update_data["password"]:
         hashed_password = get_password_hash(update_data["password"])
@@ -1,13 +1,13 @@
 import uuid
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from . import handlers, schemas
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, verify_password_async
 from app.core.config import settings
 from app.middleware.auth import get_current_user
-from app.database.models import User as UserModel # Import the ORM model
 
 router = APIRouter()
 
@@ -24,16 +24,18 @@ def create_user_registration(
     return handler.register_user(user_in)
 
 @router.post("/users/login", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     handler: handlers.UserHandler = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
     Username field should contain the user's email.
+    Password verification runs in the hashing process pool, so a login storm
+    cannot tie up the threads that serve other endpoints.
     """
-    user = handler.get_user_for_auth(email=form_data.username)
-    if not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(handler.get_user_for_auth, email=form_data.username)
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -41,7 +43,8 @@ def login_for_access_token(
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": str(user.id), "ver": user.token_version},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -49,7 +52,7 @@ def login_for_access_token(
 # --- Protected Endpoints ---
 
 @router.get("/users/me", response_model=schemas.User)
-def read_current_user(current_user: UserModel = Depends(get_current_user)):
+def read_current_user(current_user: schemas.UserInDB = Depends(get_current_user)):
     """
     Get current logged-in user's details, including their account balance.
     This endpoint is protected.
@@ -59,7 +62,7 @@ def read_current_user(current_user: UserModel = Depends(get_current_user)):
 @router.put("/users/me", response_model=schemas.User)
 def update_current_user(
     user_in: schemas.UserUpdate,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: schemas.UserInDB = Depends(get_current_user),
     handler: handlers.UserHandler = Depends()
 ):
     """
@@ -32,6 +32,15 @@ class User(UserBase):
 
 class UserInDB(User):
     hashed_password: str
+    token_version: int = 0
+
+class Principal(BaseModel):
+    """
+    The caller as stated by the access token's claims, for endpoints that need no more than the id.
+    """
+    id: uuid.UUID
+    email: str
+    token_version: int
 
 # --- Token Schemas ---
 class Token(BaseModel):
@@ -39,4 +48,6 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    email: Optional[str] = None
+    email: str
+    user_id: uuid.UUID
+    token_version: int
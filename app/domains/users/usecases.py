@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from app.middleware.auth import invalidate_principal, remember_token_version
 from . import schemas, resources
 
 class UserUseCase:
@@ -14,5 +15,10 @@ class UserUseCase:
     def find_user_by_email(self, email: str):
         return resources.get_user_by_email(self.db, email=email)
 
-    def update_user_details(self, user_to_update: schemas.User, update_data: schemas.UserUpdate):
-        return resources.update_user(self.db, db_user=user_to_update, user_in=update_data)
\ No newline at end of file
+    def update_user_details(self, user_to_update: schemas.UserInDB, update_data: schemas.UserUpdate):
+        # The authenticated user may be a cached snapshot, so update a freshly loaded row.
+        db_user = resources.get_user(self.db, user_id=user_to_update.id)
+        updated = resources.update_user(self.db, db_user=db_user, user_in=update_data)
+        invalidate_principal(updated.id)
+        remember_token_version(updated.id, updated.token_version)
+        return updated
\ No newline at end of file
@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.domains.users import routes as user_routes
 from app.domains.transactions import routes as transaction_routes
@@ -7,20 +10,111 @@ from app.domains.categories import routes as category_routes
 from app.domains.merchants import routes as merchant_routes
 from app.domains.offers import routes as offer_routes
 
+from app.core.catalog_cache import catalog_cache
 from app.core.config import settings
+from app.core.metrics import counter_lines, gauge_lines, metrics_middleware, render_metrics
+from app.core.responses import default_response_class
+from app.core.security import PasswordHashingBusy, shutdown_password_pool
+from app.database.pool_stats import pool_snapshots
+from app.domains.transactions.expire_holds import start_hold_sweeper, stop_hold_sweeper
+from app.domains.transactions.usecases import write_pipeline
+from app.middleware.auth import principal_cache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_hold_sweeper()
+    yield
+    stop_hold_sweeper()
+    write_pipeline.stop()
+    shutdown_password_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    lifespan=lifespan,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # FastJSONResponse when FAST_JSON_RESPONSES is on; routes can still pass their own response_class.
+    default_response_class=default_response_class(),
 )
 
+if settings.METRICS_ENABLED:
+    app.middleware("http")(metrics_middleware)
+
 app.include_router(user_routes.router, prefix=settings.API_V1_STR, tags=["Users"])
 app.include_router(transaction_routes.router, prefix=settings.API_V1_STR, tags=["Transactions"])
-app.include_router(product_routes.router, prefix=f"{settings.API_V1_STR}/products", tags=["Products"])
+
+# Read-only endpoints can run on the async engine; writes always stay on the sync path.
+if settings.ASYNC_READ_ENDPOINTS:
+    analytics_router = transaction_routes.async_analytics_router
+    product_router = product_routes.async_router
+    offer_router = offer_routes.async_router
+else:
+    analytics_router = transaction_routes.analytics_router
+    product_router = product_routes.router
+    offer_router = offer_routes.router
+
+app.include_router(analytics_router, prefix=settings.API_V1_STR, tags=["Transactions"])
+app.include_router(product_router, prefix=f"{settings.API_V1_STR}/products", tags=["Products"])
 app.include_router(category_routes.router, prefix=f"{settings.API_V1_STR}/categories", tags=["Categories"])
 app.include_router(merchant_routes.router, prefix=f"{settings.API_V1_STR}/merchants", tags=["Merchants"])
-app.include_router(offer_routes.router, prefix=f"{settings.API_V1_STR}/offers", tags=["Offers"])
+app.include_router(offer_router, prefix=f"{settings.API_V1_STR}/offers", tags=["Offers"])
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
 
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to the FastAPI E-commerce API"}
+
+@app.get("/internal/stats/auth-cache", tags=["Internal"], include_in_schema=False)
+def read_auth_cache_stats():
+    """
+    Hit/miss counters of this worker's authenticated-principal cache.
+    """
+    return principal_cache.stats()
+
+@app.get("/internal/stats/catalog-cache", tags=["Internal"], include_in_schema=False)
+def read_catalog_cache_stats():
+    """
+    Hit/miss counters of this worker's catalog page cache.
+    """
+    return catalog_cache.stats()
+
+@app.get("/internal/stats/db-pool", tags=["Internal"], include_in_schema=False)
+def read_db_pool_stats():
+    """
+    Connection pool usage of this worker: checkout waits, timeouts, checked-out and overflow connections.
+    """
+    return pool_snapshots()
+
+@app.get("/internal/stats/write-batching", tags=["Internal"], include_in_schema=False)
+def read_write_batching_stats():
+    """
+    Batches committed by this worker's group-commit pipeline and their mean size.
+    """
+    return {"enabled": settings.WRITE_BATCHING, **write_pipeline.stats()}
+
+def _pool_metrics():
+    pools = pool_snapshots()
+
+    def per_engine(name: str):
+        return {(("engine", engine),): stats[name] for engine, stats in pools.items() if name in stats}
+
+    yield from gauge_lines("db_pool_checked_out", "Connections currently checked out of the pool.", per_engine("checked_out"))
+    yield from gauge_lines("db_pool_overflow", "Connections open beyond the pool size.", per_engine("overflow"))
+    yield from counter_lines(
+        "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS.", per_engine("timeouts")
+    )
+
+@app.get("/metrics", tags=["Internal"], include_in_schema=False)
+def read_metrics():
+    """
+    Per-route request latency, status counts and SQL usage of this worker in Prometheus text format.
+    """
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics are disabled\n", status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(render_metrics(_pool_metrics()), media_type="text/plain; version=0.0.4")
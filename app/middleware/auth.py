@@ -1,31 +1,108 @@
+import uuid
+from typing import Set
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.database.connection import get_db
+from app.database.connection import SessionLocal, async_read_session, get_db, read_session
 from app.domains.users import resources as user_resources
 from app.domains.users import schemas as user_schemas
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/users/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> user_schemas.UserInDB:
-    credentials_exception = HTTPException(
+# Resolved users keyed by user id, so most get_current_user calls skip the user lookup entirely.
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id: uuid.UUID) -> None:
+    """
+    Drops a user's cached principal. Call after anything that changes the user or their account.
+    """
+    principal_cache.pop(user_id)
+
+def invalidate_principals(user_ids: Set[uuid.UUID]) -> None:
+    for user_id in user_ids:
+        principal_cache.pop(user_id)
+
+# Latest token_version per user id. A hit lets get_current_principal accept a token without touching the
+# database; a bump is seen by other workers once their entry expires.
+token_versions = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS)
+
+def remember_token_version(user_id: uuid.UUID, token_version: int) -> None:
+    token_versions.set(user_id, token_version)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> user_schemas.TokenData:
+    # Tokens issued before the uid/ver claims existed are rejected; their users simply log in again.
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = user_schemas.TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-
-    user = user_resources.get_user_by_email(db, email=token_data.email)
-    if user is None:
-        raise credentials_exception
-    return user
+        return user_schemas.TokenData(
+            email=payload.get("sub"), user_id=payload.get("uid"), token_version=payload.get("ver")
+        )
+    except (JWTError, ValidationError):
+        raise _credentials_exception()
+
+def get_current_principal(token: str = Depends(oauth2_scheme)) -> user_schemas.Principal:
+    """
+    The caller's id and email, straight from a verified token. Only checks that the token has not been
+    revoked, against the cached token_version, so the database is only asked when that cache misses.
+    """
+    token_data = _decode_token(token)
+    current = token_versions.get(token_data.user_id)
+    # A newer token than the cached version means this worker's entry is stale. Ask the primary: a
+    # lagging replica could still hold the version a logout or password change just revoked.
+    if current is None or token_data.token_version > current:
+        db = SessionLocal()
+        try:
+            current = user_resources.get_token_version(db, token_data.user_id)
+        finally:
+            db.close()
+        if current is None:
+            raise _credentials_exception()
+        remember_token_version(token_data.user_id, current)
+    if token_data.token_version != current:
+        raise _credentials_exception()
+    return user_schemas.Principal(
+        id=token_data.user_id, email=token_data.email, token_version=token_data.token_version
+    )
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> user_schemas.UserInDB:
+    """
+    The full user with their account, for endpoints that need more than get_current_principal gives.
+    """
+    token_data = _decode_token(token)
+
+    principal = principal_cache.get(token_data.user_id)
+    if principal is not None and principal.token_version == token_data.token_version:
+        return principal
+
+    user = user_resources.get_user(db, user_id=token_data.user_id)
+    if user is None or user.token_version != token_data.token_version:
+        raise _credentials_exception()
+    principal = user_schemas.UserInDB.model_validate(user)
+    principal_cache.set(token_data.user_id, principal)
+    remember_token_version(user.id, user.token_version)
+    return principal
+
+def get_current_user_read_db(current_user: user_schemas.Principal = Depends(get_current_principal)):
+    """
+    Read-only session for the current user's own data: the replica, or the primary if they just wrote.
+    """
+    db = read_session(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_current_user_async_read_db(current_user: user_schemas.Principal = Depends(get_current_principal)):
+    async with async_read_session(current_user.id) as db:
+        yield db
@@ -0,0 +1,372 @@
+"""
+Drives every router (users, transactions, analytics, products, categories, merchants, offers)
+with a concurrent HTTP load generator and reports throughput and latency percentiles per
+endpoint as JSON, so two runs (e.g. before and after a query change) can be diffed.
+
+Each endpoint is measured on its own: a short warm-up, then --seconds of load from
+--concurrency threads. Users are seeded through the API itself (register, login, deposit and
+a few payments per user), so the numbers include the same code paths real clients hit.
+
+Stock is never given back, so the seed and the pay scenario only buy what the catalog still has:
+the remaining stock is read from GET /products/ and counted down locally. When it runs out the
+pay scenario stops early and its report says "stock_exhausted" rather than timing 400s. The
+handful of init.sql products is enough for the defaults once; for repeated or longer runs load
+the catalog from benchmarks/generate_data.py.
+
+Usage, against a server that is already running:
+    python benchmarks/api_load.py --base-url http://localhost:8000/api/v1 --output run.json
+
+or let the script run the migrations and boot uvicorn itself (needs .env pointing at Postgres):
+    python benchmarks/api_load.py --boot --workers 4 --output run.json
+
+Compare two runs:
+    python benchmarks/api_load.py --compare before.json after.json
+
+Only Postgres is supported: the schema relies on uuid-ossp, a PL/pgSQL trigger, advisory
+locks and FOR UPDATE, none of which SQLite can stand in for.
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = "Bench123!"
+MAX_PRODUCT_PAGES = 50
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(samples: List[float], statuses: Counter, wall: float) -> Dict:
+    report = {
+        "requests": sum(statuses.values()),
+        "ok": len(samples),
+        "errors": sum(count for code, count in statuses.items() if not 200 <= code < 400),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "requests_per_second": round(len(samples) / wall, 1) if wall else 0.0,
+    }
+    if samples:
+        report.update(
+            mean_ms=round(statistics.fmean(samples) * 1000, 2),
+            p50_ms=round(statistics.median(samples) * 1000, 2),
+            p95_ms=round(percentile(samples, 95) * 1000, 2),
+            p99_ms=round(percentile(samples, 99) * 1000, 2),
+        )
+    return report
+
+
+class Client:
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def request(
+        self, method: str, path: str, token: Optional[str] = None,
+        json_body: Optional[Dict] = None, form: Optional[Dict] = None,
+    ) -> Tuple[float, int, bytes]:
+        headers = {}
+        data = None
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        request = urllib.request.Request(f"{self.base_url}{path}", data=data, headers=headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                body = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            status = e.code
+        except urllib.error.URLError:
+            body = b""
+            status = 0
+        return time.perf_counter() - start, status, body
+
+    def json(self, method: str, path: str, **kwargs) -> Dict:
+        _, status, body = self.request(method, path, **kwargs)
+        if not 200 <= status < 300:
+            raise RuntimeError(f"{method} {path} returned {status}: {body[:200]!r}")
+        return json.loads(body)
+
+
+class StockLedger:
+    """
+    Remaining stock per product, counted down as the benchmark buys, so no request is sent for a
+    product that is already sold out.
+    """
+    def __init__(self, stock: Dict[str, int]):
+        self.left = {product_id: left for product_id, left in stock.items() if left > 0}
+        self.available = list(self.left)
+        self.lock = threading.Lock()
+
+    def total(self) -> int:
+        return sum(self.left.values())
+
+    def take(self, rng: random.Random) -> Optional[str]:
+        """
+        Reserves one unit of a random product that still has stock, or returns None if none has.
+        """
+        with self.lock:
+            if not self.available:
+                return None
+            index = rng.randrange(len(self.available))
+            product_id = self.available[index]
+            self.left[product_id] -= 1
+            if not self.left[product_id]:
+                self.available[index] = self.available[-1]
+                self.available.pop()
+            return product_id
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.available
+
+
+def load_stock(client: Client) -> StockLedger:
+    stock: Dict[str, int] = {}
+    for page in range(1, MAX_PRODUCT_PAGES + 1):
+        items = client.json("GET", f"/products/?page={page}&size=100")["items"]
+        stock.update((product["id"], product["stock"]) for product in items)
+        if len(items) < 100:
+            break
+    return StockLedger(stock)
+
+
+def seed(client: Client, users: int, payments_per_user: int, rng: random.Random) -> Dict:
+    """
+    Registers `users` users, gives each a large balance and a few purchases. Returns what the
+    scenarios need: tokens, emails, each user's transaction ids and the stock ledger.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    ledger = load_stock(client)
+    needed = users * payments_per_user
+    if ledger.total() < needed:
+        raise RuntimeError(
+            f"Only {ledger.total()} units in stock for {needed} seed payments; load benchmarks/generate_data.py "
+            "or lower --users/--payments-per-user."
+        )
+
+    def seed_user(index: int) -> Dict:
+        email = f"bench-{run_id}-{index}@example.com"
+        client.json("POST", "/users/register", json_body={"email": email, "password": PASSWORD, "full_name": f"Bench {index}"})
+        token = client.json("POST", "/users/login", form={"username": email, "password": PASSWORD})["access_token"]
+        client.json("POST", "/transactions/deposit", token=token, json_body={"amount": "1000000000"})
+        transaction_ids = [
+            client.json(
+                "POST", "/transactions/pay", token=token,
+                json_body={"product_id": ledger.take(rng), "quantity": 1},
+            )["id"]
+            for _ in range(payments_per_user)
+        ]
+        return {"email": email, "token": token, "transaction_ids": transaction_ids}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        accounts = list(pool.map(seed_user, range(users)))
+    return {"accounts": accounts, "stock": ledger}
+
+
+# A scenario returns None when it has nothing left to send (the pay scenario once stock runs out).
+Scenario = Callable[[Client, Dict, random.Random], Optional[Tuple[float, int, bytes]]]
+
+
+def build_scenarios(today: date) -> Dict[str, Scenario]:
+    month_ago = (today - timedelta(days=30)).isoformat()
+    until = today.isoformat()
+
+    def pick(fixture: Dict, rng: random.Random) -> Dict:
+        return rng.choice(fixture["accounts"])
+
+    def get(path: str, auth: bool = True) -> Scenario:
+        def run(client, fixture, rng):
+            return client.request("GET", path, token=pick(fixture, rng)["token"] if auth else None)
+        return run
+
+    def login(client, fixture, rng):
+        return client.request("POST", "/users/login", form={"username": pick(fixture, rng)["email"], "password": PASSWORD})
+
+    def transaction_by_id(client, fixture, rng):
+        account = pick(fixture, rng)
+        transaction_id = rng.choice(account["transaction_ids"]) if account["transaction_ids"] else uuid.uuid4()
+        return client.request("GET", f"/transactions/{transaction_id}", token=account["token"])
+
+    def deposit(client, fixture, rng):
+        return client.request("POST", "/transactions/deposit", token=pick(fixture, rng)["token"], json_body={"amount": "1000"})
+
+    def pay(client, fixture, rng):
+        product_id = fixture["stock"].take(rng)
+        if product_id is None:
+            return None
+        return client.request(
+            "POST", "/transactions/pay", token=pick(fixture, rng)["token"],
+            json_body={"product_id": product_id, "quantity": 1},
+        )
+
+    return {
+        "users.login": login,
+        "users.me": get("/users/me"),
+        "transactions.list": get("/transactions?page=1&pageSize=10"),
+        "transactions.list_cursor": get("/transactions?after=&pageSize=10"),
+        "transactions.by_id": transaction_by_id,
+        "transactions.deposit": deposit,
+        "transactions.pay": pay,
+        "analytics.amount_per_category": get(f"/analytics/amount-per-category?start_date={month_ago}&end_date={until}"),
+        "analytics.count_per_category": get(f"/analytics/count-per-category?start_date={month_ago}&end_date={until}"),
+        "analytics.time_series": get(f"/analytics/time-series?start_date={month_ago}&end_date={until}"),
+        "analytics.dashboard": get(f"/analytics/dashboard?start_date={month_ago}&end_date={until}"),
+        "products.list": get("/products/?page=1&size=10", auth=False),
+        "products.search": get("/products/search?q=Bundle&in_stock=true&sort=price_asc&size=10", auth=False),
+        "categories.list": get("/categories/?page=1&size=10", auth=False),
+        "merchants.list": get("/merchants/?page=1&size=10", auth=False),
+        "offers.list": get("/offers/?page=1&size=10", auth=False),
+    }
+
+
+def drive(client: Client, scenario: Scenario, fixture: Dict, seconds: float, concurrency: int, seed_value: int) -> Tuple[List[float], Counter, float]:
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(worker_id: int):
+        rng = random.Random(seed_value * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            result = scenario(client, fixture, rng)
+            if result is None:
+                return
+            elapsed, status, _ = result
+            with lock:
+                statuses[status] += 1
+                if 200 <= status < 400:
+                    samples.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for worker_id in range(concurrency):
+            pool.submit(worker, worker_id)
+    return samples, statuses, time.perf_counter() - start
+
+
+def boot_server(port: int, workers: int) -> subprocess.Popen:
+    subprocess.run([sys.executable, "-m", "app.database.migrate"], cwd=ROOT, check=True)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT,
+    )
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+            return server
+        except (urllib.error.URLError, ConnectionError):
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+def git_commit() -> Optional[str]:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def compare(before_path: str, after_path: str) -> Dict:
+    before = json.loads(Path(before_path).read_text())["endpoints"]
+    after = json.loads(Path(after_path).read_text())["endpoints"]
+    report = {}
+    for name in sorted(set(before) & set(after)):
+        row = {}
+        for metric in ("requests_per_second", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before[name].get(metric), after[name].get(metric)
+            if old and new is not None:
+                row[metric] = {"before": old, "after": new, "change_pct": round((new - old) / old * 100, 1)}
+        report[name] = row
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--boot", action="store_true", help="Run migrations and start uvicorn locally")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --boot")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --boot")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--payments-per-user", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="Scenario names to run (default: all)")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        return
+
+    scenarios = build_scenarios(date.today())
+    names = args.only or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}; choose from {', '.join(scenarios)}")
+
+    server = boot_server(args.port, args.workers) if args.boot else None
+    base_url = f"http://127.0.0.1:{args.port}/api/v1" if args.boot else args.base_url
+    try:
+        client = Client(base_url)
+        rng = random.Random(args.seed)
+        fixture = seed(client, args.users, args.payments_per_user, rng)
+        endpoints = {}
+        for index, name in enumerate(names):
+            if args.warmup:
+                drive(client, scenarios[name], fixture, args.warmup, args.concurrency, args.seed + index)
+            endpoints[name] = summarize(*drive(client, scenarios[name], fixture, args.seconds, args.concurrency, args.seed + index))
+            if name == "transactions.pay" and fixture["stock"].exhausted:
+                endpoints[name]["stock_exhausted"] = True
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "base_url": base_url,
+            "users": args.users,
+            "payments_per_user": args.payments_per_user,
+            "seconds": args.seconds,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "endpoints": endpoints,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Bulk-loads a large synthetic dataset (merchants, products, users with their accounts and
+transactions) so that scaling problems in the transaction history and analytics queries show up
+locally. Everything is loaded with COPY, transactions in parallel partitions, and the output is
+fully determined by --seed and --end-date.
+
+The shape of the data is skewed on purpose:
+- power users: user activity follows a Zipf distribution, so a few users own most transactions
+- hot products: product popularity is Zipf distributed as well
+- seasonality: weekends, paydays (25th to 2nd), December and the 11.11 / 12.12 sales are busier,
+  volume grows over the window, and purchases cluster around lunch and the evening
+
+Users are inserted into `users` only; create_account_trigger creates their accounts, and the
+balances and living points are reconciled with the generated history at the end. The daily
+spending rollups are rebuilt and the touched tables analyzed afterwards.
+
+Usage (against the database configured in .env, with init.sql and migrations applied):
+    python benchmarks/generate_data.py --users 1000000 --products 20000 --transactions 200000000 --jobs 8
+
+Re-running with the same seed on the same database fails on the unique user emails; use a fresh
+database or another --seed. Every generated user can log in with the password "Synthetic123!".
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.database.connection import SessionLocal, engine  # noqa: E402
+from app.domains.transactions import resources  # noqa: E402
+
+PASSWORD = "Synthetic123!"
+ADJECTIVES = ["Super", "Premium", "Hemat", "Ekstra", "Mini", "Jumbo", "Klasik", "Pro", "Lite", "Original"]
+NOUNS = ["Paket", "Set", "Edisi", "Seri", "Bundle", "Kotak", "Varian", "Model"]
+QUANTITIES = (1, 2, 3, 4, 5)
+QUANTITY_WEIGHTS = (70, 18, 7, 3, 2)
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 2, 4, 6, 7, 8, 9, 11, 13, 11, 9, 8, 8, 9, 11, 13, 14, 12, 7, 3)
+
+
+def log(message: str) -> None:
+    print(f"[{datetime.now():%H:%M:%S}] {message}", file=sys.stderr, flush=True)
+
+
+def stable_uuid(seed: int, kind: str, index: int) -> uuid.UUID:
+    """
+    The same (seed, kind, index) always maps to the same id, so partitions can refer to users
+    and products without shipping id lists between processes.
+    """
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+def email_domain(seed: int) -> str:
+    return f"s{seed}.synthetic.example"
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    cumulative, total = [], 0.0
+    for rank in range(1, n + 1):
+        total += rank ** -exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def day_cum_weights(start: date, days: int) -> List[float]:
+    cumulative, total = [], 0.0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weight = 1.0 + 0.6 * offset / days
+        if day.weekday() >= 5:
+            weight *= 1.3
+        if day.day >= 25 or day.day <= 2:
+            weight *= 1.5
+        if day.month == 12:
+            weight *= 1.4
+        if (day.month, day.day) in ((11, 11), (12, 12)):
+            weight *= 3
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def copy_rows(connection, table: str, columns: Sequence[str], rows: Iterator[Sequence], batch_rows: int) -> int:
+    """
+    COPYs `rows` into `table` in CSV chunks of `batch_rows`, committing after each chunk.
+    """
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    written = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    with connection.cursor() as cursor:
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if count % batch_rows == 0:
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+                connection.commit()
+                written = count
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            connection.commit()
+            written = count
+    return written
+
+
+def merchant_rows(args) -> Iterator[Tuple]:
+    for index in range(args.merchants):
+        yield stable_uuid(args.seed, "merchant", index), f"Synthetic Merchant {index:05d}"
+
+
+def product_prices(args) -> List[Decimal]:
+    # A separate stream from product_rows, so the transaction partitions can rebuild the prices
+    # without knowing the category ids of this database. Log-normal, median around 160k.
+    rng = random.Random(f"{args.seed}:prices")
+    return [
+        max(Decimal(1000), Decimal(round(math.exp(rng.gauss(12, 1.2)), -2)))
+        for _ in range(args.products)
+    ]
+
+
+def product_rows(args, category_ids: List[str]) -> Iterator[Tuple]:
+    rng = random.Random(f"{args.seed}:products")
+    for index, price in enumerate(product_prices(args)):
+        yield (
+            stable_uuid(args.seed, "product", index),
+            f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {index:06d}",
+            rng.choice(category_ids),
+            stable_uuid(args.seed, "merchant", rng.randrange(args.merchants)),
+            f"{price:.2f}",
+            10_000_000,
+        )
+
+
+def user_rows(args, hashed_password: str, window_start: datetime) -> Iterator[Tuple]:
+    rng = random.Random(f"{args.seed}:users")
+    domain = email_domain(args.seed)
+    for index in range(args.users):
+        created_at = window_start - timedelta(seconds=rng.randrange(365 * 86400))
+        yield (
+            stable_uuid(args.seed, "user", index),
+            f"Synthetic User {index:08d}",
+            f"user{index:08d}@{domain}",
+            hashed_password,
+            created_at.isoformat(),
+        )
+
+
+def transaction_rows(args, partition: int, count: int) -> Iterator[Tuple]:
+    rng = random.Random(f"{args.seed}:transactions:{partition}")
+    order_rng = random.Random(f"{args.seed}:ranks")
+    user_order = list(range(args.users))
+    order_rng.shuffle(user_order)
+    product_order = list(range(args.products))
+    order_rng.shuffle(product_order)
+
+    user_weights = zipf_cum_weights(args.users, args.user_skew)
+    product_weights = zipf_cum_weights(args.products, args.product_skew)
+    window_start = args.end_date - timedelta(days=args.days - 1)
+    day_weights = day_cum_weights(window_start, args.days)
+    prices = product_prices(args)
+    days = range(args.days)
+    hours = range(24)
+    user_ids = {}
+
+    chunk = 10_000
+    remaining = count
+    while remaining:
+        n = min(chunk, remaining)
+        remaining -= n
+        user_ranks = rng.choices(user_order, cum_weights=user_weights, k=n)
+        product_ranks = rng.choices(product_order, cum_weights=product_weights, k=n)
+        day_offsets = rng.choices(days, cum_weights=day_weights, k=n)
+        hours_of_day = rng.choices(hours, weights=HOUR_WEIGHTS, k=n)
+        quantities = rng.choices(QUANTITIES, weights=QUANTITY_WEIGHTS, k=n)
+        for user_index, product_index, day_offset, hour, quantity in zip(
+            user_ranks, product_ranks, day_offsets, hours_of_day, quantities
+        ):
+            user_id = user_ids.get(user_index)
+            if user_id is None:
+                user_id = user_ids[user_index] = stable_uuid(args.seed, "user", user_index)
+            moment = datetime.combine(window_start + timedelta(days=day_offset), datetime.min.time(), timezone.utc)
+            moment += timedelta(hours=hour, seconds=rng.randrange(3600))
+            transaction_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            if rng.random() < args.deposit_share:
+                amount = Decimal(rng.choice((500, 1000, 2500, 5000, 10000, 15000))) * 1000
+                yield transaction_id, user_id, None, None, f"{amount:.2f}", "completed", "deposit", moment.isoformat()
+            else:
+                amount = prices[product_index] * quantity
+                yield (
+                    transaction_id, user_id, stable_uuid(args.seed, "product", product_index), quantity,
+                    f"{amount:.2f}", "completed", "payment", moment.isoformat(),
+                )
+
+
+def load_transaction_partition(job: Tuple) -> int:
+    args, partition, count = job
+    engine.dispose(close=False)
+    connection = engine.raw_connection()
+    try:
+        return copy_rows(
+            connection.driver_connection, "transactions",
+            ("id", "user_id", "product_id", "quantity", "total_amount", "status", "transaction_type", "transaction_date"),
+            transaction_rows(args, partition, count), args.batch_rows,
+        )
+    finally:
+        connection.close()
+
+
+def secondary_indexes(connection, table: str) -> List[Tuple[str, str]]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c
+                  WHERE c.conindid = to_regclass(quote_ident(i.indexname)) AND c.contype IN ('p', 'u')
+              )
+            """,
+            (table,),
+        )
+        return cursor.fetchall()
+
+
+def reconcile_accounts(seed: int) -> int:
+    """
+    Sets the balance and living points of the generated users to what their history implies.
+    """
+    with SessionLocal() as db:
+        result = db.execute(
+            text(
+                """
+                UPDATE accounts a
+                SET balance = s.balance, living_points = s.points
+                FROM (
+                    SELECT t.user_id,
+                           GREATEST(sum(CASE WHEN t.transaction_type = 'deposit'
+                                             THEN t.total_amount ELSE -t.total_amount END), 0) AS balance,
+                           floor(sum(CASE WHEN t.transaction_type = 'payment'
+                                          THEN t.total_amount * 0.01 ELSE 0 END))::int AS points
+                    FROM transactions t
+                    JOIN users u ON u.id = t.user_id
+                    WHERE u.email LIKE :pattern
+                    GROUP BY t.user_id
+                ) s
+                WHERE a.user_id = s.user_id
+                """
+            ),
+            {"pattern": f"%@{email_domain(seed)}"},
+        )
+        db.commit()
+        return result.rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--merchants", type=int, default=500)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--transactions", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=730, help="Length of the transaction history window")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Last day of the window")
+    parser.add_argument("--deposit-share", type=float, default=0.1, help="Fraction of transactions that are deposits")
+    parser.add_argument("--user-skew", type=float, default=1.1, help="Zipf exponent of user activity")
+    parser.add_argument("--product-skew", type=float, default=1.2, help="Zipf exponent of product popularity")
+    parser.add_argument("--jobs", type=int, default=max(1, multiprocessing.cpu_count() - 1))
+    parser.add_argument("--batch-rows", type=int, default=100_000, help="Rows per COPY chunk")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="Load transactions with their secondary indexes in place instead of rebuilding them")
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    raw = engine.raw_connection()
+    connection = raw.driver_connection
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id::text FROM categories ORDER BY label")
+            category_ids = [row[0] for row in cursor.fetchall()]
+        if not category_ids:
+            raise SystemExit("No categories found; load init.sql first.")
+
+        log(f"merchants: {copy_rows(connection, 'merchants', ('id', 'name'), merchant_rows(args), args.batch_rows)}")
+        written = copy_rows(
+            connection, "products", ("id", "name", "category_id", "merchant_id", "amount", "stock"),
+            product_rows(args, category_ids), args.batch_rows,
+        )
+        log(f"products: {written}")
+
+        window_start = datetime.combine(args.end_date - timedelta(days=args.days - 1), datetime.min.time(), timezone.utc)
+        written = copy_rows(
+            connection, "users", ("id", "full_name", "email", "hashed_password", "created_at"),
+            user_rows(args, get_password_hash(PASSWORD), window_start), args.batch_rows,
+        )
+        log(f"users (accounts created by create_account_trigger): {written}")
+
+        dropped = [] if args.keep_indexes else secondary_indexes(connection, "transactions")
+        with connection.cursor() as cursor:
+            for name, _ in dropped:
+                cursor.execute(f'DROP INDEX "{name}"')
+        connection.commit()
+        try:
+            jobs = max(1, min(args.jobs, args.transactions // args.batch_rows or 1))
+            share, extra = divmod(args.transactions, jobs)
+            partitions = [(args, partition, share + (partition < extra)) for partition in range(jobs)]
+            with multiprocessing.Pool(jobs) as pool:
+                written = sum(pool.map(load_transaction_partition, partitions))
+            log(f"transactions: {written} in {jobs} partition(s)")
+        finally:
+            with connection.cursor() as cursor:
+                for name, definition in dropped:
+                    log(f"rebuilding {name}")
+                    cursor.execute(definition)
+            connection.commit()
+    finally:
+        raw.close()
+
+    log(f"accounts reconciled: {reconcile_accounts(args.seed)}")
+    with SessionLocal() as db:
+        log(f"rollup rows rebuilt: {resources.rebuild_daily_rollups(db)}")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE users, accounts, merchants, products, transactions, daily_spending_rollups"))
+
+    print(json.dumps({
+        "seed": args.seed,
+        "end_date": args.end_date.isoformat(),
+        "days": args.days,
+        "users": args.users,
+        "merchants": args.merchants,
+        "products": args.products,
+        "transactions": args.transactions,
+        "elapsed_seconds": round(time.perf_counter() - started, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Per-request commits versus the group-commit pipeline on the deposit and payment write path.
+
+Runs the same workload twice, in-process and against the database configured in .env:
+per-request - every write opens a session and commits on its own (create_deposit / create_payment)
+batched     - every write goes through GroupCommitPipeline (stage_deposit / stage_payment)
+
+Each of --concurrency threads writes for --seconds. The report has writes/sec, database commits/sec
+(from pg_stat_database, so other activity on the database shows up as well) and latency percentiles.
+Deposits go to existing users and payments buy one unit of the product with the most stock, so run it
+on a database filled by benchmarks/generate_data.py.
+
+Usage:
+    python benchmarks/group_commit.py [--workload mixed] [--concurrency 64] [--seconds 20]
+                                      [--window-ms 2] [--max-batch 64] [--output report.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from app.database.connection import SessionLocal, engine  # noqa: E402
+from app.database.group_commit import GroupCommitPipeline  # noqa: E402
+from app.database.models import Product, User  # noqa: E402
+from app.domains.transactions import resources, schemas  # noqa: E402
+
+DEPOSIT = schemas.DepositCreate(amount=Decimal("1000000.00"))
+
+
+def committed_transactions() -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()")
+        ).scalar()
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def per_request_write(kind: str, user_id, payment: schemas.PaymentCreate) -> bool:
+    with SessionLocal() as db:
+        if kind == "deposit":
+            resources.create_deposit(db, user_id, DEPOSIT)
+            return True
+        transaction, _ = resources.create_payment(db, user_id, payment)
+        return transaction is not None
+
+
+def batched_write(pipeline: GroupCommitPipeline) -> Callable:
+    def write(kind: str, user_id, payment: schemas.PaymentCreate) -> bool:
+        if kind == "deposit":
+            pipeline.submit(lambda db: resources.stage_deposit(db, user_id, DEPOSIT))
+            return True
+        transaction, _ = pipeline.submit(lambda db: resources.stage_payment(db, user_id, payment))
+        return transaction is not None
+    return write
+
+
+def run(write: Callable, args, user_ids: List, payment: schemas.PaymentCreate) -> Dict:
+    latencies: List[List[float]] = [[] for _ in range(args.concurrency)]
+    failures = [0] * args.concurrency
+    stop_at = time.monotonic() + args.seconds
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        while time.monotonic() < stop_at:
+            kind = args.workload if args.workload != "mixed" else rng.choice(("deposit", "payment"))
+            start = time.perf_counter()
+            try:
+                ok = write(kind, rng.choice(user_ids), payment)
+            except Exception:
+                ok = False
+            latencies[index].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                failures[index] += 1
+
+    commits_before = committed_transactions()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    commits = committed_transactions() - commits_before
+
+    samples = [sample for worker_samples in latencies for sample in worker_samples]
+    return {
+        "writes": len(samples),
+        "failed": sum(failures),
+        "writes_per_second": round(len(samples) / elapsed, 1),
+        "commits_per_second": round(commits / elapsed, 1),
+        "p50_ms": round(statistics.median(samples), 2) if samples else None,
+        "p99_ms": round(percentile(samples, 0.99), 2) if samples else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", choices=("deposit", "payment", "mixed"), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--users", type=int, default=10_000, help="Spread the writes over this many users")
+    parser.add_argument("--window-ms", type=float, default=2)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--output", type=Path, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user_ids = db.execute(select(User.id).limit(args.users)).scalars().all()
+        product_id = db.execute(select(Product.id).order_by(Product.stock.desc()).limit(1)).scalar()
+    if not user_ids or product_id is None:
+        sys.exit("The database needs users and products; run benchmarks/generate_data.py first.")
+    payment = schemas.PaymentCreate(product_id=product_id, quantity=1)
+
+    pipeline = GroupCommitPipeline(SessionLocal, window_ms=args.window_ms, max_batch=args.max_batch)
+    report = {
+        "workload": args.workload,
+        "concurrency": args.concurrency,
+        "window_ms": args.window_ms,
+        "max_batch": args.max_batch,
+        "per_request": run(per_request_write, args, user_ids, payment),
+    }
+    report["batched"] = run(batched_write(pipeline), args, user_ids, payment)
+    pipeline.stop()
+    report["batched"]["mean_batch_size"] = pipeline.stats()["mean_batch_size"]
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
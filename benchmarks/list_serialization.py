@@ -0,0 +1,125 @@
+"""
+Compares the old ORM-entity path of the list endpoints with the column projections that replaced
+it, in rows per second from query to serialized JSON body.
+
+legacy     - select the mapped entities with joinedload, validate the response schemas
+             from attributes, dump to JSON (what the endpoints did before)
+projection - the current resources: select only the needed columns, build the schemas from
+             the rows, dump to JSON
+
+Both run the same page query against the same data with the count disabled, so the difference is
+the per-row ORM and validation overhead.
+
+Usage (against the database configured in .env; use benchmarks/generate_data.py for volume):
+    python benchmarks/list_serialization.py [--size 100] [--iterations 200]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import desc, func, select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.database.connection import SessionLocal  # noqa: E402
+from app.database.models import Product, Transaction  # noqa: E402
+from app.domains.products import resources as product_resources, schemas as product_schemas  # noqa: E402
+from app.domains.transactions import resources as transaction_resources, schemas as transaction_schemas  # noqa: E402
+
+
+def legacy_products(db, size: int) -> Tuple[int, str]:
+    rows = db.execute(
+        select(Product).options(joinedload(Product.category), joinedload(Product.merchant))
+        .order_by(Product.name).limit(size)
+    ).scalars().all()
+    items = [product_schemas.Product.model_validate(row) for row in rows]
+    body = product_schemas.ProductList(
+        items=items, page=1, size=size, has_more=False, total_strategy="none"
+    ).model_dump_json()
+    db.expunge_all()  # every request starts with an empty identity map
+    return len(items), body
+
+
+def projection_products(db, size: int) -> Tuple[int, str]:
+    result = product_resources._load_products(db, 1, size, None)
+    return len(result.items), product_schemas.ProductList(
+        items=result.items, page=1, size=size, has_more=result.has_more, total_strategy=result.total_strategy.value
+    ).model_dump_json()
+
+
+def legacy_transactions(db, size: int, user_id) -> Tuple[int, str]:
+    rows = db.execute(
+        select(Transaction).options(joinedload(Transaction.product).joinedload(Product.category))
+        .where(Transaction.user_id == user_id).order_by(desc(Transaction.transaction_date)).limit(size)
+    ).scalars().all()
+    items = [transaction_schemas.Transaction.model_validate(row) for row in rows]
+    body = transaction_schemas.TransactionHistory(
+        items=items, page=1, size=size, has_more=False, total_strategy="none"
+    ).model_dump_json()
+    db.expunge_all()
+    return len(items), body
+
+
+def projection_transactions(db, size: int, user_id) -> Tuple[int, str]:
+    result = transaction_resources.get_user_transactions(db, user_id, 1, size)
+    return len(result.items), transaction_schemas.TransactionHistory(
+        items=result.items, page=1, size=size, has_more=result.has_more, total_strategy=result.total_strategy.value
+    ).model_dump_json()
+
+
+def measure(run: Callable[[], Tuple[int, str]], iterations: int) -> Dict:
+    run()  # warm-up: statement caches and connection
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        rows += run()[0]
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    # Measure the page itself, not the total.
+    settings.COUNT_STRATEGIES.update(products="none", transactions="none")
+
+    with SessionLocal() as db:
+        user_id = db.execute(
+            select(Transaction.user_id).group_by(Transaction.user_id)
+            .order_by(func.count().desc()).limit(1)
+        ).scalar()
+        cases = {
+            "products": (
+                lambda: legacy_products(db, args.size),
+                lambda: projection_products(db, args.size),
+            ),
+        }
+        if user_id is not None:
+            cases["transactions"] = (
+                lambda: legacy_transactions(db, args.size, user_id),
+                lambda: projection_transactions(db, args.size, user_id),
+            )
+
+        report = {}
+        for name, (legacy, projection) in cases.items():
+            before = measure(legacy, args.iterations)
+            after = measure(projection, args.iterations)
+            report[name] = {
+                "legacy": before,
+                "projection": after,
+                "speedup": round(after["rows_per_second"] / before["rows_per_second"], 2)
+                if before["rows_per_second"] else None,
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
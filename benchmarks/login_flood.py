@@ -0,0 +1,133 @@
+"""
+Measures /products latency on its own and again while /users/login is being flooded.
+
+With the bcrypt process pool enabled, the p99 of /products should stay roughly flat during the
+flood; surplus logins are rejected with 503 instead of queueing on the request threads.
+
+Usage (against a running server with a registered user):
+    python benchmarks/login_flood.py --base-url http://localhost:8000/api/v1 \
+        --email bench@example.com --password 'Bench123!' [--seconds 20] [--flood-concurrency 64]
+
+Only the standard library is used, so it runs anywhere the API is reachable.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+def timed_request(request: urllib.request.Request) -> tuple:
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError:
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def sample_products(base_url: str, stop: threading.Event, concurrency: int) -> List[float]:
+    samples: List[float] = []
+    lock = threading.Lock()
+
+    def worker():
+        while not stop.is_set():
+            elapsed, status = timed_request(urllib.request.Request(f"{base_url}/products/?page=1&size=10"))
+            if status == 200:
+                with lock:
+                    samples.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return samples
+
+
+def flood_logins(base_url: str, email: str, password: str, stop: threading.Event, concurrency: int) -> Counter:
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    body = urllib.parse.urlencode({"username": email, "password": password}).encode()
+
+    def worker():
+        while not stop.is_set():
+            request = urllib.request.Request(
+                f"{base_url}/users/login", data=body,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            _, status = timed_request(request)
+            with lock:
+                statuses[status] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return statuses
+
+
+def run_phase(args, with_flood: bool) -> Dict:
+    stop = threading.Event()
+    result: Dict = {}
+
+    flood_thread = None
+    if with_flood:
+        def flood():
+            result["login_statuses"] = dict(
+                flood_logins(args.base_url, args.email, args.password, stop, args.flood_concurrency)
+            )
+        flood_thread = threading.Thread(target=flood)
+        flood_thread.start()
+
+    timer = threading.Timer(args.seconds, stop.set)
+    timer.start()
+    result["products"] = summarize(sample_products(args.base_url, stop, args.products_concurrency))
+    if flood_thread:
+        flood_thread.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--products-concurrency", type=int, default=4)
+    parser.add_argument("--flood-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    report = {
+        "baseline": run_phase(args, with_flood=False),
+        "during_login_flood": run_phase(args, with_flood=True),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
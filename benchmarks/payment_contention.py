@@ -0,0 +1,136 @@
+"""
+Compares the "orm" and "atomic" payment engines on a single hot product.
+
+Both engines hold their row locks from the first locking statement until COMMIT, so the
+uncontended latency of one payment is used as the lock hold time. The contended phase
+then has --threads workers buy the same product (each with its own account) and reports
+throughput and latency percentiles.
+
+Usage (against the database configured in .env, with migrations applied):
+    python benchmarks/payment_contention.py [--threads 16] [--payments 2000]
+
+The benchmark creates its own users and product and deletes them afterwards.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database.connection import SessionLocal  # noqa: E402
+from app.domains.transactions import resources, schemas  # noqa: E402
+
+ENGINES: Dict[str, Callable] = {
+    "orm": resources.create_payment,
+    "atomic": resources.create_payment_atomic,
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def setup(threads: int, payments: int) -> Dict:
+    run_id = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        category_id = db.execute(text("SELECT id FROM categories ORDER BY label LIMIT 1")).scalar()
+        product_id = db.execute(text(
+            "INSERT INTO products (name, category_id, amount, stock) "
+            "VALUES (:name, :category_id, 1000.00, :stock) RETURNING id"
+        ), {"name": f"Contention {run_id}", "category_id": category_id, "stock": payments * 4}).scalar()
+        user_ids = db.execute(text(
+            "INSERT INTO users (full_name, email, hashed_password) "
+            "SELECT 'Contention ' || g, 'contention-' || :run_id || '-' || g || '@example.invalid', 'x' "
+            "FROM generate_series(1, :n) g RETURNING id"
+        ), {"run_id": run_id, "n": threads + 1}).scalars().all()
+        db.execute(
+            text("UPDATE accounts SET balance = 1000000000 WHERE user_id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": [str(u) for u in user_ids]},
+        )
+        db.commit()
+    return {"run_id": run_id, "product_id": product_id, "user_ids": user_ids}
+
+
+def teardown(fixture: Dict) -> None:
+    with SessionLocal() as db:
+        ids = [str(u) for u in fixture["user_ids"]]
+        db.execute(text("DELETE FROM daily_spending_rollups WHERE user_id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids})
+        db.execute(text("DELETE FROM transactions WHERE user_id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids})
+        db.execute(text("DELETE FROM users WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids})
+        db.execute(text("DELETE FROM products WHERE id = :id"), {"id": fixture["product_id"]})
+        db.commit()
+
+
+def pay(engine: Callable, user_id: uuid.UUID, product_id: uuid.UUID) -> float:
+    payment = schemas.PaymentCreate(product_id=product_id, quantity=1)
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        transaction, error = engine(db, user_id, payment)
+        elapsed = time.perf_counter() - start
+    if error:
+        raise RuntimeError(error)
+    return elapsed
+
+
+def run_engine(name: str, fixture: Dict, threads: int, payments: int) -> Dict:
+    engine = ENGINES[name]
+    solo_user, *workers = fixture["user_ids"]
+
+    # Uncontended: every statement runs while the locks are held, so latency ~ lock hold time.
+    solo = [pay(engine, solo_user, fixture["product_id"]) for _ in range(min(200, payments))]
+
+    per_thread = payments // threads
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [
+            pool.submit(lambda u=user_id: [pay(engine, u, fixture["product_id"]) for _ in range(per_thread)])
+            for user_id in workers
+        ]
+        contended = [sample for future in futures for sample in future.result()]
+    wall = time.perf_counter() - start
+
+    return {
+        "lock_hold_time": summarize(solo),
+        "contended": {
+            "threads": threads,
+            "payments": len(contended),
+            "payments_per_second": round(len(contended) / wall, 1),
+            **summarize(contended),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    args = parser.parse_args()
+
+    fixture = setup(args.threads, args.payments)
+    try:
+        report = {name: run_engine(name, fixture, args.threads, args.payments) for name in args.engines}
+    finally:
+        teardown(fixture)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Latency of GET /products/search queries with and without the indexes from migration 0003.
+
+Every case runs the real search resource (page query plus total) against the current catalog:
+indexed   - the planner as configured, using the trigram and btree indexes
+unindexed - the same statements with index and bitmap scans disabled for the transaction,
+            i.e. what the search would cost without the migration
+
+The catalog should hold at least a million products; create one with
+    python benchmarks/generate_data.py --products 1000000 --users 1000 --transactions 10000
+
+Usage (against the database configured in .env, with migrations applied):
+    python benchmarks/product_search.py [--iterations 50] [--baseline-iterations 5] [--output report.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.database.connection import SessionLocal  # noqa: E402
+from app.database.pagination import CountStrategy  # noqa: E402
+from app.database.models import Merchant, Product  # noqa: E402
+from app.domains.products import resources as product_resources, schemas as product_schemas  # noqa: E402
+
+RECOMMENDED_PRODUCTS = 1_000_000
+
+NameMatch = product_schemas.NameMatch
+SearchSort = product_schemas.SearchSort
+
+
+def cases(merchant_id) -> Dict[str, product_schemas.ProductSearch]:
+    # Terms follow the names written by generate_data.py ("<Adjective> <Noun> <index>").
+    search = product_schemas.ProductSearch
+    return {
+        "contains_rare": search(q="12345"),
+        "contains_common": search(q="Bundle"),
+        "prefix": search(q="Premium Bundle 0012", match=NameMatch.prefix),
+        "contains_in_stock_by_price": search(q="Kotak", in_stock=True, sort=SearchSort.price_asc),
+        "price_range": search(min_price=Decimal(100_000), max_price=Decimal(101_000), sort=SearchSort.price_asc),
+        "price_desc": search(sort=SearchSort.price_desc),
+        "newest": search(sort=SearchSort.newest),
+        "merchant": search(merchant_id=merchant_id),
+        "merchant_contains": search(q="Edisi", merchant_id=merchant_id, sort=SearchSort.price_desc),
+    }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(run: Callable[[], int], iterations: int) -> Dict:
+    run()  # warm-up: statement caches and connection
+    samples = []
+    rows = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        rows = run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "iterations": iterations,
+        "rows": rows,
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(percentile(samples, 0.95), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--baseline-iterations", type=int, default=5,
+                        help="Iterations without indexes; 0 skips the comparison")
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--count", default="exact", choices=[strategy.value for strategy in CountStrategy],
+                        help="Count strategy for the search total")
+    parser.add_argument("--only", nargs="*", help="Run only these cases")
+    parser.add_argument("--output", type=Path, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    settings.COUNT_STRATEGIES.update(products_search=args.count)
+
+    with SessionLocal() as db:
+        products = db.execute(select(func.count()).select_from(Product)).scalar()
+        if products < RECOMMENDED_PRODUCTS:
+            print(f"warning: only {products} products; the numbers are meant for {RECOMMENDED_PRODUCTS}+",
+                  file=sys.stderr)
+        merchant_id = db.execute(select(Merchant.id).order_by(Merchant.name).limit(1)).scalar()
+
+        report = {"products": products, "size": args.size, "count_strategy": args.count, "cases": {}}
+        for name, search in cases(merchant_id).items():
+            if args.only and name not in args.only:
+                continue
+
+            def run() -> int:
+                return len(product_resources.search_products(db, search, 1, args.size).items)
+
+            def run_unindexed() -> int:
+                db.execute(text("SET LOCAL enable_indexscan = off"))
+                db.execute(text("SET LOCAL enable_indexonlyscan = off"))
+                db.execute(text("SET LOCAL enable_bitmapscan = off"))
+                try:
+                    return run()
+                finally:
+                    db.rollback()
+
+            result = {"indexed": measure(run, args.iterations)}
+            db.rollback()
+            if args.baseline_iterations:
+                result["unindexed"] = measure(run_unindexed, args.baseline_iterations)
+                result["speedup_p50"] = round(result["unindexed"]["p50_ms"] / result["indexed"]["p50_ms"], 1) \
+                    if result["indexed"]["p50_ms"] else None
+            report["cases"][name] = result
+            print(f"{name}: {json.dumps(result)}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import os
+
+# Settings are read at import time; these let the app import without a .env or a running database.
+# Engines are created lazily by SQLAlchemy, so nothing here connects anywhere.
+for name, value in {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "DB_SERVER": "localhost",
+    "DB_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,52 @@
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a", "gone") == "gone"
+    assert cache.stats()["size"] == 0
+
+
+def test_pop_where_removes_matching_entries():
+    cache = TTLCache(maxsize=10, ttl=60)
+    for key, value in (("a", 1), ("b", 2), ("c", 3)):
+        cache.set(key, value)
+
+    removed = cache.pop_where(lambda key, value: value % 2 == 1)
+
+    assert removed == 2
+    assert cache.get("a") is None and cache.get("c") is None
+    assert cache.get("b") == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
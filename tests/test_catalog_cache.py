@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Request, Response
+
+from app.core import catalog_cache
+from app.database.pagination import CountStrategy, PageResult
+from app.domains.products.schemas import Product
+
+
+def _product(name="Kopi", stock=5):
+    return Product(id=uuid.uuid4(), name=name, amount=10000, stock=stock, created_at=datetime.now(timezone.utc))
+
+
+def _page(*items):
+    return lambda: PageResult(items=list(items), total=len(items), has_more=False, total_strategy=CountStrategy.exact)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    catalog_cache.catalog_cache.clear()
+    yield
+    catalog_cache.catalog_cache.clear()
+
+
+def test_invalidate_products_drops_only_pages_listing_them():
+    sold, other = _product(), _product(name="Teh")
+    catalog_cache.get_page("products", 1, 10, None, _page(sold))
+    catalog_cache.get_page("products", 2, 10, None, _page(other))
+    catalog_cache.get_page("offers", 1, 10, None, _page())
+
+    catalog_cache.invalidate_products([sold.id])
+
+    assert catalog_cache.catalog_cache.get(("products", 1, 10, None)) is None
+    assert catalog_cache.catalog_cache.get(("products", 2, 10, None)).item_ids == {other.id}
+    assert catalog_cache.catalog_cache.get(("offers", 1, 10, None)) is not None
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_is_stable_for_the_same_page():
+    loader = _page(_product())
+    first = catalog_cache._to_page(("products", 1, 10, None), loader())
+
+    assert first.etag == catalog_cache._to_page(("products", 1, 10, None), loader()).etag
+    assert first.etag != catalog_cache._to_page(("products", 2, 10, None), loader()).etag
+
+
+def test_matching_if_none_match_is_a_304():
+    etag = '"abc"'
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = catalog_cache.conditional_response(_request(header), Response(), {"items": []}, etag)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.body == b""
+
+
+def test_other_if_none_match_returns_the_body_with_its_etag():
+    response = Response()
+    body = {"items": []}
+
+    for request in (_request(), _request('"stale"')):
+        assert catalog_cache.conditional_response(request, response, body, '"abc"') is body
+        assert response.headers["ETag"] == '"abc"'
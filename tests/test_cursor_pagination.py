@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.domains.transactions import handlers, resources
+
+
+def test_cursor_round_trips():
+    row = SimpleNamespace(
+        transaction_date=datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc), id=uuid.uuid4()
+    )
+
+    cursor = resources.encode_cursor(row)
+
+    assert "=" not in cursor
+    assert resources.decode_cursor(cursor) == (row.transaction_date, row.id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "W10", "WyJ4IiwgInkiXQ", "eyJhIjogMX0"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        resources.decode_cursor(cursor)
+
+
+def test_malformed_after_is_a_bad_request():
+    # The cursor is decoded before any query runs, so no database is needed.
+    usecase = SimpleNamespace(
+        list_user_transactions_after=lambda user_id, size, after, *filters:
+            resources.get_user_transactions_after(None, user_id, size, after, *filters)
+    )
+
+    with pytest.raises(HTTPException) as error:
+        handlers.TransactionHandler(usecase).get_my_transactions_after(uuid.uuid4(), 10, "garbage", None, None, None)
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Invalid cursor."
@@ -0,0 +1,43 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.dialects import postgresql
+
+from app.domains.transactions import handlers, resources
+
+
+def _total_row(count, amount):
+    # The row of the () grouping set, as PostgreSQL returns it for a range without rollups.
+    return SimpleNamespace(
+        grouping=3, category=None, day=None,
+        payment_count=count, payment_amount=amount, transaction_count=count, total_amount=amount,
+    )
+
+
+def test_empty_range_is_zero_filled():
+    start, end = date(2024, 1, 1), date(2024, 1, 3)
+    response = handlers._dashboard_response(start, end, ZoneInfo("UTC"), [_total_row(0, Decimal(0))])
+
+    assert response.transaction_count == 0
+    assert response.total_amount == Decimal(0)
+    assert response.amount_per_category == []
+    assert response.count_per_category == []
+    assert [point.date for point in response.time_series.data] == [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)]
+    assert all(point.transaction_count == 0 for point in response.time_series.data)
+
+
+def test_no_rows_at_all():
+    response = handlers._dashboard_response(date(2024, 1, 1), date(2024, 1, 1), ZoneInfo("UTC"), [])
+
+    assert response.transaction_count == 0
+    assert len(response.time_series.data) == 1
+
+
+def test_totals_are_coalesced_in_sql():
+    stmt = resources._dashboard_stmt(uuid.uuid4(), date(2024, 1, 1), date(2024, 1, 31))
+    sql = str(stmt.compile(dialect=postgresql.dialect())).lower()
+
+    assert sql.count("coalesce(sum(") == 4
@@ -0,0 +1,26 @@
+"""
+Import smoke test: every module the API loads must import, which also builds every pydantic schema
+and registers every route.
+"""
+import importlib
+
+import pytest
+
+MODULES = [
+    "app.main",
+    "app.database.migrate",
+    "app.database.explain_check",
+    "app.domains.transactions.rebuild_rollups",
+    "app.domains.transactions.expire_holds",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_imports(module):
+    importlib.import_module(module)
+
+
+def test_openapi_schema_builds():
+    from app.main import app
+
+    assert app.openapi()["paths"]
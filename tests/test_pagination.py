@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+from typing import get_args
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import column, select, table
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.config import CountStrategyName, Settings, settings
+from app.database import pagination
+from app.database.pagination import CountStrategy, Explain
+
+things = table("things", column("id"))
+STMT = select(things.c.id).order_by(things.c.id)
+BASE = select(things.c.id)
+
+
+class FakeSession:
+    """
+    Answers the page query with `rows` and records which kind of total query was run.
+    """
+    def __init__(self, rows, count=42, reltuples=1000, plan_rows=900):
+        self.rows = rows
+        self.answers = {"count": count, "reltuples": reltuples, "explain": [{"Plan": {"Plan Rows": plan_rows}}]}
+        self.queries = []
+
+    def execute(self, stmt):
+        if isinstance(stmt, Explain):
+            kind = "explain"
+        elif isinstance(stmt, TextClause):
+            kind = "reltuples"
+        elif stmt._limit is not None:
+            kind = "page"
+        else:
+            kind = "count"
+        self.queries.append(kind)
+        return SimpleNamespace(all=lambda: self.rows, scalar=lambda: self.answers.get(kind))
+
+
+@pytest.fixture
+def strategy(monkeypatch):
+    monkeypatch.setattr(pagination._count_cache, "_data", type(pagination._count_cache._data)())
+    return lambda value: monkeypatch.setitem(settings.COUNT_STRATEGIES, "things", value)
+
+
+def test_count_strategy_setting_accepts_exactly_the_strategies():
+    assert set(get_args(CountStrategyName)) == {strategy.value for strategy in CountStrategy}
+
+
+def test_unknown_count_strategy_fails_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(COUNT_STRATEGY="exakt")
+    with pytest.raises(ValidationError):
+        Settings(COUNT_STRATEGIES={"products": "estimated"})
+
+
+def test_exact_counts_every_time(strategy):
+    strategy("exact")
+    db = FakeSession(rows=[1, 2, 3])
+
+    page = pagination.paginate(db, "things", STMT, BASE, 1, 2)
+
+    assert (page.items, page.has_more, page.total, page.total_strategy) == ([1, 2], True, 42, CountStrategy.exact)
+    assert db.queries == ["page", "count"]
+
+
+def test_cached_counts_once_per_key(strategy):
+    strategy("cached")
+    db = FakeSession(rows=[1])
+
+    first = pagination.paginate(db, "things", STMT, BASE, 1, 2, count_key="all")
+    second = pagination.paginate(db, "things", STMT, BASE, 2, 2, count_key="all")
+    pagination.paginate(db, "things", STMT, BASE, 1, 2, count_key="filtered")
+
+    assert first.total == second.total == 42
+    assert not first.has_more
+    assert db.queries == ["page", "count", "page", "page", "count"]
+
+
+def test_estimate_uses_reltuples_for_a_table_and_explain_otherwise(strategy):
+    strategy("estimate")
+    db = FakeSession(rows=[])
+
+    assert pagination.paginate(db, "things", STMT, BASE, 1, 2, table="things").total == 1000
+    assert pagination.paginate(db, "things", STMT, BASE, 1, 2).total == 900
+    assert db.queries == ["page", "reltuples", "page", "explain"]
+
+
+def test_none_runs_only_the_page_query(strategy):
+    strategy("none")
+    db = FakeSession(rows=[1, 2, 3])
+
+    page = pagination.paginate(db, "things", STMT, BASE, 1, 2)
+
+    assert (page.total, page.has_more, page.total_strategy) == (None, True, CountStrategy.none)
+    assert db.queries == ["page"]
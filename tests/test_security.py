@@ -0,0 +1,27 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+
+
+def test_full_hash_pool_sheds_load(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(security, "_hash_slots", slots)
+
+    with pytest.raises(security.PasswordHashingBusy):
+        security.verify_password("secret", "$2b$12$unused")
+
+
+def test_busy_hash_pool_is_a_503():
+    from app.main import password_hashing_busy_handler
+
+    response = asyncio.run(password_hashing_busy_handler(None, security.PasswordHashingBusy("busy")))
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.body == b'{"detail":"busy"}'